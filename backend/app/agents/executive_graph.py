@@ -1,9 +1,17 @@
-from typing import TypedDict, List, Dict, Any, Optional
+from typing import AsyncIterator, TypedDict, List, Dict, Any, Optional, Tuple
 from langgraph.graph import StateGraph, END
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import JsonOutputParser
 from app.providers.adapters import GeminiAdapter
 
+BRIEFING_SCHEMA = {"type": "object", "properties": {"subject": {"type": "string"}, "tldr": {"type": "string"}}}  # Simplified schema hint
+
+FALLBACK_MEMO = {
+    "subject": "Weekly Revenue Briefing",
+    "tldr": "Automated generation failed. Raw data available below.",
+    "sections": []
+}
+
 # State Definition
 class ExecutiveState(TypedDict):
     input_period: str  # e.g., "Week of Jan 28"
@@ -23,9 +31,7 @@ class ExecutiveNodes:
         """
         return {"status": "ANALYZING"}
 
-    async def synthesize(self, state: ExecutiveState) -> Dict:
-        input_data = state["raw_intelligence"]
-        
+    def briefing_prompts(self, input_data: Dict[str, Any]) -> Tuple[str, str]:
         system_prompt = """You are the Chief of Staff for a Series B SaaS company.
         Your job is to write a "State of Revenue" memo for the CEO.
         
@@ -70,25 +76,30 @@ class ExecutiveNodes:
         
         Write the briefing.
         """
+        return system_prompt, human_prompt
+
+    async def synthesize(self, state: ExecutiveState) -> Dict:
+        system_prompt, human_prompt = self.briefing_prompts(state["raw_intelligence"])
 
         try:
             res = await self.llm.generate_json(
                 prompt=human_prompt,
-                schema={"type": "object", "properties": {"subject": {"type": "string"}, "tldr": {"type": "string"}}}, # Simplified schema hint
+                schema=BRIEFING_SCHEMA,
                 system_prompt=system_prompt
             )
             return {"briefing_memo": res, "status": "DRAFTED"}
         except Exception as e:
             print(f"Exec Memo Generation Error: {e}")
             # Fallback
-            return {
-                "briefing_memo": {
-                    "subject": "Weekly Revenue Briefing",
-                    "tldr": "Automated generation failed. Raw data available below.",
-                    "sections": []
-                },
-                "status": "FAILED"
-            }
+            return {"briefing_memo": dict(FALLBACK_MEMO), "status": "FAILED"}
+
+    def stream_memo(self, raw_intelligence: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+        """Streaming variant of `synthesize`: yields the memo as it is being written."""
+        system_prompt, human_prompt = self.briefing_prompts(raw_intelligence)
+        return self.llm.stream_json(prompt=human_prompt, schema=BRIEFING_SCHEMA, system_prompt=system_prompt)
+
+def create_executive_streamer():
+    return ExecutiveNodes()
 
 def create_executive_graph():
     nodes = ExecutiveNodes()
@@ -1,13 +1,18 @@
+import asyncio
 from datetime import datetime
 from langgraph.graph import StateGraph, END
 from app.models.contracts import ResearcherState, EvidenceItem, AccountDossier
 from app.services.fetcher import Fetcher
 from app.services.search_provider import TavilySearchProvider
+from app.services.evidence_packer import EvidencePacker
 
 class ResearcherGraph:
+    EXCERPT_CHARS = 5000  # Truncate for token limits (simple logic for now)
+
     def __init__(self):
         self.fetcher = Fetcher()
         self.search = TavilySearchProvider()
+        self.packer = EvidencePacker()
         
     async def collect_sources(self, state: ResearcherState):
         """Node 1: Gather raw URLs from Search + Homepage"""
@@ -54,11 +59,18 @@ class ResearcherGraph:
         """Node 2: Visit URLs and extract text"""
         print(f"📥 Extracting facts from {len(state.evidence_items)} sources...")
         
-        for item in state.evidence_items:
-            data = await self.fetcher.fetch(item.url)
+        # Fetch all sources concurrently; the Fetcher caps per-host concurrency
+        # and stops reading each body once the excerpt budget is filled.
+        results = await asyncio.gather(
+            *(self.fetcher.fetch(item.url, max_chars=self.EXCERPT_CHARS) for item in state.evidence_items),
+            return_exceptions=True
+        )
+
+        for item, data in zip(state.evidence_items, results):
+            if isinstance(data, Exception):
+                data = {"status": "error", "error_msg": str(data)}
             if data["status"] == "success":
-                # Truncate for token limits (simple logic for now)
-                item.excerpt = data["content"][:5000] 
+                item.excerpt = data["content"]
                 item.extract_method = data.get("method", "requests")
             else:
                 item.excerpt = "Failed to fetch"
@@ -72,9 +84,10 @@ class ResearcherGraph:
         print("🧠 Scoring fit using Gemini 1.5 Flash...")
         
         # 1. Initialize LLM
-        # Use a cheaper/faster model for this task
-        from langchain_google_genai import ChatGoogleGenerativeAI
+        # Use a cheaper/faster model for this task (shared process-wide client)
         from langchain_core.messages import HumanMessage
+        from app.providers.prompt_registry import get_chat_model
+        from app.core.ratelimit import rate_limits
         from app.agents.prompts import FIT_SCORING_PROMPT
         from app.core.config import settings
         import json
@@ -91,19 +104,15 @@ class ResearcherGraph:
             state.status = "SCORING_SKIPPED"
             return state
 
-        llm = ChatGoogleGenerativeAI(
-            model="gemini-1.5-flash", 
-            google_api_key=settings.GOOGLE_API_KEY,
-            temperature=0.0
-        )
+        llm = get_chat_model("gemini-1.5-flash", temperature=0.0, google_api_key=settings.GOOGLE_API_KEY)
 
         # 2. Prepare Context
-        # Aggregate evidence text
-        evidence_text = "\n\n".join([
-            f"SOURCE ({e.source_type} - {e.url}):\n{e.excerpt[:2000]}" 
-            for e in state.evidence_items 
-            if e.excerpt
-        ])
+        # Aggregate evidence text: deduped, most relevant passages within the token budget
+        evidence_text = self.packer.pack(
+            [e for e in state.evidence_items if e.excerpt],
+            token_budget=settings.EVIDENCE_TOKEN_BUDGET,
+            label=lambda e: f"SOURCE ({e.source_type} - {e.url}):"
+        ).text
 
         # 3. Call LLM
         prompt = FIT_SCORING_PROMPT.format(
@@ -113,10 +122,11 @@ class ResearcherGraph:
         
         try:
             # We ask for JSON_MODE (supported by Gemini)
-            result = await llm.ainvoke(
-                [HumanMessage(content=prompt)],
-                config={"configurable": {"response_mime_type": "application/json"}} 
-            )
+            async with rate_limits.guard("gemini"):
+                result = await llm.ainvoke(
+                    [HumanMessage(content=prompt)],
+                    config={"configurable": {"response_mime_type": "application/json"}} 
+                )
             
             # 4. Parse JSON
             # Clean possible markdown fencing
@@ -1,79 +1,188 @@
 
-from typing import TypedDict, List, Dict, Any
+import time
+from datetime import datetime, timezone
+from typing import TypedDict, List, Dict, Any, Callable, Optional
+from langchain_core.runnables import RunnableConfig
 from langgraph.graph import StateGraph, END
 
-from app.seeders.crm_seeder import CRMSeeder
+from app.services.crm_scan_source import CRMScanSource, default_scan_source
+from app.services.hygiene_engine import HygieneRules, HygieneScan, epoch_s, utc_now
+from app.services.hygiene_issues import HygieneIssueRepository
+from app.services.hygiene_store import HygieneStore, get_hygiene_store, new_delta
 
 # --- State Definition ---
 class HygieneState(TypedDict):
-    raw_data: Dict[str, Any]
+    raw_data: Dict[str, Any]  # optional inline records ({"deals": [...], "contacts": [...]}); else the scan source is used
+    scan: Any                 # HygieneScan: counts + flagged rows, never the raw records
     issues: List[Dict[str, Any]]
+    issue_count: int
+    summary: Dict[str, Any]
+    changes: Dict[str, Any]   # incremental mode: what this scan merged into the stored issue set
     health_score: int
     status: str
 
 # --- Nodes ---
 class HygieneNodes:
-    def scan_crm(self, state: HygieneState) -> Dict:
-        """Fetch data from the CRM (Mocked for now)."""
-        data = CRMSeeder.generate_messy_data(record_count=15)
-        return {"raw_data": data, "status": "SCANNING"}
+    # Issues returned in the graph state; the full count is in `issue_count`
+    MAX_ISSUES = 1000
 
-    def detect_anomalies(self, state: HygieneState) -> Dict:
+    def __init__(self, rules: HygieneRules | None = None,
+                 source_factory: Callable[[], CRMScanSource] = default_scan_source,
+                 store_factory: Callable[[], HygieneStore] = get_hygiene_store,
+                 issue_repository_factory: Optional[Callable[[str], HygieneIssueRepository]] = None):
+        self.rules = rules or HygieneRules()
+        self.source_factory = source_factory
+        self.store_factory = store_factory
+        self.issue_repository_factory = issue_repository_factory
+
+    async def scan_crm(self, state: HygieneState, config: RunnableConfig) -> Dict:
         """
-        Rule Engine to find issues.
-        1. Stale Deal: No activity > 30 days.
-        2. Ghost Contact: Missing Email or Title.
+        Stream the CRM page by page into the rule engine, so memory is bounded by one
+        page plus the flagged rows. `configurable.source` overrides the scan source and
+        `configurable.on_progress(dict)` is called after every page.
+
+        With `configurable.incremental`, only records changed since the workspace's
+        stored cursor are read and merged into its stored issue set (see
+        `_merge_changes`); `configurable.full` forces a complete pass.
         """
-        data = state["raw_data"]
-        issues = []
-        
-        # 1. Check Deals
-        stale_count = 0
-        from datetime import datetime
-        now = datetime.now()
-        
-        for deal in data["deals"]:
-            last_active = datetime.fromisoformat(deal["last_activity_date"])
-            days_inactive = (now - last_active).days
-            
-            if days_inactive > 30:
-                stale_count += 1
-                issues.append({
-                    "type": "STALE_DEAL",
-                    "severity": "HIGH" if deal["amount"] > 50000 else "MED",
-                    "entity_id": deal["deal_id"],
-                    "description": f"Deal '{deal['name']}' (${deal['amount']:,}) untouched for {days_inactive} days.",
-                    "suggested_fix": "Move to 'Closed Lost' or enrolling in 'Wake Up' sequence."
+        configurable = (config or {}).get("configurable", {})
+        on_progress: Optional[Callable[[Dict[str, Any]], Any]] = configurable.get("on_progress")
+        scan = HygieneScan(rules=self.rules)
+
+        raw = state.get("raw_data") or {}
+        if raw.get("deals") or raw.get("contacts"):
+            scan.add_deals(raw.get("deals", []))
+            scan.add_contacts(raw.get("contacts", []))
+            return {"scan": scan, "status": "SCANNING"}
+
+        source = configurable.get("source") or self.source_factory()
+        if configurable.get("incremental"):
+            from app.core.supabase import get_workspace_id
+            workspace_id = configurable.get("workspace_id") or get_workspace_id()
+            changes = await self._merge_changes(source, workspace_id, bool(configurable.get("full")), on_progress)
+            return {"scan": None, "changes": changes, "status": "SCANNING"}
+
+        totals = {entity: await source.count(entity) for entity in ("deals", "contacts")}
+        scanned = {"deals": 0, "contacts": 0}
+        pages = 0
+        started = time.perf_counter()
+        async for page in source.pages():
+            if page.entity == "deals":
+                scan.add_deal_batch(page.batch)
+            else:
+                scan.add_contact_batch(page.batch)
+            scanned[page.entity] += len(page)
+            pages += 1
+            if on_progress:
+                elapsed = time.perf_counter() - started
+                on_progress({
+                    "source": source.name,
+                    "entity": page.entity,
+                    "scanned": scanned[page.entity],
+                    "total": totals[page.entity],
+                    "pages": pages,
+                    "records_scanned": scan.total_records,
+                    "issues_found": scan.issue_count,
+                    "records_per_s": round(scan.total_records / elapsed) if elapsed else None
                 })
+        return {"scan": scan, "status": "SCANNING"}
 
-        # 2. Check Contacts
-        missing_data_count = 0
-        for contact in data["contacts"]:
-            missing_fields = []
-            if not contact["email"]: missing_fields.append("Email")
-            if not contact["title"]: missing_fields.append("Title")
-            
-            if missing_fields:
-                missing_data_count += 1
-                issues.append({
-                    "type": "INCOMPLETE_CONTACT",
-                    "severity": "LOW",
-                    "entity_id": contact["contact_id"],
-                    "description": f"Contact matches but missing: {', '.join(missing_fields)}.",
-                    "suggested_fix": "Auto-Enrich via Clearbit/Apollo."
+    async def _merge_changes(self, source: CRMScanSource, workspace_id: str, full: bool,
+                             on_progress: Optional[Callable[[Dict[str, Any]], Any]]) -> Dict[str, Any]:
+        """
+        Incremental scan. Records modified since the stored cursor are re-evaluated and
+        their issue changes folded into the stored totals; deals whose verdict changed
+        only because time passed are re-checked from stored dates. The first scan,
+        a source switch, `full`, or a source without change filtering does a complete
+        pass instead, which also drops records that no longer exist.
+        Every change is mirrored to the issue repository (hygiene_issues), and the
+        scan's health score is appended to its history.
+        """
+        store = self.store_factory()
+        repo = self.issue_repository_factory(workspace_id) if self.issue_repository_factory else None
+        state = await store.begin(workspace_id, source.name)
+        now = utc_now()
+        # Cursor from before the first read: changes made during the scan are read again next time
+        cursor = now.replace(tzinfo=timezone.utc)
+        since = None
+        if state and state.get("cursor") and not full and source.incremental:
+            since = datetime.fromisoformat(state["cursor"])
+
+        delta = new_delta()
+        delta["mode"] = "incremental" if since else "full"
+        pages = 0
+        async for page in source.pages(since=since):
+            issues, resolved = await store.merge(workspace_id, page.entity, page.batch, self.rules, now, delta)
+            if repo:
+                await repo.apply(issues, resolved, cursor)
+            pages += 1
+            if on_progress:
+                on_progress({
+                    "source": source.name,
+                    "mode": delta["mode"],
+                    "entity": page.entity,
+                    "pages": pages,
+                    "records_scanned": delta["records_fetched"],
+                    "opened": delta["opened"],
+                    "resolved": delta["resolved"]
                 })
 
-        # Calculate Score (Basic heuristic)
-        total_records = len(data["deals"]) + len(data["contacts"])
-        total_issues = stale_count + missing_data_count
-        # Floor at 0, max 100
-        health_score = max(0, int(100 - (total_issues / total_records * 100)))
+        if since:
+            issues, resolved = await store.recheck_time_rules(
+                workspace_id, self.rules, state["scanned_at"], now, delta
+            )
+            if repo:
+                await repo.apply(issues, resolved, cursor)
+        else:
+            await store.prune(workspace_id, epoch_s(now), delta)
+            if repo:
+                await repo.prune(cursor)
+        await store.finish(workspace_id, cursor.isoformat(), epoch_s(now))
+        if repo:
+            await repo.record_health(await store.summary(workspace_id), delta, cursor)
+            delta["persisted"] = repo.writable
+        delta["since"] = since.isoformat() if since else None
+        delta["workspace_id"] = workspace_id
+        return delta
 
-        return {"issues": issues, "health_score": health_score, "status": "DONE"}
+    async def detect_anomalies(self, state: HygieneState, config: RunnableConfig) -> Dict:
+        """
+        Rule Engine results (see app.services.hygiene_engine).
+        1. Stale Deal: No activity > 30 days.
+        2. Future Activity: last activity dated in the future.
+        3. Incomplete Deal / Ghost Contact: missing required fields.
+        """
+        changes = state.get("changes")
+        if state.get("scan") is None and changes:
+            # Incremental: results are the stored issue set, not just this scan's records
+            store = self.store_factory()
+            summary = await store.summary(changes["workspace_id"])
+            return {
+                "issues": await store.issues(changes["workspace_id"], self.MAX_ISSUES, self.rules),
+                "issue_count": summary["issues"],
+                "summary": summary,
+                "health_score": summary["health_score"],
+                "status": "DONE"
+            }
+
+        scan: HygieneScan = state["scan"]
+        issues = [issue for _, issue in zip(range(self.MAX_ISSUES), scan.issues())]
+
+        return {
+            "issues": issues,
+            "issue_count": scan.issue_count,
+            "summary": scan.summary(),
+            "health_score": scan.health_score,
+            "status": "DONE"
+        }
 
 # --- Graph ---
+def _issue_repository(workspace_id: str) -> Optional[HygieneIssueRepository]:
+    from app.core.config import settings
+    return HygieneIssueRepository(workspace_id) if settings.HYGIENE_PERSIST_ISSUES else None
+
 def create_hygiene_graph():
-    nodes = HygieneNodes()
+    nodes = HygieneNodes(issue_repository_factory=_issue_repository)
     workflow = StateGraph(HygieneState)
     
     workflow.add_node("scan_crm", nodes.scan_crm)
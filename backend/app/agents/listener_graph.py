@@ -1,8 +1,10 @@
-import json
-import os
+import time
 from typing import TypedDict, List, Dict, Any, Optional
 from langgraph.graph import StateGraph, END
 
+from app.services.signal_matcher import SignalCanonMatcher
+from app.services.signal_window import SignalWindow, event_time
+
 # --- THE SIGNALS AGENT CONSTITUTION ---
 # Article I: Purpose - Improve decision quality, not activity.
 # Article II: Signals Are Not Intent.
@@ -81,10 +83,50 @@ SIGNAL_COMBOS = {
     }
 }
 
+# Canonical signal_id -> combo pattern members it provides evidence for.
+# Members without a canonical source (e.g. "hiring_freeze") can't be observed yet.
+SIGNAL_COMBO_MEMBERS = {
+    "11_news_financing": ["news_financing"],
+    "12_news_office_expansion": ["news_office_expansion"],
+    "13_news_leadership_change": ["news_leadership_change"],
+    "15_news_product_launch": ["news_product_launch"],
+    "20_news_award": ["news_award"],
+    "22_news_layoffs": ["news_layoffs"],
+    "25_jobs_hiring_sales": ["hiring_sales"],
+    "26_jobs_hiring_marketing": ["hiring_marketing", "hiring_demand_gen"],
+    "27_jobs_hiring_revops": ["hiring_revops"],
+    "31_jobs_mention_tech_stack": ["tech_crm"],
+    "32_jobs_pain_keywords": ["tech_crm"],
+    "33_jobs_location_expansion": ["hiring_sales_local"],
+    "39_tech_new_detection": ["tech_change"],
+    "40_tech_integration_partner": ["tech_crm"],
+    "47_tech_vendor_switch": ["tech_change", "tech_crm_change"],
+    "48_tech_analytics_adoption": ["tech_analytics"],
+    "50_tech_abm_adoption": ["tech_marketing_automation"],
+    "51_tech_plg_tools": ["tech_analytics"],
+    "52_tech_infra_change": ["tech_change"],
+}
+
+_signal_window: Optional[SignalWindow] = None
+
+def get_signal_window() -> SignalWindow:
+    """Process-wide correlation window, shared by the graph and batch paths."""
+    global _signal_window
+    if _signal_window is None:
+        from app.core.config import settings
+        _signal_window = SignalWindow(
+            SIGNAL_COMBOS,
+            window_days=settings.SIGNAL_WINDOW_DAYS,
+            persist=settings.SIGNAL_WINDOW_PERSIST
+        )
+    return _signal_window
+
 class ListenerState(TypedDict):
     domain: str
     raw_event: Dict[str, Any]
     signal_def: Dict[str, Any]
+    signal_candidates: List[str]   # all matching canonical signal_ids, best first
+    corroborated_combos: List[str] # SIGNAL_COMBOS keys completed within the domain's window
     
     # State fields
     suppressed: bool
@@ -102,37 +144,49 @@ class ListenerState(TypedDict):
     draft_email: Optional[Dict]
 
 class ListenerNodes:
-    def __init__(self):
-        try:
-            with open("backend/app/data/signals_canon.json", "r") as f:
-                self.canon = json.load(f)
-        except:
-             # Fallback path if running from root vs backend
-             try:
-                 with open("app/data/signals_canon.json", "r") as f:
-                     self.canon = json.load(f)
-             except:
-                 self.canon = {"signals": []}
+    def __init__(self, matcher: Optional[SignalCanonMatcher] = None, window: Optional[SignalWindow] = None):
+        # Canon is loaded and indexed once (path is module-relative, so cwd doesn't matter)
+        self.matcher = matcher or SignalCanonMatcher.from_file()
+        self.canon = {"signals": self.matcher.signals}
+        self.window = window or get_signal_window()
 
     def convert_event_to_signal(self, state: ListenerState) -> Dict:
         """Ingest: Maps raw event to Canonical Signal."""
         raw = state["raw_event"]
         print(f"--- [Listener] Ingesting: {raw.get('trigger')} ---")
         
-        matched = None
-        for sig in self.canon["signals"]:
-            if sig["trigger"].lower() in raw.get("trigger", "").lower():
-                matched = sig
-                break
-        
-        if not matched:
+        update = self.signal_update(self.matcher.match(raw.get("trigger", "")))
+        update.update(self.observe_window(state["domain"], raw, update["signal_def"]))
+        return update
+
+    def signal_update(self, candidates: List[Dict[str, Any]]) -> Dict:
+        """State update for a set of canonical matches (shared with the batch path)."""
+        if not candidates:
             return {
                 "signal_def": None, 
+                "signal_candidates": [],
                 "decision": "IGNORE", 
                 "rationale": {"choice_reason": "No canonical trigger matched."}
             }
             
-        return {"signal_def": matched, "decision": "PROCESSING"}
+        # Most specific canonical trigger wins
+        return {
+            "signal_def": candidates[0],
+            "signal_candidates": [sig["signal_id"] for sig in candidates],
+            "decision": "PROCESSING"
+        }
+
+    def observe_window(self, domain: str, raw: Dict[str, Any], signal_def: Optional[Dict]) -> Dict:
+        """
+        Article V: records the event in the domain's correlation window and returns
+        the combos it completes. Suppressed events are recorded too, so negative
+        signals still count as context for later events.
+        """
+        if not signal_def or domain == "Unknown":
+            return {"corroborated_combos": []}
+        sig_id = signal_def["signal_id"]
+        combos = self.window.observe(domain, SIGNAL_COMBO_MEMBERS.get(sig_id, []), event_time(raw), signal_id=sig_id)
+        return {"corroborated_combos": combos}
 
     def check_suppression(self, state: ListenerState) -> Dict:
         """
@@ -180,6 +234,12 @@ class ListenerNodes:
         sig_id = state["signal_def"]["signal_id"]
         trigger = state["raw_event"].get("trigger", "").lower()
         
+        # Corroborated combos (every pattern member seen within the window) win
+        corroborated = state.get("corroborated_combos") or []
+        if corroborated:
+            combo = SIGNAL_COMBOS[corroborated[0]]
+            return {"archetype": combo["name"], "archetype_desc": combo["desc"]}
+
         # Mock Evaluator Logic (Mapping triggers to Combos)
         archetype_key = None
         
@@ -220,10 +280,15 @@ class ListenerNodes:
         risks = []
         
         # Article V: Multi-Signal Context
+        corroborated = state.get("corroborated_combos") or []
         if state["archetype"] != "Unclassified Signal":
             drivers.append(f"Matches Combo: {state['archetype']}")
         else:
             risks.append("Article V Risk: Single signal lacks corroboration.")
+        if corroborated:
+            pattern = SIGNAL_COMBOS[corroborated[0]]["pattern"]
+            days = round(self.window.window_s / 86400)
+            drivers.append(f"Corroborated within {days}d: {', '.join(pattern)}")
             
         # Source Reliability
         if "news" in sig.get("dataset", ""): risks.append("PR Source (Medium Reliability)")
@@ -231,6 +296,7 @@ class ListenerNodes:
         
         score = 0.5
         if drivers: score += 0.2
+        if corroborated: score += 0.1
         if risks: score -= 0.1
         
         return {
@@ -304,6 +370,57 @@ class ListenerNodes:
         }
         return {"draft_email": draft}
 
+def initial_listener_state(event: Dict[str, Any]) -> ListenerState:
+    return {
+        "domain": event.get("domain", "Unknown"),
+        "raw_event": event,
+        "signal_def": {},
+        "corroborated_combos": [],
+        "suppressed": False,
+        "suppression_reason": "",
+        "archetype": "None",
+        "confidence_score": 0.0,
+        "confidence_drivers": [],
+        "confidence_risks": [],
+        "decision": "STARTING",
+        "rationale": {},
+        "draft_email": None
+    }
+
+class ListenerBatchProcessor:
+    """
+    Runs the same veto pipeline as `create_listener_graph` over many events at once.
+    Canon matching is done for the whole batch in one call; the remaining nodes are
+    plain dict updates applied in graph order, skipping per-event graph overhead.
+    """
+
+    STEPS = ("check_suppression", "match_archetype", "score_confidence", "decide_action", "compose_copy")
+
+    def __init__(self, nodes: Optional[ListenerNodes] = None):
+        self.nodes = nodes or ListenerNodes()
+
+    def process(self, events: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Returns final states in input order, each with `latency_ms`."""
+        start = time.perf_counter()
+        all_candidates = self.nodes.matcher.match_batch(e.get("trigger", "") for e in events)
+        # Matching is shared; attribute it evenly across the batch
+        match_ms = (time.perf_counter() - start) * 1000 / max(1, len(events))
+        
+        results = []
+        for event, candidates in zip(events, all_candidates):
+            t0 = time.perf_counter()
+            state = initial_listener_state(event)
+            state.update(self.nodes.signal_update(candidates))
+            state.update(self.nodes.observe_window(state["domain"], event, state["signal_def"]))
+            for step in self.STEPS:
+                state.update(getattr(self.nodes, step)(state))
+            state["latency_ms"] = round((time.perf_counter() - t0) * 1000 + match_ms, 4)
+            results.append(state)
+        return results
+
+def create_listener_batch_processor():
+    return ListenerBatchProcessor()
+
 def create_listener_graph():
     nodes = ListenerNodes()
     workflow = StateGraph(ListenerState)
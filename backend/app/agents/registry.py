@@ -0,0 +1,105 @@
+import asyncio
+import logging
+import time
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger("gtm360-backend")
+
+
+def _default_builders() -> Dict[str, Callable[[], Any]]:
+    """Graph factories keyed by agent name. Imported lazily so a missing optional
+    dependency only disables the graph that needs it."""
+    from app.agents.researcher_graph import create_researcher_graph
+    from app.agents.listener_graph import create_listener_graph, create_listener_batch_processor
+    from app.agents.sales_graph import build_sales_graph
+    from app.agents.expansion_graph import create_expansion_graph
+    from app.agents.hygiene_graph import create_hygiene_graph
+    from app.agents.executive_graph import create_executive_graph, create_executive_streamer
+
+    return {
+        "researcher": create_researcher_graph,
+        "listener": create_listener_graph,
+        "listener_batch": create_listener_batch_processor,
+        "sales": build_sales_graph,
+        "expansion": create_expansion_graph,
+        "hygiene": create_hygiene_graph,
+        "executive": create_executive_graph,
+        "executive_stream": create_executive_streamer,
+    }
+
+
+class GraphRegistry:
+    """
+    Application-scoped cache of compiled agent graphs.
+
+    Each graph (and the node instance holding its adapters) is built once and shared
+    across requests. Node classes only keep read-only resources (adapters, canon data),
+    and per-run data lives in the graph state, so concurrent `ainvoke` calls are safe.
+    """
+
+    def __init__(self, builders: Optional[Dict[str, Callable[[], Any]]] = None):
+        self._builders = builders
+        self._graphs: Dict[str, Any] = {}
+        self._stats: Dict[str, Dict[str, Any]] = {}
+        self._lock = asyncio.Lock()
+
+    @property
+    def builders(self) -> Dict[str, Callable[[], Any]]:
+        if self._builders is None:
+            self._builders = _default_builders()
+        return self._builders
+
+    def _build(self, name: str, source: str) -> Any:
+        start = time.perf_counter()
+        graph = self.builders[name]()
+        cold_ms = (time.perf_counter() - start) * 1000
+
+        self._graphs[name] = graph
+        self._stats[name] = {
+            "source": source,
+            "cold_build_ms": round(cold_ms, 2),
+            "warm_hits": 0,
+            "warm_lookup_us_avg": 0.0,
+            "error": None,
+        }
+        logger.info(f"Compiled '{name}' graph in {cold_ms:.1f}ms ({source})")
+        return graph
+
+    def build_all(self) -> None:
+        """Compile every registered graph. Called once from the app lifespan."""
+        for name in self.builders:
+            try:
+                self._build(name, source="startup")
+            except Exception as e:
+                # e.g. GeminiAdapter without GOOGLE_API_KEY. Retried on first use.
+                logger.warning(f"Deferred '{name}' graph build: {e}")
+                self._stats[name] = {"source": "startup", "error": str(e)}
+
+    async def get(self, name: str) -> Any:
+        """Return the compiled graph, building it on demand if startup skipped it."""
+        start = time.perf_counter()
+        graph = self._graphs.get(name)
+
+        if graph is None:
+            if name not in self.builders:
+                raise KeyError(f"Unknown agent graph: {name}")
+            async with self._lock:
+                graph = self._graphs.get(name)
+                if graph is None:
+                    return self._build(name, source="on_demand")
+
+        stats = self._stats[name]
+        lookup_us = (time.perf_counter() - start) * 1_000_000
+        stats["warm_hits"] += 1
+        stats["warm_lookup_us_avg"] += (lookup_us - stats["warm_lookup_us_avg"]) / stats["warm_hits"]
+        return graph
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {name: dict(s) for name, s in self._stats.items()}
+
+    def clear(self) -> None:
+        self._graphs.clear()
+        self._stats.clear()
+
+
+graph_registry = GraphRegistry()
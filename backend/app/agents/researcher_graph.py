@@ -1,12 +1,70 @@
-from typing import TypedDict, List, Dict, Any, Literal
+from typing import TypedDict, List, Dict, Any, Literal, Optional, Set
 from datetime import datetime
+import asyncio
 import json
 import logging
+import time
 
 from langgraph.graph import StateGraph, END
 
 from app.contracts.schemas import AccountDossier, EvidenceItem, Signal, ResearchConfig
 from app.providers.adapters import GeminiAdapter, TavilyAdapter, HubSpotAdapter
+from app.providers.prompt_registry import model_schema
+from app.services.dossier_cache import dossier_cache
+from app.services.evidence_packer import EvidencePacker, estimate_tokens
+
+# We need a list of signals.
+# For simplicity in v1, we ask for a wrapping object. Built once so its serialized
+# form and compiled chain are reused across runs.
+SIGNAL_LIST_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "signals": {
+            "type": "array",
+            "items": model_schema(Signal)
+        }
+    }
+}
+
+# Batched mode: one request covering several accounts, answered per domain
+BATCH_SIGNAL_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "accounts": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "domain": {"type": "string"},
+                    "signals": {"type": "array", "items": model_schema(Signal)}
+                },
+                "required": ["domain", "signals"]
+            }
+        }
+    }
+}
+
+DEFAULT_LOOK_FOR = """- Executive Hires (Sales, Marketing, Product)
+        - Funding Events (Series A, B, C)
+        - Tech Stack (CRM, Marketing Automation)
+        - GTM Tooling"""
+
+def look_for_text(refresh_types: List[str]) -> str:
+    if refresh_types:
+        return f"- ONLY these signal types: {', '.join(refresh_types)}"
+    return DEFAULT_LOOK_FOR
+
+def extraction_prompt(domain: str, look_for: str, context_str: str) -> str:
+    return f"""
+        Analyze the following text from {domain} and extract structured signals 
+        according to the Signal schema.
+        
+        Look for:
+        {look_for}
+        
+        Input Context:
+        {context_str}
+        """
 
 # --- State Definition ---
 class AgentState(TypedDict):
@@ -21,23 +79,192 @@ class AgentState(TypedDict):
     sources: List[EvidenceItem]
     raw_content: Dict[str, str]  # url -> text
     extracted_signals: List[Signal]
+    search_timings: List[Dict[str, Any]]  # per-query latency/outcome
+    
+    # Freshness gate: a fresh cached dossier whose forced signal types get re-extracted
+    cached_dossier: Optional[AccountDossier]
+    refresh_signal_types: List[str]
     
     # Final Output
     dossier: AccountDossier
     error: str
 
+# --- Batched Extraction ---
+
+class _ExtractionRequest:
+    __slots__ = ("domain", "look_for", "context", "tokens", "future")
+
+    def __init__(self, domain: str, look_for: str, context: str, future: asyncio.Future):
+        self.domain = domain
+        self.look_for = look_for
+        self.context = context
+        self.tokens = estimate_tokens(context) + estimate_tokens(look_for) + 20
+        self.future = future
+
+class BatchedSignalExtractor:
+    """
+    Coalesces signal extraction for concurrent researcher runs into one LLM call.
+
+    Requests arriving within `max_wait_s` of the first one are grouped until the
+    batch hits the input token budget or the number of accounts whose answers fit
+    in the model's output limit. The model returns one signal list per domain.
+    If the batch call fails or an account is missing from the answer, those
+    accounts are re-run as ordinary single-account calls.
+    """
+
+    MAX_OUTPUT_TOKENS = 8192          # gemini-1.5-flash output limit
+    OUTPUT_TOKENS_PER_ACCOUNT = 600   # a full signal list for one account
+    PROMPT_OVERHEAD_TOKENS = 300
+
+    def __init__(self, llm: GeminiAdapter, max_wait_s: float = 0.25, max_input_tokens: int = 24_000):
+        self.llm = llm
+        self.max_wait_s = max_wait_s
+        self.max_input_tokens = max_input_tokens
+        self.max_accounts = self.MAX_OUTPUT_TOKENS // self.OUTPUT_TOKENS_PER_ACCOUNT
+        self._pending: List[_ExtractionRequest] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: Set[asyncio.Task] = set()  # in-flight batches (the loop only holds weak refs)
+        self.batches = 0
+        self.accounts = 0
+        self.fallbacks = 0
+
+    async def extract(self, domain: str, look_for: str, context_str: str) -> List[Dict[str, Any]]:
+        """Raw signal dicts for `domain`, extracted as part of the next batch."""
+        loop = asyncio.get_running_loop()
+        req = _ExtractionRequest(domain, look_for, context_str, loop.create_future())
+
+        pending_tokens = sum(r.tokens for r in self._pending) + self.PROMPT_OVERHEAD_TOKENS
+        if self._pending and (
+            pending_tokens + req.tokens > self.max_input_tokens
+            or any(r.domain == domain for r in self._pending)
+        ):
+            self._flush()
+        self._pending.append(req)
+        if len(self._pending) >= self.max_accounts:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait_s, self._flush)
+        return await req.future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.create_task(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: List[_ExtractionRequest]) -> None:
+        try:
+            if len(batch) == 1:
+                await self._single(batch[0])
+                return
+            self.batches += 1
+            self.accounts += len(batch)
+            try:
+                by_domain = await self._batch_call(batch)
+            except Exception as e:
+                logging.warning(f"Batched extraction of {len(batch)} accounts failed, falling back: {e}")
+                by_domain = {}
+            missing = [r for r in batch if r.domain not in by_domain]
+            for r in batch:
+                if r.domain in by_domain and not r.future.done():
+                    r.future.set_result(by_domain[r.domain])
+            self.fallbacks += len(missing)
+            await asyncio.gather(*(self._single(r) for r in missing))
+        finally:
+            for r in batch:
+                if not r.future.done():
+                    r.future.set_exception(RuntimeError(f"Extraction for {r.domain} did not complete"))
+
+    async def _batch_call(self, batch: List[_ExtractionRequest]) -> Dict[str, List[Dict[str, Any]]]:
+        sections = "\n".join(
+            f"""
+        === ACCOUNT: {r.domain} ===
+        Look for:
+        {r.look_for}
+        
+        Input Context:
+        {r.context}
+        """ for r in batch
+        )
+        prompt = f"""
+        Analyze the text below for each of these {len(batch)} accounts and extract structured signals 
+        according to the Signal schema. Use only that account's own context for its signals.
+        Return exactly one entry in "accounts" per domain: {", ".join(r.domain for r in batch)}.
+        {sections}
+        """
+        response = await self.llm.generate_json(prompt, BATCH_SIGNAL_SCHEMA)
+        by_domain = {}
+        for entry in response.get("accounts", []):
+            if isinstance(entry, dict) and isinstance(entry.get("signals"), list):
+                by_domain[str(entry.get("domain", "")).strip().lower()] = entry["signals"]
+        return {r.domain: by_domain[r.domain.lower()] for r in batch if r.domain.lower() in by_domain}
+
+    async def _single(self, req: _ExtractionRequest) -> None:
+        try:
+            response = await self.llm.generate_json(
+                extraction_prompt(req.domain, req.look_for, req.context), SIGNAL_LIST_SCHEMA
+            )
+            if not req.future.done():  # caller may have been cancelled meanwhile
+                req.future.set_result(response.get("signals", []))
+        except Exception as e:
+            if not req.future.done():
+                req.future.set_exception(e)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "batches": self.batches,
+            "accounts_batched": self.accounts,
+            "fallbacks": self.fallbacks,
+            "avg_batch_size": round(self.accounts / self.batches, 2) if self.batches else 0.0
+        }
+
 # --- Nodes ---
 
 class ResearcherNodes:
+    # Search fan-out limits (per run)
+    SEARCH_CONCURRENCY = 5
+    SEARCH_TIMEOUT_S = 8.0
+
     def __init__(self):
+        from app.core.config import settings
         self.llm = GeminiAdapter()
         self.search = TavilyAdapter()
         self.crm = HubSpotAdapter()
+        self.packer = EvidencePacker()
+        # Shared by every run on this (registry-cached) graph, so concurrent runs batch together
+        self.batcher = BatchedSignalExtractor(
+            self.llm,
+            max_wait_s=settings.RESEARCH_BATCH_MAX_WAIT_S,
+            max_input_tokens=settings.RESEARCH_BATCH_MAX_TOKENS
+        ) if settings.RESEARCH_BATCH_EXTRACTION else None
 
     async def check_existing_lock(self, state: AgentState) -> Dict:
-        """Check if we already have a recent run or lock."""
-        # TODO: Implement actual DB lock check. For now, pass.
-        return {"status": "COLLECTING"}
+        """
+        Freshness gate (RefreshPolicy).
+        - Dossier within ttl_days and nothing forced -> reuse it, skip the pipeline.
+        - Dossier within ttl_days with force_refresh_signals -> re-extract only those types.
+        - Otherwise -> full run.
+        """
+        policy = state["config"].refresh_policy
+        cached = await dossier_cache.get(state.get("workspace_id"), state["domain"], state["config"].config_id)
+        
+        if not cached or not dossier_cache.is_fresh(cached, policy.ttl_days):
+            return {"status": "COLLECTING"}
+        
+        if not policy.force_refresh_signals:
+            logging.info(f"Fresh dossier for {state['domain']} (ttl {policy.ttl_days}d). Skipping research.")
+            return {"dossier": cached, "status": "CACHED"}
+        
+        logging.info(f"Fresh dossier for {state['domain']}; refreshing only {policy.force_refresh_signals}")
+        return {
+            "cached_dossier": cached,
+            "refresh_signal_types": list(policy.force_refresh_signals),
+            "status": "COLLECTING"
+        }
 
     async def collect_sources(self, state: AgentState) -> Dict:
         """Gather data from Homepage + Search."""
@@ -53,10 +280,35 @@ class ResearcherNodes:
             f"{domain} tech stack"
         ]
         
+        # Fan out concurrently; a slow or failing query only loses its own results
+        semaphore = asyncio.Semaphore(self.SEARCH_CONCURRENCY)
+
+        async def run_query(q: str):
+            async with semaphore:
+                start = time.perf_counter()
+                try:
+                    results = await asyncio.wait_for(self.search.search(q, max_results=2), self.SEARCH_TIMEOUT_S)
+                    outcome = "ok"
+                except asyncio.TimeoutError:
+                    results, outcome = [], "timeout"
+                except Exception as e:
+                    logging.warning(f"Search failed for '{q}': {e}")
+                    results, outcome = [], "error"
+                timing = {
+                    "query": q,
+                    "status": outcome,
+                    "results": len(results),
+                    "ms": round((time.perf_counter() - start) * 1000, 1)
+                }
+                return results, timing
+
+        outcomes = await asyncio.gather(*(run_query(q) for q in queries))
+
         raw_results = []
-        for q in queries:
-            results = await self.search.search(q, max_results=2)
+        search_timings = []
+        for results, timing in outcomes:
             raw_results.extend(results)
+            search_timings.append(timing)
             
         # Dedupe and format as EvidenceItem
         seen_urls = set()
@@ -77,44 +329,31 @@ class ResearcherNodes:
                 reliability="MED"
             ))
             
-        return {"sources": evidence_list, "status": "EXTRACTING"}
+        return {"sources": evidence_list, "search_timings": search_timings, "status": "EXTRACTING"}
 
     async def extract_signals(self, state: AgentState) -> Dict:
         """Use LLM to extract signals from collected evidence."""
-        # Prepare context for LLM
-        context_str = ""
-        for item in state["sources"]:
-            context_str += f"Source: {item.url}\nContent: {item.excerpt}\n---\n"
-            
-        prompt = f"""
-        Analyze the following text from {state['domain']} and extract structured signals 
-        according to the Signal schema.
-        
-        Look for:
-        - Executive Hires (Sales, Marketing, Product)
-        - Funding Events (Series A, B, C)
-        - Tech Stack (CRM, Marketing Automation)
-        - GTM Tooling
-        
-        Input Context:
-        {context_str}
-        """
-        
-        # We need a list of signals. 
-        # For simplicity in v1, we ask for a wrapping object.
-        schema = {
-            "type": "object",
-            "properties": {
-                "signals": {
-                    "type": "array",
-                    "items": Signal.model_json_schema()
-                }
-            }
-        }
+        from app.core.config import settings
+
+        refresh_types = state.get("refresh_signal_types") or []
+
+        # Prepare context for LLM: deduped, most relevant passages within the token budget
+        packed = self.packer.pack(
+            state["sources"],
+            signal_types=refresh_types or None,
+            token_budget=settings.EVIDENCE_TOKEN_BUDGET
+        )
+        context_str = packed.text
+        logging.info(f"Evidence packed for {state['domain']}: {packed.stats()}")
+        look_for = look_for_text(refresh_types)
         
         try:
-            response = await self.llm.generate_json(prompt, schema)
-            signals_data = response.get("signals", [])
+            if self.batcher:
+                signals_data = await self.batcher.extract(state["domain"], look_for, context_str)
+            else:
+                prompt = extraction_prompt(state["domain"], look_for, context_str)
+                response = await self.llm.generate_json(prompt, SIGNAL_LIST_SCHEMA)
+                signals_data = response.get("signals", [])
             # Convert back to Pydantic models to validate
             valid_signals = []
             for s in signals_data:
@@ -125,6 +364,15 @@ class ResearcherNodes:
                     if state["sources"]:
                         s["evidence_ids"] = [state["sources"][0].evidence_id]
                 valid_signals.append(Signal(**s))
+            
+            # Partial refresh: keep cached signals for every type we didn't re-extract
+            cached = state.get("cached_dossier")
+            if cached and refresh_types:
+                valid_signals = [
+                    sig for sig in valid_signals if sig.signal_type in refresh_types
+                ] + [
+                    sig for sig in cached.signals if sig.signal_type not in refresh_types
+                ]
                 
             return {"extracted_signals": valid_signals, "status": "SCORING"}
             
@@ -193,13 +441,14 @@ class ResearcherNodes:
         
         db = SupabaseAdapter(workspace_id=workspace_id)
         
-        # Convert Pydantic to Dict
-        dossier_dict = state["dossier"].model_dump()
+        # Convert Pydantic to JSON-safe Dict
+        dossier_dict = state["dossier"].model_dump(mode="json")
         
         # Save with account_id
         success = await db.save_dossier(dossier_dict, account_id)
         if success:
             logging.info(f"Saved dossier for {state['domain']} to workspace {workspace_id}")
+            dossier_cache.put(workspace_id, state["dossier"])
             return {"status": "DONE"}
         else:
             return {"status": "FAILED", "error": "Database Save Failed"}
@@ -219,7 +468,20 @@ def create_researcher_graph():
     
     workflow.set_entry_point("check_existing_lock")
     
-    workflow.add_edge("check_existing_lock", "collect_sources")
+    # Fresh cached dossier -> done, no search/LLM spend
+    def check_freshness(state):
+        if state["status"] == "CACHED":
+            return END
+        return "collect_sources"
+        
+    workflow.add_conditional_edges(
+        "check_existing_lock",
+        check_freshness,
+        {
+            "collect_sources": "collect_sources",
+            END: END
+        }
+    )
     workflow.add_edge("collect_sources", "extract_signals")
     workflow.add_edge("extract_signals", "fit_scoring")
     workflow.add_edge("fit_scoring", "validate_and_veto")
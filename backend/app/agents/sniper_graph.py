@@ -7,6 +7,7 @@ from langgraph.graph import StateGraph, END
 
 from app.contracts.schemas import AccountDossier, DraftEmail, Hook, Claim, ResearchConfig
 from app.providers.adapters import GeminiAdapter
+from app.providers.prompt_registry import model_schema
 from app.contracts.schemas import EvidenceItem # Needed for context
 
 # --- State Definition ---
@@ -136,7 +137,7 @@ class SniperNodes:
         - No 'Unlock', 'Synergy', 'Game-changer'.
         """
         
-        schema = DraftEmail.model_json_schema()
+        schema = model_schema(DraftEmail)
         # Remove nested checks for v1 simplicity in prompting
         
         try:
@@ -0,0 +1,135 @@
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+# (fresh_until, expires_at, value). Caches without a stale period use fresh_until == expires_at.
+Entry = Tuple[float, float, str]
+
+_COLUMNS = ["key", "value", "fresh_until", "expires_at", "last_access", "meta"]
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS {table} (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    fresh_until REAL NOT NULL,
+    expires_at REAL NOT NULL,
+    last_access REAL NOT NULL,
+    meta TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_{table}_access ON {table}(last_access);
+"""
+CLEANUP_EVERY = 100  # writes between disk cleanups
+
+
+class CacheTier:
+    """
+    Two-tier text cache used by the LLM response and search result caches.
+
+    Tier 1: in-process LRU. Tier 2 (optional): a SQLite table shared across restarts
+    and workers. Both are size-bounded, least recently used first; expired disk rows
+    are removed in an amortized sweep every CLEANUP_EVERY writes. Methods block, so
+    async callers run disk lookups and writes in a worker thread.
+    """
+
+    def __init__(self, table: str, path: Optional[str], max_entries: int, max_disk_entries: int):
+        self.table = table
+        self.max_entries = max_entries
+        self.max_disk_entries = max_disk_entries
+        self._lru: "OrderedDict[str, Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        if path:
+            self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+            if path != ":memory:":
+                self._conn.execute("PRAGMA journal_mode=WAL")
+            columns = [row[1] for row in self._conn.execute(f"PRAGMA table_info({table})")]
+            if columns and columns != _COLUMNS:
+                # Written by an older layout; it is only a cache, so start over
+                self._conn.execute(f"DROP TABLE {table}")
+            self._conn.executescript(_SCHEMA.format(table=table))
+        self.writes = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._lru)
+
+    def _remember(self, key: str, entry: Entry) -> None:
+        self._lru[key] = entry
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.max_entries:
+            self._lru.popitem(last=False)
+
+    def get_memory(self, key: str) -> Optional[Entry]:
+        """Unexpired in-process entry (no disk access)."""
+        with self._lock:
+            entry = self._lru.get(key)
+            if entry is None:
+                return None
+            if entry[1] <= time.time():
+                del self._lru[key]
+                return None
+            self._lru.move_to_end(key)
+            return entry
+
+    def get_disk(self, key: str) -> Optional[Entry]:
+        """Unexpired SQLite entry, promoted into the LRU."""
+        if self._conn is None:
+            return None
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT fresh_until, expires_at, value FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or row[1] <= now:
+                return None
+            self._conn.execute(f"UPDATE {self.table} SET last_access = ? WHERE key = ?", (now, key))
+            entry = (row[0], row[1], row[2])
+            self._remember(key, entry)
+            return entry
+
+    def peek(self, key: str) -> Optional[Entry]:
+        """In-process entry even if expired, without touching recency."""
+        return self._lru.get(key)
+
+    def put(self, key: str, value: str, ttl_s: float, stale_ttl_s: Optional[float] = None,
+            meta: Optional[Dict[str, Any]] = None) -> None:
+        """Store `value`: fresh for `ttl_s`, then kept (stale) until `stale_ttl_s` if given."""
+        now = time.time()
+        entry = (now + ttl_s, now + max(ttl_s, stale_ttl_s or 0.0), value)
+        with self._lock:
+            self._remember(key, entry)
+            self.writes += 1
+            if self._conn is None:
+                return
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, fresh_until, expires_at, last_access, meta) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, value, entry[0], entry[1], now, json.dumps(meta) if meta else None)
+            )
+            # Amortized cleanup: expired rows, then least recently used beyond the bound
+            if self.writes % CLEANUP_EVERY == 0:
+                cur = self._conn.execute(f"DELETE FROM {self.table} WHERE expires_at <= ?", (now,))
+                self.evictions += cur.rowcount
+                cur = self._conn.execute(
+                    f"DELETE FROM {self.table} WHERE key IN ("
+                    f"  SELECT key FROM {self.table} ORDER BY last_access DESC LIMIT -1 OFFSET ?"
+                    ")", (self.max_disk_entries,)
+                )
+                self.evictions += cur.rowcount
+
+    def clear(self) -> None:
+        with self._lock:
+            self._lru.clear()
+            if self._conn is not None:
+                self._conn.execute(f"DELETE FROM {self.table}")
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def stats(self) -> Dict[str, int]:
+        return {"entries": len(self._lru), "writes": self.writes, "evictions": self.evictions}
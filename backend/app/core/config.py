@@ -1,4 +1,5 @@
 import os
+from typing import Dict
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
@@ -9,6 +10,7 @@ class Settings(BaseSettings):
     SUPABASE_URL: str
     SUPABASE_SERVICE_ROLE_KEY: str  # Changed from SUPABASE_KEY
     DEFAULT_WORKSPACE_ID: str = "00000000-0000-0000-0000-000000000001"
+    DB_THREADPOOL_SIZE: int = 16  # threads for blocking Supabase calls
     
     # LLM Provider (Default to Gemini as discussed)
     GOOGLE_API_KEY: str | None = None
@@ -17,6 +19,68 @@ class Settings(BaseSettings):
     # Services
     HUBSPOT_ACCESS_TOKEN: str | None = None
     TAVILY_API_KEY: str | None = None
+
+    # Shared HTTP pools (per-upstream overrides of max connections)
+    HTTP_POOL_LIMITS: Dict[str, int] = {}
+    HTTP_TIMEOUT_S: float | None = None
+
+    # HubSpot: concurrent company reads/writes within the window share one batch call
+    HUBSPOT_BATCHING: bool = True
+    HUBSPOT_BATCH_WAIT_S: float = 0.05
+
+    # HubSpot webhooks: events per record within this window launch a single research run
+    WEBHOOK_DEBOUNCE_S: float = 5.0
+
+    # Job Queue (durable agent runs)
+    JOB_QUEUE_PATH: str = "jobs.db"
+    JOB_CONCURRENCY: Dict[str, int] = {"RESEARCHER": 4}
+    JOB_MAX_ATTEMPTS: int = 3
+    JOB_VISIBILITY_TIMEOUT_S: float = 600.0
+    JOB_RETRY_BACKOFF_S: float = 5.0
+
+    # Agent run de-duplication: triggers for the same domain + config within this window
+    # share one run; a worker's lease on a run expires after RUN_LEASE_S unless the job
+    # heartbeat renews it
+    RESEARCH_DEDUP_WINDOW_S: float = 3600
+    RUN_LEASE_S: float = 900
+
+    # Listener correlation window (multi-signal archetypes)
+    SIGNAL_WINDOW_DAYS: float = 30
+    SIGNAL_WINDOW_PERSIST: bool = False  # mirror observations into the `signals` table
+    LISTENER_BATCH_MAX_EVENTS: int = 10_000  # per /listener/process/batch request
+
+    # LLM response cache (temperature-0 calls are deterministic enough to reuse)
+    LLM_CACHE_ENABLED: bool = True
+    LLM_CACHE_PATH: str = "llm_cache.db"
+    LLM_CACHE_TTL_S: float = 7 * 86400
+    LLM_CACHE_MAX_ENTRIES: int = 512
+    LLM_CACHE_MAX_DISK_ENTRIES: int = 50_000
+
+    # Web search result cache (TTL per query class: news / careers / company / default)
+    SEARCH_CACHE_ENABLED: bool = True
+    SEARCH_CACHE_PATH: str = "search_cache.db"
+    SEARCH_CACHE_TTLS: Dict[str, float] = {}  # seconds, overrides app.core.search_cache.DEFAULT_TTLS
+    SEARCH_CACHE_STALE_WHILE_REVALIDATE: bool = True
+    SEARCH_CACHE_MAX_ENTRIES: int = 1024
+
+    # Hygiene scans: without a HubSpot token the seeded demo CRM is scanned (records per entity)
+    HYGIENE_SEED_RECORDS: int = 15
+    # Incremental scans: per-workspace change cursor + stored issue set
+    HYGIENE_STORE_PATH: str = "hygiene.db"
+    HYGIENE_PERSIST_ISSUES: bool = True  # mirror issues + health score history to Supabase (migration 010)
+
+    # Evidence packing: max estimated input tokens of source text per LLM call
+    EVIDENCE_TOKEN_BUDGET: int = 3000
+
+    # Batched researcher extraction: concurrent runs share one LLM call
+    RESEARCH_BATCH_EXTRACTION: bool = False
+    RESEARCH_BATCH_MAX_WAIT_S: float = 0.25
+    RESEARCH_BATCH_MAX_TOKENS: int = 24_000
+
+    # External API rate limits, per provider (overrides app.core.ratelimit.PROVIDER_LIMITS;
+    # keys left out fall back to the provider default, then DEFAULT_LIMIT),
+    # e.g. {"gemini": {"rps": 2, "concurrency": 4}}
+    RATE_LIMITS: Dict[str, Dict[str, float]] = {}
     
     class Config:
         env_file = ".env"
@@ -0,0 +1,171 @@
+import time
+from dataclasses import dataclass, asdict
+from typing import Any, Dict, Optional
+
+import httpx
+
+from app.core.ratelimit import ProviderLimiter, parse_retry_after, rate_limits
+
+try:
+    import h2  # noqa: F401  (enables HTTP/2 in httpx)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# Per-upstream pool settings. Upstreams not listed here use "default".
+UPSTREAMS: Dict[str, Dict[str, Any]] = {
+    "default": {"timeout": 15.0, "max_connections": 20, "max_keepalive": 10},
+    "tavily": {"timeout": 20.0, "max_connections": 20, "max_keepalive": 10},
+    "hubspot": {"timeout": 10.0, "max_connections": 20, "max_keepalive": 10},
+    "web": {"timeout": 10.0, "max_connections": 100, "max_keepalive": 20, "follow_redirects": True},
+}
+
+
+@dataclass
+class PoolMetrics:
+    requests: int = 0
+    pool_hits: int = 0          # served on an already-open connection
+    new_connections: int = 0    # TCP connects (connection churn)
+    errors: int = 0
+    queue_wait_ms_total: float = 0.0
+    queue_wait_ms_max: float = 0.0
+
+    def snapshot(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data["queue_wait_ms_avg"] = round(self.queue_wait_ms_total / self.requests, 2) if self.requests else 0.0
+        data["hit_rate"] = round(self.pool_hits / self.requests, 3) if self.requests else 0.0
+        return data
+
+
+class _InstrumentedTransport(httpx.AsyncBaseTransport):
+    """
+    Wraps the pooled transport and uses httpcore trace events to tell whether a
+    request reused a connection, and how long it waited before it could start
+    sending (pool queue + connect time).
+
+    When the upstream has a rate limiter, every request takes a slot first and
+    reports its status back. A 429 with a short Retry-After is retried after the
+    limiter's pause instead of failing the caller.
+    """
+
+    MAX_THROTTLE_RETRIES = 2
+    MAX_RETRY_AFTER_S = 30.0
+
+    def __init__(self, inner: httpx.AsyncBaseTransport, metrics: PoolMetrics,
+                 limiter: Optional[ProviderLimiter] = None):
+        self.inner = inner
+        self.metrics = metrics
+        self.limiter = limiter
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if self.limiter is None:
+            return await self._send(request)
+
+        replayable = isinstance(request.stream, httpx.ByteStream)
+        for attempt in range(self.MAX_THROTTLE_RETRIES + 1):
+            async with self.limiter.slot() as permit:
+                response = await self._send(request)
+                retry_after = parse_retry_after(response.headers.get("retry-after"))
+                permit.observe(response.status_code, retry_after)
+            if (
+                response.status_code != 429
+                or not replayable
+                or attempt == self.MAX_THROTTLE_RETRIES
+                or (retry_after or 0.0) > self.MAX_RETRY_AFTER_S
+            ):
+                return response
+            await response.aclose()
+        return response
+
+    async def _send(self, request: httpx.Request) -> httpx.Response:
+        start = time.perf_counter()
+        seen = {"connecting": False, "waited_ms": None}
+        upstream_trace = request.extensions.get("trace")
+
+        async def trace(event: str, info: Dict[str, Any]) -> None:
+            if event == "connection.connect_tcp.started":
+                seen["connecting"] = True
+            elif event == "connection.connect_tcp.complete":
+                self.metrics.new_connections += 1
+            elif event.endswith("send_request_headers.started") and seen["waited_ms"] is None:
+                seen["waited_ms"] = (time.perf_counter() - start) * 1000
+            if upstream_trace:
+                await upstream_trace(event, info)
+
+        request.extensions["trace"] = trace
+        m = self.metrics
+        m.requests += 1
+        try:
+            response = await self.inner.handle_async_request(request)
+        except Exception:
+            m.errors += 1
+            raise
+        finally:
+            # Restore the caller's hook so a throttle retry doesn't wrap it twice
+            if upstream_trace:
+                request.extensions["trace"] = upstream_trace
+            else:
+                request.extensions.pop("trace", None)
+        if not seen["connecting"]:
+            m.pool_hits += 1
+        waited = seen["waited_ms"] or 0.0
+        m.queue_wait_ms_total += waited
+        m.queue_wait_ms_max = max(m.queue_wait_ms_max, waited)
+        return response
+
+    async def aclose(self) -> None:
+        await self.inner.aclose()
+
+
+class HttpClientPool:
+    """
+    Process-wide httpx clients, one per upstream, so adapters share keep-alive
+    connections instead of opening a client per call.
+    Opened/closed by the app lifespan; clients are also created lazily on first use.
+    """
+
+    def __init__(self, upstreams: Optional[Dict[str, Dict[str, Any]]] = None):
+        self.upstreams = upstreams or UPSTREAMS
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+        self._metrics: Dict[str, PoolMetrics] = {}
+
+    def _create(self, name: str) -> httpx.AsyncClient:
+        from app.core.config import settings
+
+        cfg = {**self.upstreams["default"], **self.upstreams.get(name, {})}
+        cfg["max_connections"] = settings.HTTP_POOL_LIMITS.get(name, cfg["max_connections"])
+        timeout = settings.HTTP_TIMEOUT_S or cfg["timeout"]
+
+        metrics = self._metrics.setdefault(name, PoolMetrics())
+        transport = httpx.AsyncHTTPTransport(
+            http2=HTTP2_AVAILABLE,
+            limits=httpx.Limits(max_connections=cfg["max_connections"],
+                                max_keepalive_connections=cfg["max_keepalive"]),
+            retries=1
+        )
+        return httpx.AsyncClient(
+            transport=_InstrumentedTransport(transport, metrics, rate_limits.get(name)),
+            timeout=httpx.Timeout(timeout, connect=min(5.0, timeout)),
+            follow_redirects=cfg.get("follow_redirects", False)
+        )
+
+    def get(self, name: str = "default") -> httpx.AsyncClient:
+        client = self._clients.get(name)
+        if client is None or client.is_closed:
+            client = self._clients[name] = self._create(name)
+        return client
+
+    def open(self) -> None:
+        for name in self.upstreams:
+            self.get(name)
+
+    async def aclose(self) -> None:
+        for client in self._clients.values():
+            await client.aclose()
+        self._clients.clear()
+
+    def metrics(self) -> Dict[str, Dict[str, Any]]:
+        return {name: m.snapshot() for name, m in self._metrics.items()}
+
+
+http_clients = HttpClientPool()
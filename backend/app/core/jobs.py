@@ -0,0 +1,279 @@
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger("gtm360-backend")
+
+# Job lifecycle: QUEUED -> RUNNING -> DONE
+#                          RUNNING -> QUEUED (retry with backoff) -> ... -> DEAD
+# A RUNNING job whose lease expired (worker crashed / restarted) is claimable again.
+QUEUED, RUNNING, DONE, DEAD = "QUEUED", "RUNNING", "DONE", "DEAD"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    agent_type TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    available_at REAL NOT NULL,
+    leased_until REAL,
+    run_id TEXT,
+    last_error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_claim ON jobs(agent_type, status, available_at);
+"""
+
+
+@dataclass
+class Job:
+    job_id: str
+    agent_type: str
+    payload: Dict[str, Any]
+    attempts: int
+    max_attempts: int
+    run_id: Optional[str] = None
+
+    @property
+    def is_last_attempt(self) -> bool:
+        return self.attempts >= self.max_attempts
+
+
+class JobQueue:
+    """
+    Durable job queue backed by a local SQLite file.
+
+    Jobs survive restarts; a claimed job is leased for `visibility_timeout` seconds
+    and becomes claimable again if the worker never acks it. SQLite calls are
+    blocking, so every public method offloads to a thread.
+    """
+
+    def __init__(self, path: str = "jobs.db", visibility_timeout: float = 600.0,
+                 retry_backoff: float = 5.0, max_backoff: float = 300.0):
+        self.path = path
+        self.visibility_timeout = visibility_timeout
+        self.retry_backoff = retry_backoff
+        self.max_backoff = max_backoff
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        if path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+
+    # --- sync internals (run in a worker thread) ---
+
+    def _enqueue(self, agent_type: str, payload: Dict[str, Any], max_attempts: int, delay: float) -> str:
+        job_id = str(uuid.uuid4())
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (job_id, agent_type, payload, status, max_attempts, available_at, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (job_id, agent_type, json.dumps(payload), QUEUED, max_attempts, now + delay, now, now)
+            )
+        return job_id
+
+    def _claim(self, agent_type: str) -> Optional[Job]:
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                while True:
+                    row = self._conn.execute(
+                        "SELECT * FROM jobs WHERE agent_type = ? AND ("
+                        "  (status = ? AND available_at <= ?) OR (status = ? AND leased_until < ?)"
+                        ") ORDER BY available_at LIMIT 1",
+                        (agent_type, QUEUED, now, RUNNING, now)
+                    ).fetchone()
+                    if row is None or row["attempts"] < row["max_attempts"]:
+                        break
+                    # Lease expired on the last attempt: the worker died mid-run, don't run it again
+                    self._conn.execute(
+                        "UPDATE jobs SET status = ?, leased_until = NULL, last_error = ?, updated_at = ? WHERE job_id = ?",
+                        (DEAD, row["last_error"] or "lease expired on final attempt", now, row["job_id"])
+                    )
+                if row is None:
+                    self._conn.execute("COMMIT")
+                    return None
+                self._conn.execute(
+                    "UPDATE jobs SET status = ?, attempts = attempts + 1, leased_until = ?, updated_at = ? WHERE job_id = ?",
+                    (RUNNING, now + self.visibility_timeout, now, row["job_id"])
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return Job(
+            job_id=row["job_id"],
+            agent_type=row["agent_type"],
+            payload=json.loads(row["payload"]),
+            attempts=row["attempts"] + 1,
+            max_attempts=row["max_attempts"],
+            run_id=row["run_id"],
+        )
+
+    def _update(self, job_id: str, **fields: Any) -> None:
+        fields["updated_at"] = time.time()
+        cols = ", ".join(f"{k} = ?" for k in fields)
+        with self._lock:
+            self._conn.execute(f"UPDATE jobs SET {cols} WHERE job_id = ?", (*fields.values(), job_id))
+
+    def _fail(self, job: Job, error: str) -> str:
+        if job.is_last_attempt:
+            self._update(job.job_id, status=DEAD, leased_until=None, last_error=error)
+            return DEAD
+        backoff = min(self.max_backoff, self.retry_backoff * 2 ** (job.attempts - 1))
+        self._update(job.job_id, status=QUEUED, leased_until=None, last_error=error,
+                     available_at=time.time() + backoff)
+        return QUEUED
+
+    def _stats(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT agent_type, status, COUNT(*) AS n FROM jobs GROUP BY agent_type, status"
+            ).fetchall()
+        stats: Dict[str, Dict[str, int]] = {}
+        for r in rows:
+            stats.setdefault(r["agent_type"], {})[r["status"]] = r["n"]
+        return stats
+
+    # --- async API ---
+
+    async def enqueue(self, agent_type: str, payload: Dict[str, Any], max_attempts: int = 3, delay: float = 0.0) -> str:
+        return await asyncio.to_thread(self._enqueue, agent_type, payload, max_attempts, delay)
+
+    async def claim(self, agent_type: str) -> Optional[Job]:
+        return await asyncio.to_thread(self._claim, agent_type)
+
+    async def complete(self, job: Job) -> None:
+        await asyncio.to_thread(self._update, job.job_id, status=DONE, leased_until=None)
+
+    async def fail(self, job: Job, error: str) -> str:
+        """Schedule a retry with exponential backoff, or mark the job DEAD. Returns the new status."""
+        return await asyncio.to_thread(self._fail, job, error)
+
+    async def extend_lease(self, job: Job) -> None:
+        await asyncio.to_thread(self._update, job.job_id, leased_until=time.time() + self.visibility_timeout)
+
+    async def set_run_id(self, job: Job, run_id: str) -> None:
+        job.run_id = run_id
+        await asyncio.to_thread(self._update, job.job_id, run_id=run_id)
+
+    async def stats(self) -> Dict[str, Dict[str, int]]:
+        return await asyncio.to_thread(self._stats)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_job_queue: Optional[JobQueue] = None
+
+
+def get_job_queue() -> JobQueue:
+    """Process-wide queue configured from settings, opened on first use."""
+    global _job_queue
+    if _job_queue is None:
+        from app.core.config import settings
+        _job_queue = JobQueue(
+            path=settings.JOB_QUEUE_PATH,
+            visibility_timeout=settings.JOB_VISIBILITY_TIMEOUT_S,
+            retry_backoff=settings.JOB_RETRY_BACKOFF_S
+        )
+    return _job_queue
+
+
+def close_job_queue() -> None:
+    global _job_queue
+    if _job_queue is not None:
+        _job_queue.close()
+        _job_queue = None
+
+
+JobHandler = Callable[[Job], Awaitable[None]]
+
+
+@dataclass
+class _Lane:
+    handler: JobHandler
+    concurrency: int
+    on_heartbeat: Optional[JobHandler] = None
+    tasks: List[asyncio.Task] = field(default_factory=list)
+
+
+class JobWorkerPool:
+    """
+    Runs queued jobs with a fixed number of workers per agent type, so a burst of
+    webhook events queues up instead of spawning one pipeline per event.
+    """
+
+    def __init__(self, queue: JobQueue, poll_interval: float = 1.0, heartbeat_s: Optional[float] = None):
+        self.queue = queue
+        self.poll_interval = poll_interval
+        self.heartbeat_s = heartbeat_s or queue.visibility_timeout / 2
+        self._lanes: Dict[str, _Lane] = {}
+
+    def register(self, agent_type: str, handler: JobHandler, concurrency: int = 1,
+                 on_heartbeat: Optional[JobHandler] = None) -> None:
+        """`on_heartbeat(job)` runs with every lease extension, e.g. to renew leases held elsewhere."""
+        self._lanes[agent_type] = _Lane(handler=handler, concurrency=max(1, concurrency), on_heartbeat=on_heartbeat)
+
+    def start(self) -> None:
+        for agent_type, lane in self._lanes.items():
+            for i in range(lane.concurrency):
+                lane.tasks.append(asyncio.create_task(self._worker(agent_type, lane), name=f"{agent_type}-worker-{i}"))
+        logger.info(f"Job workers started: { {k: l.concurrency for k, l in self._lanes.items()} }")
+
+    async def stop(self) -> None:
+        tasks = [t for lane in self._lanes.values() for t in lane.tasks]
+        for t in tasks:
+            t.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        for lane in self._lanes.values():
+            lane.tasks.clear()
+
+    async def _heartbeat(self, job: Job, lane: _Lane) -> None:
+        # Keep the lease alive while a long run is in progress
+        while True:
+            await asyncio.sleep(self.heartbeat_s)
+            await self.queue.extend_lease(job)
+            if lane.on_heartbeat:
+                try:
+                    await lane.on_heartbeat(job)
+                except Exception as e:
+                    logger.warning(f"Heartbeat hook failed for job {job.job_id}: {e}")
+
+    async def _worker(self, agent_type: str, lane: _Lane) -> None:
+        while True:
+            try:
+                job = await self.queue.claim(agent_type)
+            except Exception as e:
+                logger.error(f"Job claim failed for {agent_type}: {e}")
+                job = None
+
+            if job is None:
+                await asyncio.sleep(self.poll_interval)
+                continue
+
+            heartbeat = asyncio.create_task(self._heartbeat(job, lane))
+            try:
+                await lane.handler(job)
+                await self.queue.complete(job)
+            except asyncio.CancelledError:
+                # Shutdown mid-run: leave the lease to expire so another worker picks it up
+                raise
+            except Exception as e:
+                status = await self.queue.fail(job, str(e))
+                logger.error(f"Job {job.job_id} ({agent_type}) attempt {job.attempts}/{job.max_attempts} failed: {e} -> {status}")
+            finally:
+                heartbeat.cancel()
@@ -0,0 +1,94 @@
+import asyncio
+import hashlib
+import json
+from typing import Any, Dict, Optional
+
+from app.core.cache_tier import CacheTier
+
+
+def cache_key(model: str, kind: str, system_prompt: str, prompt: str, schema: Any = None) -> str:
+    """Content address of an LLM call. `schema` may be a dict or its serialized text."""
+    material = json.dumps(
+        {"model": model, "kind": kind, "system": system_prompt, "schema": schema, "prompt": prompt},
+        sort_keys=True, ensure_ascii=False
+    )
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    """
+    Deterministic response cache for temperature-0 LLM calls.
+
+    Responses live in a CacheTier (in-process LRU over a SQLite file shared across
+    restarts and workers). Values are stored as JSON text, so every hit returns a fresh
+    object that callers can mutate freely. Entries expire after `ttl_s`.
+    """
+
+    def __init__(self, path: Optional[str] = "llm_cache.db", ttl_s: float = 7 * 86400,
+                 max_entries: int = 512, max_disk_entries: int = 50_000):
+        self.ttl_s = ttl_s
+        self.tier = CacheTier("llm_cache", path, max_entries, max_disk_entries)
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    async def get(self, key: str) -> Any:
+        """Cached response for `key`, or None."""
+        entry = self.tier.get_memory(key)
+        if entry is not None:
+            self.hits += 1
+        else:
+            entry = await asyncio.to_thread(self.tier.get_disk, key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+        return json.loads(entry[2])
+
+    async def put(self, key: str, value: Any) -> None:
+        await asyncio.to_thread(self.tier.put, key, json.dumps(value, ensure_ascii=False), self.ttl_s)
+
+    def clear(self) -> None:
+        self.tier.clear()
+
+    def close(self) -> None:
+        self.tier.close()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.disk_hits + self.misses
+        tier = self.tier.stats()
+        return {
+            "entries": tier["entries"],
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.hits + self.disk_hits) / lookups, 3) if lookups else 0.0,
+            "writes": tier["writes"],
+            "evictions": tier["evictions"],
+        }
+
+
+_llm_cache: Optional[LLMResponseCache] = None
+
+
+def get_llm_cache() -> Optional[LLMResponseCache]:
+    """Process-wide cache configured from settings; None when LLM_CACHE_ENABLED is off."""
+    global _llm_cache
+    from app.core.config import settings
+    if not settings.LLM_CACHE_ENABLED:
+        return None
+    if _llm_cache is None:
+        _llm_cache = LLMResponseCache(
+            path=settings.LLM_CACHE_PATH,
+            ttl_s=settings.LLM_CACHE_TTL_S,
+            max_entries=settings.LLM_CACHE_MAX_ENTRIES,
+            max_disk_entries=settings.LLM_CACHE_MAX_DISK_ENTRIES
+        )
+    return _llm_cache
+
+
+def close_llm_cache() -> None:
+    global _llm_cache
+    if _llm_cache is not None:
+        _llm_cache.close()
+        _llm_cache = None
@@ -0,0 +1,264 @@
+import asyncio
+import heapq
+import itertools
+import time
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, List, Optional
+
+# Priority lanes: lower value is served first
+INTERACTIVE, BULK = 0, 1
+LANES = {INTERACTIVE: "interactive", BULK: "bulk"}
+
+# Request handlers run as INTERACTIVE; background job workers switch to BULK
+current_priority: ContextVar[int] = ContextVar("rate_limit_priority", default=INTERACTIVE)
+
+THROTTLE_STATUSES = (429, 503)
+
+# Per-provider defaults. `rps` is the ceiling AIMD recovers to.
+PROVIDER_LIMITS: Dict[str, Dict[str, float]] = {
+    "gemini": {"rps": 5.0, "burst": 5, "concurrency": 8},
+    "tavily": {"rps": 5.0, "burst": 5, "concurrency": 5},
+    "hubspot": {"rps": 9.0, "burst": 10, "concurrency": 10},  # HubSpot: 100 requests / 10s
+}
+# Base for every provider, so a RATE_LIMITS entry may set only some keys
+DEFAULT_LIMIT: Dict[str, float] = {"rps": 5.0, "burst": 1, "concurrency": 10}
+
+
+@contextmanager
+def rate_priority(priority: int):
+    """Run the enclosed calls (and tasks they spawn) in the given lane."""
+    token = current_priority.set(priority)
+    try:
+        yield
+    finally:
+        current_priority.reset(token)
+
+
+def is_throttle_error(exc: BaseException) -> bool:
+    """Best-effort detection of provider SDK rate-limit errors (e.g. google ResourceExhausted)."""
+    text = f"{type(exc).__name__} {exc}"
+    return "ResourceExhausted" in text or "RESOURCE_EXHAUSTED" in text or "429" in text
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds from a Retry-After header (delta-seconds or HTTP-date)."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class _LaneStats:
+    __slots__ = ("granted", "wait_ms_total", "wait_ms_max")
+
+    def __init__(self):
+        self.granted = 0
+        self.wait_ms_total = 0.0
+        self.wait_ms_max = 0.0
+
+
+class Permit:
+    """Handed out by `ProviderLimiter.slot`; report the upstream outcome through `observe`."""
+
+    def __init__(self, limiter: "ProviderLimiter"):
+        self.limiter = limiter
+        self.status: Optional[int] = None
+        self.retry_after: Optional[float] = None
+
+    def observe(self, status: Optional[int], retry_after: Optional[float] = None) -> None:
+        self.status = status
+        self.retry_after = retry_after
+
+
+class ProviderLimiter:
+    """
+    Token bucket + concurrency cap for one upstream, with AIMD rate control.
+
+    Every success nudges the rate back up (additive increase) towards `rps`; a
+    429/503 halves it (multiplicative decrease) and a Retry-After pauses the whole
+    provider until it expires. Waiters are served strictly by lane, then FIFO, so
+    an interactive request never queues behind bulk background work.
+    """
+
+    def __init__(self, name: str, rps: float, burst: int = 1, concurrency: int = 10,
+                 min_rps: Optional[float] = None):
+        self.name = name
+        self.max_rps = rps
+        self.min_rps = min_rps or rps / 10
+        self.rate = rps
+        self.burst = max(1, burst)
+        self.concurrency = concurrency
+        self.increase = rps / 50
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.in_flight = 0
+        self._waiters: List[tuple] = []   # (priority, seq, future)
+        self._seq = itertools.count()
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._lanes = {lane: _LaneStats() for lane in LANES}
+        self.throttled = 0
+        self.pauses = 0
+
+    # --- scheduling ---
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def _pump(self) -> None:
+        now = time.monotonic()
+        self._refill(now)
+        while self._waiters:
+            if self._waiters[0][2].done():        # cancelled while queued
+                heapq.heappop(self._waiters)
+                continue
+            if self.in_flight >= self.concurrency:
+                return                              # a release will pump again
+            if now < self.paused_until:
+                return self._wake_at(self.paused_until - now)
+            if self.tokens < 1:
+                return self._wake_at((1 - self.tokens) / self.rate)
+            _, _, fut = heapq.heappop(self._waiters)
+            self.tokens -= 1
+            self.in_flight += 1
+            fut.set_result(None)
+
+    def _wake_at(self, delay: float) -> None:
+        if self._timer is None:
+            def wake():
+                self._timer = None
+                self._pump()
+            self._timer = asyncio.get_running_loop().call_later(delay, wake)
+
+    async def acquire(self, priority: Optional[int] = None) -> None:
+        priority = current_priority.get() if priority is None else priority
+        start = time.perf_counter()
+        fut = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._seq), fut))
+        self._pump()
+        try:
+            await fut
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                self._release()                     # granted, but the caller went away
+            raise
+        waited = (time.perf_counter() - start) * 1000
+        lane = self._lanes[priority if priority in self._lanes else BULK]
+        lane.granted += 1
+        lane.wait_ms_total += waited
+        lane.wait_ms_max = max(lane.wait_ms_max, waited)
+
+    def _release(self) -> None:
+        self.in_flight -= 1
+        self._pump()
+
+    def release(self, status: Optional[int] = None, retry_after: Optional[float] = None) -> None:
+        """Free the slot and feed the outcome into AIMD."""
+        if status in THROTTLE_STATUSES:
+            self.throttled += 1
+            self.rate = max(self.min_rps, self.rate / 2)
+            self.tokens = min(self.tokens, 0.0)
+            if retry_after:
+                self.pauses += 1
+                self.paused_until = max(self.paused_until, time.monotonic() + retry_after)
+        elif status is not None and status < 400:
+            self.rate = min(self.max_rps, self.rate + self.increase)
+        self._release()
+
+    @asynccontextmanager
+    async def slot(self, priority: Optional[int] = None):
+        await self.acquire(priority)
+        permit = Permit(self)
+        try:
+            yield permit
+        finally:
+            self.release(permit.status, permit.retry_after)
+
+    def stats(self) -> Dict[str, Any]:
+        queued = {name: 0 for name in LANES.values()}
+        for priority, _, fut in self._waiters:
+            if not fut.done():
+                queued[LANES.get(priority, "bulk")] += 1
+        return {
+            "rate_rps": round(self.rate, 2),
+            "max_rps": self.max_rps,
+            "in_flight": self.in_flight,
+            "concurrency": self.concurrency,
+            "queued": queued,
+            "granted": {LANES[k]: v.granted for k, v in self._lanes.items()},
+            "wait_ms_avg": {
+                LANES[k]: round(v.wait_ms_total / v.granted, 2) if v.granted else 0.0
+                for k, v in self._lanes.items()
+            },
+            "wait_ms_max": {LANES[k]: round(v.wait_ms_max, 2) for k, v in self._lanes.items()},
+            "throttled": self.throttled,
+            "retry_after_pauses": self.pauses,
+            "paused_for_s": round(max(0.0, self.paused_until - time.monotonic()), 2),
+        }
+
+
+class RateLimitRegistry:
+    """Process-wide limiters keyed by provider name. Providers without limits get None."""
+
+    def __init__(self, limits: Optional[Dict[str, Dict[str, float]]] = None):
+        self._limits = limits
+        self._limiters: Dict[str, ProviderLimiter] = {}
+
+    @property
+    def limits(self) -> Dict[str, Dict[str, float]]:
+        if self._limits is None:
+            from app.core.config import settings
+            self._limits = {
+                name: {**PROVIDER_LIMITS.get(name, {}), **settings.RATE_LIMITS.get(name, {})}
+                for name in {**PROVIDER_LIMITS, **settings.RATE_LIMITS}
+            }
+        return self._limits
+
+    def get(self, name: str) -> Optional[ProviderLimiter]:
+        limiter = self._limiters.get(name)
+        if limiter is None and name in self.limits:
+            cfg = {**DEFAULT_LIMIT, **self.limits[name]}
+            limiter = self._limiters[name] = ProviderLimiter(
+                name,
+                rps=float(cfg["rps"]),
+                burst=int(cfg["burst"]),
+                concurrency=int(cfg["concurrency"]),
+                min_rps=cfg.get("min_rps")
+            )
+        return limiter
+
+    @asynccontextmanager
+    async def slot(self, name: str, priority: Optional[int] = None):
+        limiter = self.get(name)
+        if limiter is None:
+            yield Permit(None)
+            return
+        async with limiter.slot(priority) as permit:
+            yield permit
+
+    @asynccontextmanager
+    async def guard(self, name: str, priority: Optional[int] = None):
+        """`slot` for SDK calls without an HTTP status: the outcome is inferred from exceptions."""
+        async with self.slot(name, priority) as permit:
+            try:
+                yield permit
+            except Exception as e:
+                if is_throttle_error(e):
+                    permit.observe(429)
+                raise
+            permit.observe(200)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {name: limiter.stats() for name, limiter in self._limiters.items()}
+
+
+rate_limits = RateLimitRegistry()
@@ -0,0 +1,227 @@
+import asyncio
+import hashlib
+import json
+import logging
+import re
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from app.core.cache_tier import CacheTier, Entry
+from app.core.ratelimit import BULK, rate_priority
+
+HOUR_S = 3600.0
+DAY_S = 86400.0
+
+# Freshness per query class, checked in order. Funding/news moves daily; careers pages
+# change over days; pricing, customers and tech stack over weeks.
+QUERY_CLASSES: List[Tuple[str, Tuple[str, ...]]] = [
+    ("news", ("funding", "series", "raised", "raises", "crunchbase", "news", "press", "announces", "blog")),
+    ("careers", ("careers", "jobs", "hiring", "job openings")),
+    ("company", ("tech stack", "pricing", "customers", "case studies", "integrations", "about")),
+]
+DEFAULT_TTLS: Dict[str, float] = {
+    "news": 6 * HOUR_S,
+    "careers": 3 * DAY_S,
+    "company": 7 * DAY_S,
+    "default": 1 * DAY_S,
+}
+EMPTY_RESULT_TTL_S = 1 * HOUR_S  # an empty result may be a transient upstream miss
+STALE_MULTIPLIER = 4             # stale entries stay servable (while refreshing) for 4x their TTL
+
+_URL_PREFIX = re.compile(r"^(https?://)?(www\.)?")
+_OPERATORS = {"OR", "AND", "NOT"}
+_WORDS = re.compile(r"[a-z0-9]+")
+
+
+def normalize_query(query: str) -> str:
+    """
+    Canonical form of a search query: unified quotes, collapsed whitespace, lowercase
+    terms, bare domains (no scheme / www / trailing slash). Boolean operators keep
+    their case because search engines treat `or` and `OR` differently.
+    """
+    query = query.replace("“", '"').replace("”", '"').replace("’", "'")
+    terms = []
+    for term in query.split():
+        if term in _OPERATORS:
+            terms.append(term)
+            continue
+        term = term.lower()
+        prefix = ""
+        if term.startswith("site:"):
+            prefix, term = "site:", term[5:]
+        if "." in term:
+            term = _URL_PREFIX.sub("", term).rstrip("/")
+        terms.append(prefix + term)
+    return " ".join(terms)
+
+
+def query_terms(query: str) -> List[str]:
+    """Words of a query, leaving out domains and URLs (about.me is not an "about" query)."""
+    words = []
+    for term in normalize_query(query).split():
+        if term.startswith("site:") or "." in term:
+            continue
+        words.extend(_WORDS.findall(term))
+    return words
+
+
+def query_class(query: str) -> str:
+    # Keywords (including multi-word ones) must match whole terms: "blog" doesn't match "blogger"
+    padded = f" {' '.join(query_terms(query))} "
+    for name, keywords in QUERY_CLASSES:
+        if any(f" {kw} " in padded for kw in keywords):
+            return name
+    return "default"
+
+
+def search_key(query: str, max_results: int, depth: str) -> str:
+    material = json.dumps({"query": normalize_query(query), "max_results": max_results, "depth": depth},
+                          sort_keys=True)
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class SearchResultCache:
+    """
+    Cache of raw web search results, keyed on normalized query + max_results + depth.
+
+    Stored in a CacheTier (in-process LRU over a SQLite file), like LLM responses.
+    Each entry is fresh for its query class TTL, then stale for up to
+    STALE_MULTIPLIER x TTL. With `stale_while_revalidate` a stale entry is returned
+    immediately and refreshed in the background (bulk rate-limit lane); without it
+    stale entries count as misses. Concurrent lookups of the same key share one
+    upstream call.
+    """
+
+    def __init__(self, path: Optional[str] = "search_cache.db", ttls: Optional[Dict[str, float]] = None,
+                 stale_while_revalidate: bool = True, max_entries: int = 1024,
+                 max_disk_entries: int = 50_000):
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self.stale_while_revalidate = stale_while_revalidate
+        self.tier = CacheTier("search_cache", path, max_entries, max_disk_entries)
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._refreshing: Set[asyncio.Task] = set()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.refreshes = 0
+        self.refresh_errors = 0
+
+    # --- sync internals (disk access runs in a worker thread) ---
+
+    def _lookup(self, key: str) -> Optional[Entry]:
+        return self.tier.get_memory(key) or self.tier.get_disk(key)
+
+    def _put(self, key: str, query: str, value: str, empty: bool) -> None:
+        cls = query_class(query)
+        ttl = self.ttls.get(cls, self.ttls["default"])
+        if empty:
+            ttl = min(ttl, EMPTY_RESULT_TTL_S)
+        self.tier.put(key, value, ttl, ttl * STALE_MULTIPLIER,
+                      meta={"query": normalize_query(query), "query_class": cls})
+
+    # --- async API ---
+
+    async def fetch(self, query: str, max_results: int, depth: str,
+                    loader: Callable[[], Awaitable[List[Dict[str, Any]]]]) -> List[Dict[str, Any]]:
+        """Cached results for the query, calling `loader()` on a miss. Returns a fresh copy."""
+        key = search_key(query, max_results, depth)
+        entry = await asyncio.to_thread(self._lookup, key)
+        if entry is not None:
+            fresh_until, _, value = entry
+            if fresh_until > time.time():
+                self.hits += 1
+                return json.loads(value)
+            if self.stale_while_revalidate:
+                self.stale_hits += 1
+                if key not in self._inflight:
+                    self._start(key, query, loader, background=True)
+                return json.loads(value)
+
+        task = self._inflight.get(key)
+        if task is None:
+            self.misses += 1
+            task = self._start(key, query, loader)
+        else:
+            self.coalesced += 1
+        # Shielded: a caller timing out must not cancel the call other callers wait on
+        return json.loads(await asyncio.shield(task))
+
+    def _start(self, key: str, query: str, loader, background: bool = False) -> asyncio.Task:
+        task = asyncio.create_task(self._load(key, query, loader, background))
+        self._inflight[key] = task
+        if background:
+            self._refreshing.add(task)
+            task.add_done_callback(self._refreshing.discard)
+        return task
+
+    async def _load(self, key: str, query: str, loader, background: bool) -> str:
+        try:
+            if background:
+                self.refreshes += 1
+                with rate_priority(BULK):
+                    results = await loader()
+            else:
+                results = await loader()
+            value = json.dumps(results, ensure_ascii=False)
+            await asyncio.to_thread(self._put, key, query, value, not results)
+            return value
+        except Exception as e:
+            if not background:
+                raise
+            self.refresh_errors += 1
+            logging.warning(f"Search cache refresh failed for '{query}': {e}")
+            entry = self.tier.peek(key)
+            return entry[2] if entry else "[]"
+        finally:
+            self._inflight.pop(key, None)
+
+    def clear(self) -> None:
+        self.tier.clear()
+
+    def close(self) -> None:
+        for task in list(self._refreshing):
+            task.cancel()
+        self.tier.close()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.stale_hits + self.misses + self.coalesced
+        tier = self.tier.stats()
+        return {
+            "entries": tier["entries"],
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_rate": round((self.hits + self.stale_hits) / lookups, 3) if lookups else 0.0,
+            "refreshes": self.refreshes,
+            "refresh_errors": self.refresh_errors,
+            "writes": tier["writes"],
+            "evictions": tier["evictions"],
+        }
+
+
+_search_cache: Optional[SearchResultCache] = None
+
+
+def get_search_cache() -> Optional[SearchResultCache]:
+    """Process-wide cache configured from settings; None when SEARCH_CACHE_ENABLED is off."""
+    global _search_cache
+    from app.core.config import settings
+    if not settings.SEARCH_CACHE_ENABLED:
+        return None
+    if _search_cache is None:
+        _search_cache = SearchResultCache(
+            path=settings.SEARCH_CACHE_PATH,
+            ttls=settings.SEARCH_CACHE_TTLS,
+            stale_while_revalidate=settings.SEARCH_CACHE_STALE_WHILE_REVALIDATE,
+            max_entries=settings.SEARCH_CACHE_MAX_ENTRIES
+        )
+    return _search_cache
+
+
+def close_search_cache() -> None:
+    global _search_cache
+    if _search_cache is not None:
+        _search_cache.close()
+        _search_cache = None
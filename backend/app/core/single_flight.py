@@ -0,0 +1,46 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict
+
+
+class SingleFlight:
+    """
+    In-process call de-duplication: while a call for `key` is running, other callers
+    with the same key wait for its outcome (result or exception) instead of starting
+    their own. Nothing is cached once the call finishes.
+    """
+
+    def __init__(self):
+        self._calls: Dict[str, asyncio.Future] = {}
+        self.leaders = 0
+        self.followers = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        fut = self._calls.get(key)
+        if fut is not None:
+            self.followers += 1
+            # Shielded: a follower being cancelled must not cancel the leader's outcome
+            return await asyncio.shield(fut)
+
+        fut = self._calls[key] = asyncio.get_running_loop().create_future()
+        # Mark the outcome retrieved, so a leader failing without followers isn't logged twice
+        fut.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self.leaders += 1
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            fut.cancel()
+            raise
+        except Exception as e:
+            fut.set_exception(e)
+            raise
+        else:
+            fut.set_result(result)
+            return result
+        finally:
+            self._calls.pop(key, None)
+
+    def in_flight(self, key: str) -> bool:
+        return key in self._calls
+
+    def stats(self) -> Dict[str, int]:
+        return {"in_flight": len(self._calls), "leaders": self.leaders, "followers": self.followers}
@@ -1,13 +1,43 @@
 import os
+import asyncio
+import hashlib
+import json
+import logging
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional, Tuple
 from supabase import create_client, Client
 from app.core.config import settings
 
-def get_supabase_client() -> Client:
-    """Get Supabase client with service role key (bypasses RLS for agents)"""
-    url: str = settings.SUPABASE_URL
-    key: str = settings.SUPABASE_SERVICE_ROLE_KEY
-    supabase: Client = create_client(url, key)
-    return supabase
+# One client per (url, key) for the whole process. supabase-py clients are
+# sync, so queries are executed on a dedicated thread pool (see execute_async)
+# to keep them off the event loop.
+_clients: Dict[Tuple[str, str], Client] = {}
+_clients_lock = threading.Lock()
+_db_executor = ThreadPoolExecutor(max_workers=settings.DB_THREADPOOL_SIZE, thread_name_prefix="supabase")
+
+def get_supabase_client(url: str | None = None, key: str | None = None) -> Client:
+    """Get the shared Supabase client with service role key (bypasses RLS for agents)"""
+    url = url or settings.SUPABASE_URL
+    key = key or settings.SUPABASE_SERVICE_ROLE_KEY
+    client = _clients.get((url, key))
+    if client is None:
+        with _clients_lock:
+            client = _clients.get((url, key))
+            if client is None:
+                client = _clients[(url, key)] = create_client(url, key)
+    return client
+
+async def execute_async(query: Any) -> Any:
+    """Run a PostgREST query/RPC builder's blocking execute() off the event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_db_executor, query.execute)
+
+# Lease owner for agent runs claimed by this process
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}"
 
 def get_workspace_id() -> str:
     """Get current workspace ID (default workspace for single-tenant deployment)"""
@@ -35,14 +65,86 @@ async def create_agent_run_rpc(
         run_id: UUID of the created agent run
     """
     client = get_supabase_client()
-    result = client.rpc('create_agent_run', {
+    result = await execute_async(client.rpc('create_agent_run', {
         'p_workspace_id': workspace_id,
         'p_idempotency_key': idempotency_key,
         'p_agent_type': agent_type,
         'p_account_id': account_id,
         'p_inputs': inputs
-    }).execute()
-    return result.data
+    }))
+    return _agent_run_row(result.data)["run_id"]
+
+def run_idempotency_key(agent_type: str, domain: str, config: Any, window_s: float,
+                        now: Optional[float] = None) -> str:
+    """
+    Deterministic key for "this agent, this account, this config, this time window".
+    Every trigger for the same domain and config within one window maps to one run.
+    `config` is a pydantic model (e.g. ResearchConfig); any field change gives a new key.
+    """
+    domain = domain.strip().lower().removeprefix("https://").removeprefix("http://").removeprefix("www.").rstrip("/")
+    config_json = json.dumps(config.model_dump(mode="json"), sort_keys=True)
+    config_hash = hashlib.sha256(config_json.encode("utf-8")).hexdigest()[:12]
+    bucket = int((time.time() if now is None else now) // window_s)
+    return f"{agent_type.lower()}:{domain}:{config.config_id}:{config_hash}:{bucket}"
+
+def _agent_run_row(data: Any) -> Dict[str, Any]:
+    # create_agent_run returns a bare UUID before migration 009, a one-row table after it
+    if isinstance(data, list):
+        data = data[0] if data else {}
+    if isinstance(data, dict):
+        return data
+    return {"run_id": data, "status": "PENDING", "lease_acquired": True}
+
+async def claim_agent_run_rpc(
+    workspace_id: str,
+    idempotency_key: str,
+    agent_type: str,
+    account_id: str | None,
+    inputs: dict,
+    lease_seconds: float,
+    lease_owner: str = WORKER_ID
+) -> Dict[str, Any]:
+    """
+    Create or claim the agent run for `idempotency_key`, taking a lease on it.
+    
+    Returns:
+        {"run_id", "status", "lease_acquired"}. lease_acquired is False when the run
+        already COMPLETED or another worker holds a live lease; the caller should
+        not execute it.
+    """
+    client = get_supabase_client()
+    try:
+        result = await execute_async(client.rpc('create_agent_run', {
+            'p_workspace_id': workspace_id,
+            'p_idempotency_key': idempotency_key,
+            'p_agent_type': agent_type,
+            'p_account_id': account_id,
+            'p_inputs': inputs,
+            'p_lease_owner': lease_owner,
+            'p_lease_seconds': int(lease_seconds)
+        }))
+    except Exception as e:
+        # PGRST202: no create_agent_run with lease parameters (migration 009 not applied)
+        if getattr(e, "code", None) != "PGRST202":
+            raise
+        logging.warning("create_agent_run has no lease support; apply migration 009")
+        run_id = await create_agent_run_rpc(workspace_id, idempotency_key, agent_type, account_id, inputs)
+        return {"run_id": run_id, "status": "PENDING", "lease_acquired": True}
+    return _agent_run_row(result.data)
+
+async def renew_agent_run_lease(run_id: str, lease_seconds: float, lease_owner: str = WORKER_ID) -> bool:
+    """
+    Push the run's lease_expires_at forward while `lease_owner` still holds it, so a
+    run that outlives its first lease is not taken over by another worker.
+    Returns False when the lease was lost (another worker took the run over).
+    """
+    now = datetime.now(timezone.utc)
+    client = get_supabase_client()
+    result = await execute_async(client.table("agent_runs").update({
+        "lease_expires_at": (now + timedelta(seconds=lease_seconds)).isoformat(),
+        "updated_at": now.isoformat()
+    }).eq("run_id", run_id).eq("lease_owner", lease_owner))
+    return bool(result.data)
 
 async def create_or_get_account_rpc(
     workspace_id: str,
@@ -62,9 +164,32 @@ async def create_or_get_account_rpc(
         account_id: UUID of the account
     """
     client = get_supabase_client()
-    result = client.rpc('create_or_get_account', {
+    result = await execute_async(client.rpc('create_or_get_account', {
         'p_workspace_id': workspace_id,
         'p_domain': domain,
         'p_record_id': record_id
-    }).execute()
+    }))
     return result.data
+
+async def update_agent_run_status(
+    run_id: str,
+    status: str,
+    error_message: str | None = None,
+    duration_ms: int | None = None
+) -> None:
+    """
+    Update the lifecycle fields of an agent run.
+    
+    Args:
+        run_id: UUID of the agent run
+        status: PENDING | RUNNING | COMPLETED | FAILED
+        error_message: Optional failure reason
+        duration_ms: Optional wall-clock duration of the run
+    """
+    fields = {"status": status, "updated_at": datetime.now(timezone.utc).isoformat()}
+    if error_message is not None:
+        fields["error_message"] = error_message
+    if duration_ms is not None:
+        fields["duration_ms"] = duration_ms
+    client = get_supabase_client()
+    await execute_async(client.table("agent_runs").update(fields).eq("run_id", run_id))
@@ -1,37 +1,92 @@
 from fastapi import FastAPI, Request, BackgroundTasks, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
+from contextlib import asynccontextmanager
+import asyncio
+import json
 import logging
-from typing import Dict, Any
+import time
+from typing import Dict, Any, List, Optional
 
-from app.agents.researcher_graph import create_researcher_graph
+from app.agents.registry import graph_registry
 from app.contracts.schemas import ResearchConfig, RefreshPolicy
+from app.core.config import settings
+from app.core.http import http_clients
+from app.core.jobs import Job, JobWorkerPool, close_job_queue, get_job_queue
+from app.core.llm_cache import close_llm_cache, get_llm_cache
+from app.core.ratelimit import BULK, rate_limits, rate_priority
+from app.core.search_cache import close_search_cache, get_search_cache
+from app.core.single_flight import SingleFlight
+from app.services.webhook_ingest import WebhookCoalescer
 
 # Setup Logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("gtm360-backend")
 
-app = FastAPI(title="GTM360 Revenue OS")
+research_flights = SingleFlight()
+
+async def enqueue_webhook_research(record_id: str, info: Dict[str, Any]):
+    await get_job_queue().enqueue("RESEARCHER", {"domain": "TBD", "record_id": record_id},
+                            max_attempts=settings.JOB_MAX_ATTEMPTS)
+
+webhook_coalescer = WebhookCoalescer(enqueue_webhook_research, debounce_s=settings.WEBHOOK_DEBOUNCE_S)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Shared HTTP pools for every adapter, then compile every agent graph once.
+    http_clients.open()
+    graph_registry.build_all()
+    # The job queue opens here (not on import), at JOB_QUEUE_PATH
+    # Heartbeats renew both the job lease and the agent run lease, well before either expires
+    job_workers = JobWorkerPool(get_job_queue(),
+                                heartbeat_s=min(settings.JOB_VISIBILITY_TIMEOUT_S, settings.RUN_LEASE_S) / 3)
+    job_workers.register("RESEARCHER", researcher_job_handler,
+                         concurrency=settings.JOB_CONCURRENCY.get("RESEARCHER", 1),
+                         on_heartbeat=renew_research_run_lease)
+    job_workers.start()
+    if settings.SIGNAL_WINDOW_PERSIST:
+        from app.agents.listener_graph import get_signal_window
+        loaded = await get_signal_window().load()
+        logger.info(f"Signal window restored from {loaded} stored signals")
+    yield
+    if settings.SIGNAL_WINDOW_PERSIST:
+        from app.agents.listener_graph import get_signal_window
+        await get_signal_window().flush()
+    # Enqueue runs for webhook windows still open; the queue persists them
+    await webhook_coalescer.flush()
+    await job_workers.stop()
+    close_job_queue()
+    # Let HubSpot batches already flushed finish before the HTTP pools close
+    from app.providers.adapters import close_hubspot_batcher
+    await close_hubspot_batcher()
+    graph_registry.clear()
+    close_llm_cache()
+    close_search_cache()
+    from app.services.hygiene_store import close_hygiene_store
+    close_hygiene_store()
+    await http_clients.aclose()
+
+app = FastAPI(title="GTM360 Revenue OS", lifespan=lifespan)
 
 # --- Utilities ---
-async def run_researcher_bg(domain: str, record_id: str):
-    """Background task to run the Researcher Agent with workspace support."""
+async def run_researcher_bg(domain: str, record_id: str, job: Job | None = None):
+    """
+    Run the Researcher Agent with workspace support.
+    Executed by the job workers; raising lets the queue retry with backoff.
+    """
     from app.providers.adapters import HubSpotAdapter, SupabaseAdapter
-    from app.core.supabase import create_agent_run_rpc, get_workspace_id
-    import uuid
+    from app.core.supabase import get_workspace_id, run_idempotency_key
     
     # 0. Resolve Domain if missing
     if domain == "TBD":
-        try:
-            crm = HubSpotAdapter()
-            company = await crm.read_company(record_id)
-            domain = company.get("properties", {}).get("domain")
-            if not domain:
-                 logger.warning(f"No domain found for record {record_id}. Aborting.")
-                 return
-            logger.info(f"Resolved domain {domain} for record {record_id}")
-        except Exception as e:
-            logger.error(f"Failed to resolve domain for {record_id}: {e}")
-            return
+        crm = HubSpotAdapter()
+        company = await crm.read_company(record_id)
+        domain = company.get("properties", {}).get("domain")
+        if not domain:
+             # Not retryable: the record simply has no domain
+             logger.warning(f"No domain found for record {record_id}. Aborting.")
+             return
+        logger.info(f"Resolved domain {domain} for record {record_id}")
 
     logger.info(f"Starting Researcher for {domain} (Record: {record_id})")
     
@@ -40,32 +95,10 @@ async def run_researcher_bg(domain: str, record_id: str):
     
     # 2. Ensure account exists and get account_id
     db = SupabaseAdapter(workspace_id=workspace_id)
-    try:
-        account_id = await db.ensure_account(domain, record_id)
-        logger.info(f"Account ID for {domain}: {account_id}")
-    except Exception as e:
-        logger.error(f"Failed to create/get account for {domain}: {e}")
-        return
+    account_id = await db.ensure_account(domain, record_id)
+    logger.info(f"Account ID for {domain}: {account_id}")
     
-    # 3. Create agent_run via RPC
-    idempotency_key = f"researcher-{domain}-{uuid.uuid4()}"
-    try:
-        run_id = await create_agent_run_rpc(
-            workspace_id=workspace_id,
-            idempotency_key=idempotency_key,
-            agent_type='RESEARCHER',
-            account_id=account_id,
-            inputs={'domain': domain, 'record_id': record_id}
-        )
-        logger.info(f"Created agent run: {run_id}")
-    except Exception as e:
-        logger.error(f"Failed to create agent run for {domain}: {e}")
-        return
-    
-    # 4. Initialize Graph
-    graph = create_researcher_graph()
-    
-    # 5. Config (Load from DB in real v1, hardcode for MVP)
+    # 3. Config (Load from DB in real v1, hardcode for MVP)
     config = ResearchConfig(
         config_id="default_v1",
         proposition="Auto-Research",
@@ -74,7 +107,40 @@ async def run_researcher_bg(domain: str, record_id: str):
         refresh_policy=RefreshPolicy()
     )
     
-    # 6. Initial State with workspace context
+    # 4. One run per (domain, config, time window): concurrent triggers in this process
+    # wait for the in-flight run; the run lease keeps other workers from repeating it
+    idempotency_key = run_idempotency_key("RESEARCHER", domain, config, settings.RESEARCH_DEDUP_WINDOW_S)
+    await research_flights.do(idempotency_key, lambda: execute_research_run(
+        domain, record_id, config, workspace_id, account_id, idempotency_key, job
+    ))
+
+async def execute_research_run(domain: str, record_id: str, config: ResearchConfig, workspace_id: str,
+                               account_id: str, idempotency_key: str, job: Job | None = None):
+    from app.core.supabase import claim_agent_run_rpc, update_agent_run_status
+    
+    # 5. Claim the agent_run via RPC (retries of the same job reuse the same run)
+    run_id = job.run_id if job else None
+    if not run_id:
+        claim = await claim_agent_run_rpc(
+            workspace_id=workspace_id,
+            idempotency_key=idempotency_key,
+            agent_type='RESEARCHER',
+            account_id=account_id,
+            inputs={'domain': domain, 'record_id': record_id},
+            lease_seconds=settings.RUN_LEASE_S
+        )
+        run_id = claim["run_id"]
+        if not claim["lease_acquired"]:
+            logger.info(f"Skipping duplicate research for {domain}: run {run_id} is {claim['status']}")
+            return
+        if job:
+            await get_job_queue().set_run_id(job, run_id)
+        logger.info(f"Claimed agent run: {run_id}")
+    
+    # 6. Get compiled Graph
+    graph = await graph_registry.get("researcher")
+    
+    # 7. Initial State with workspace context
     initial_state = {
         "domain": domain,
         "record_id": record_id,
@@ -85,16 +151,43 @@ async def run_researcher_bg(domain: str, record_id: str):
         "sources": [],
         "raw_content": {},
         "extracted_signals": [],
+        "search_timings": [],
+        "cached_dossier": None,
+        "refresh_signal_types": [],
         "dossier": None,
         "error": None
     }
     
-    # 7. Invoke
+    # 8. Invoke (keeping agent_runs.status in sync)
+    await update_agent_run_status(run_id, "RUNNING")
+    started = time.perf_counter()
     try:
         final_state = await graph.ainvoke(initial_state)
-        logger.info(f"Researcher Finished for {domain}. Status: {final_state.get('status')}")
     except Exception as e:
         logger.error(f"Researcher Failed for {domain}: {e}")
+        # Leave the run PENDING while the queue still has retries left
+        status = "FAILED" if job is None or job.is_last_attempt else "PENDING"
+        await update_agent_run_status(run_id, status, error_message=str(e),
+                                      duration_ms=int((time.perf_counter() - started) * 1000))
+        raise
+
+    duration_ms = int((time.perf_counter() - started) * 1000)
+    logger.info(f"Researcher Finished for {domain}. Status: {final_state.get('status')}")
+    if final_state.get("status") == "FAILED":
+        await update_agent_run_status(run_id, "FAILED", error_message=final_state.get("error"), duration_ms=duration_ms)
+    else:
+        await update_agent_run_status(run_id, "COMPLETED", duration_ms=duration_ms)
+
+async def researcher_job_handler(job: Job):
+    # Background research yields external API capacity to interactive requests
+    with rate_priority(BULK):
+        await run_researcher_bg(job.payload["domain"], job.payload["record_id"], job=job)
+
+async def renew_research_run_lease(job: Job):
+    # Without renewal a run longer than RUN_LEASE_S could be taken over and run twice
+    from app.core.supabase import renew_agent_run_lease
+    if job.run_id and not await renew_agent_run_lease(job.run_id, settings.RUN_LEASE_S):
+        logger.warning(f"Lost the lease on agent run {job.run_id} (job {job.job_id})")
 
 # --- Endpoints ---
 
@@ -102,6 +195,45 @@ async def run_researcher_bg(domain: str, record_id: str):
 def health_check():
     return {"status": "healthy", "version": "v1.0"}
 
+@app.get("/health/graphs")
+def graph_registry_stats():
+    """Cold compile time and warm lookup stats for each cached agent graph."""
+    return graph_registry.stats()
+
+@app.get("/health/http")
+def http_pool_stats():
+    """Connection reuse, queue wait and churn per upstream HTTP pool."""
+    return http_clients.metrics()
+
+@app.get("/health/runs")
+def run_dedup_stats():
+    """Research runs in flight in this process, and triggers that joined one instead of starting their own."""
+    return research_flights.stats()
+
+@app.get("/health/rate-limits")
+def rate_limit_stats():
+    """Current AIMD rate, in-flight calls, queue depth and wait per lane, per provider."""
+    return rate_limits.stats()
+
+@app.get("/health/hubspot-batching")
+def hubspot_batching_stats():
+    """How many HubSpot reads/writes were served per API call."""
+    from app.providers.adapters import get_hubspot_batcher
+    batcher = get_hubspot_batcher()
+    return batcher.stats() if batcher else {"enabled": False}
+
+@app.get("/health/llm-cache")
+def llm_cache_stats():
+    """Hit/miss counters for the LLM response cache."""
+    cache = get_llm_cache()
+    return cache.stats() if cache else {"enabled": False}
+
+@app.get("/health/search-cache")
+def search_cache_stats():
+    """Fresh/stale hit counters and background refreshes for the web search cache."""
+    cache = get_search_cache()
+    return cache.stats() if cache else {"enabled": False}
+
 class WebhookPayload(BaseModel):
     objectId: int
     propertyName: str
@@ -109,8 +241,13 @@ class WebhookPayload(BaseModel):
     subscriptionType: str
     portalId: int
 
+@app.get("/webhooks/hubspot/stats")
+def hubspot_webhook_stats():
+    """Events received vs. dropped as duplicates, coalesced, and research runs launched."""
+    return webhook_coalescer.stats()
+
 @app.post("/webhooks/hubspot/company")
-async def hubspot_webhook(request: Request, background_tasks: BackgroundTasks):
+async def hubspot_webhook(request: Request):
     """
     Handle HubSpot Webhooks (e.g., Company Creation or Property Change).
     """
@@ -126,68 +263,39 @@ async def hubspot_webhook(request: Request, background_tasks: BackgroundTasks):
     # HubSpot sends a list of events
     events = body if isinstance(body, list) else [body]
     
-    triggered_count = 0
-    for event in events:
-        # Check if this is a company event we care about
-        # In a real app, we check subscriptionType (e.g. company.creation)
-        record_id = str(event.get("objectId"))
-        
-        # We need the domain. The webhook might not include it if it's just a property change.
-        # For the MVP, we assume we can fetch it or it's passed (unlikely in standard hook).
-        # We'll rely on the Agent to fetch the domain from HubSpot using the record_id.
-        
-        # BUT, to start the agent we need a domain to init the state? 
-        # Actually, the Agent CAN fetch it in the first node. 
-        # Let's update the graph logic later to handle missing domain if needed.
-        # For now, let's look up the domain quickly or pass a placeholder.
-        
-        # SIMPLIFICATION: Triggers run, Agent resolves details.
-        # We pass record_id, Agent's first job is 'Hydrate Context'.
-        
-        # However, our Graph State expects 'domain'. 
-        # Let's just launch it. The `collect_sources` node relies on `domain`.
-        # We will need to inject a `fetch_domain` step in the graph or do it here.
-        # Doing it here is blocking. Doing it in graph is better. 
-        # For this MVP step, I will Assume we fetch it here loosely or pass a dummy to let the agent fail gracefully.
-        
-        # Ideally: usage of HubSpotAdapter to get domain.
-        # from app.providers.adapters import HubSpotAdapter
-        # crm = HubSpotAdapter()
-        # company = await crm.read_company(record_id)
-        # domain = company.get("properties", {}).get("domain")
-        
-        # For async strictness, let's just push to BG and let the function handle it.
-        # We'll infer domain inside `run_researcher_bg` (which I'll update momentarily).
-        
-        # Actually, let's keep it simple: We trigger for ANY company event for now.
-        background_tasks.add_task(run_researcher_bg, domain="TBD", record_id=record_id)
-        triggered_count += 1
-
-    return {"status": "ok", "triggered": triggered_count}
+    # Duplicate deliveries are dropped and events for the same record share one run.
+    # The worker resolves the domain from HubSpot (domain "TBD", see run_researcher_bg).
+    result = webhook_coalescer.ingest(events)
 
-    return {"status": "ok", "triggered": triggered_count}
+    return {"status": "ok", "triggered": result["scheduled"], **result}
 
 class ManualTriggerRequest(BaseModel):
     domain: str
     record_id: str = "manual_trigger"
 
 @app.post("/research/run")
-async def manual_trigger_research(request: ManualTriggerRequest, background_tasks: BackgroundTasks):
+async def manual_trigger_research(request: ManualTriggerRequest):
     """
     Manually trigger the Researcher Agent from the Workbench UI.
     """
     logger.info(f"Manual Trigger for: {request.domain}")
     
-    # Launch Background Task
-    background_tasks.add_task(run_researcher_bg, domain=request.domain, record_id=request.record_id)
+    # Enqueue for the Researcher workers
+    job_id = await get_job_queue().enqueue("RESEARCHER", {"domain": request.domain, "record_id": request.record_id},
+                                     max_attempts=settings.JOB_MAX_ATTEMPTS)
     
-    return {"status": "QUEUED", "message": f"Researcher started for {request.domain}"}
+    return {"status": "QUEUED", "job_id": job_id, "message": f"Researcher queued for {request.domain}"}
+
+@app.get("/jobs/stats")
+async def get_job_stats():
+    """Queue depth per agent type and job status."""
+    return await get_job_queue().stats()
 
 @app.get("/feed")
 async def get_feed():
     """Unified Activity Feed (Real Data from Supabase)"""
     from app.providers.adapters import SupabaseAdapter
-    from app.core.supabase import get_workspace_id
+    from app.core.supabase import get_workspace_id, execute_async
     
     workspace_id = get_workspace_id()
     db = SupabaseAdapter(workspace_id=workspace_id)
@@ -197,12 +305,11 @@ async def get_feed():
         
     try:
         # Fetch recent runs
-        response = db.client.table("agent_runs")\
+        response = await execute_async(db.client.table("agent_runs")\
             .select("*")\
             .eq("workspace_id", workspace_id)\
             .order("created_at", desc=True)\
-            .limit(20)\
-            .execute()
+            .limit(20))
             
         print(f"Feed fetched: {len(response.data)} items")
         return response.data
@@ -217,17 +324,16 @@ async def get_run_details(run_id: str):
     Real DB Fetch.
     """
     from app.providers.adapters import SupabaseAdapter
-    from app.core.supabase import get_workspace_id
+    from app.core.supabase import get_workspace_id, execute_async
     
     workspace_id = get_workspace_id()
     db = SupabaseAdapter(workspace_id=workspace_id)
     
     try:
         # Fetch from 'agent_runs'
-        response = db.client.table("agent_runs")\
+        response = await execute_async(db.client.table("agent_runs")\
             .select("*")\
-            .eq("run_id", run_id)\
-            .execute()
+            .eq("run_id", run_id))
             
         if not response.data or len(response.data) == 0:
             raise HTTPException(status_code=404, detail="Run not found")
@@ -317,21 +423,44 @@ def reject_draft(draft_id: str):
     logger.info(f"Rejected Draft {draft_id}")
     return {"status": "REJECTED"}
 
-@app.post("/sniper/drafts/{draft_id}/regenerate")
-async def regenerate_draft(draft_id: str):
+# --- Server-Sent Events ---
+
+def _sse(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+def _sse_json_stream(partials, fallback: Dict[str, Any]) -> StreamingResponse:
     """
-    Regenerate a draft using Gemini (Real AI).
-    V1: Rewrites the body/subject with a slightly different tone/angle.
+    Streams an LLM JSON response as SSE: a `partial` event each time the object grows,
+    then `done` with the final object and time-to-first-token. On failure, `error`
+    followed by `done` with `fallback`, so clients always get a usable payload.
     """
-    logger.info(f"Regenerating Draft {draft_id}")
-    from app.providers.adapters import GeminiAdapter
-    llm = GeminiAdapter()
+    async def events():
+        start = time.perf_counter()
+        first_ms = None
+        result = None
+        try:
+            async for partial in partials:
+                if first_ms is None:
+                    first_ms = round((time.perf_counter() - start) * 1000, 1)
+                result = partial
+                yield _sse("partial", partial)
+        except Exception as e:
+            logger.error(f"LLM stream failed: {e}")
+            yield _sse("error", {"message": str(e)})
+            result = None
+        yield _sse("done", {
+            "result": result if result else fallback,
+            "first_token_ms": first_ms,
+            "total_ms": round((time.perf_counter() - start) * 1000, 1)
+        })
 
-    # In a real app, fetch the OLD draft content from DB to guide the rewrite.
-    # Here we simulate the context or use a generic "rewrite this" prompt if we had the body.
-    # Since we don't have the body passed in, we will generate a NEW variation based on the same mock context.
-    
-    prompt = """
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+# In a real app, fetch the OLD draft content from DB to guide the rewrite.
+# Here we simulate the context or use a generic "rewrite this" prompt if we had the body.
+# Since we don't have the body passed in, we will generate a NEW variation based on the same mock context.
+REGENERATE_PROMPT = """
     You are an expert sales copywriter. Generate a distinct variation of a cold outreach email.
     
     Context:
@@ -346,27 +475,51 @@ async def regenerate_draft(draft_id: str):
     
     Return JSON: { "subject": "...", "body_text": "..." }
     """
+
+DRAFT_VARIATION_SCHEMA = {
+    "type": "object",
+    "properties": {"subject": {"type": "string"}, "body_text": {"type": "string"}},
+    "required": ["subject", "body_text"]
+}
+
+REGENERATE_FALLBACK = {
+    "subject": "Re: Scaling past Series B",
+    "body_text": "Saw the news. Congrats.\n\nQuick thought: Don't hire reps until the revenue engine is verified.\n\nWe debug GTM systems for a living. Worth a 5 min chat?"
+}
+
+@app.post("/sniper/drafts/{draft_id}/regenerate")
+async def regenerate_draft(draft_id: str):
+    """
+    Regenerate a draft using Gemini (Real AI).
+    V1: Rewrites the body/subject with a slightly different tone/angle.
+    """
+    logger.info(f"Regenerating Draft {draft_id}")
+    from app.providers.adapters import GeminiAdapter
     
     try:
         # Generate new content
-        result = await llm.generate_structured_json(prompt, None) # access raw response or parse
-        # Note: generate_structured_json logic in adapter might vary, let's assume it returns a dict.
-        # Fallback if adapter returns string:
-        if isinstance(result, str): 
-            # safe fallback mock if LLM fails or adapter signature differs
-            return {
-                "subject": "Re: Series B & Revenue Architecture",
-                "body_text": "Hi,\n\nCongrats on the raise. Most B-stage companies hire sales reps immediately.\n\nWe find it's better to verify the 'engine' first. If your data layer is broken, more reps just burn cash faster.\n\nOpen to a different perspective?"
-            }
-            
-        return result
+        llm = GeminiAdapter()
+        # Uncached: the prompt is constant and each call must produce a new variation
+        return await llm.generate_json(REGENERATE_PROMPT, DRAFT_VARIATION_SCHEMA, cache=False)
     except Exception as e:
         logger.error(f"Regen failed: {e}")
         # Fallback
-        return {
-            "subject": "Re: Scaling past Series B",
-            "body_text": "Saw the news. Congrats.\n\nQuick thought: Don't hire reps until the revenue engine is verified.\n\nWe debug GTM systems for a living. Worth a 5 min chat?"
-        }
+        return dict(REGENERATE_FALLBACK)
+
+@app.post("/sniper/drafts/{draft_id}/regenerate/stream")
+async def regenerate_draft_stream(draft_id: str):
+    """
+    Streaming variant of /regenerate (SSE).
+    Events: `partial` {subject, body_text} as tokens arrive, then `done`.
+    """
+    logger.info(f"Regenerating Draft {draft_id} (stream)")
+    from app.providers.adapters import GeminiAdapter
+
+    try:
+        llm = GeminiAdapter()
+    except ValueError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    return _sse_json_stream(llm.stream_json(REGENERATE_PROMPT, DRAFT_VARIATION_SCHEMA, cache=False), REGENERATE_FALLBACK)
 
 # --- Sales Swarm Endpoints ---
 
@@ -377,10 +530,8 @@ async def run_deal_intelligence(deal_id: str):
     Uses 'sales_graph.py'
     """
     logger.info(f"Starting Sales Swarm for Deal {deal_id}")
-    from app.agents.sales_graph import build_sales_graph
-    
-    # 1. Initialize Graph
-    graph = build_sales_graph()
+    # 1. Get compiled Graph
+    graph = await graph_registry.get("sales")
     
     # 2. Run (with mock inputs for V1)
     # The 'load_context' node handles fetching, so we start with just the ID
@@ -405,10 +556,8 @@ async def run_expansion_agent(domain: str):
     3. Drafts Proposal.
     """
     logger.info(f"Running Expansion Agent for {domain}")
-    from app.agents.expansion_graph import create_expansion_graph
-    
-    # Init Graph
-    graph = create_expansion_graph()
+    # Get compiled Graph
+    graph = await graph_registry.get("expansion")
     
     # Run
     # Initial state only needs domain; the graph fetches usage data itself
@@ -429,18 +578,46 @@ async def run_expansion_agent(domain: str):
 
 # --- RevOps Swarm Endpoints ---
 
+def _hygiene_scan_config(seed_records: Optional[int], on_progress=None, incremental: bool = False,
+                         full: bool = False) -> Dict[str, Any]:
+    from app.core.supabase import get_workspace_id
+    from app.services.crm_scan_source import SeederScanSource
+    if seed_records is not None and not 0 < seed_records <= 5_000_000:
+        raise HTTPException(status_code=400, detail="seed_records must be between 1 and 5,000,000")
+    configurable: Dict[str, Any] = {}
+    if incremental:
+        configurable.update(incremental=True, full=full, workspace_id=get_workspace_id())
+    if seed_records:
+        configurable["source"] = SeederScanSource(record_count=seed_records)
+    if on_progress:
+        configurable["on_progress"] = on_progress
+    return {"configurable": configurable}
+
+def _hygiene_result(final_state: Dict[str, Any]) -> Dict[str, Any]:
+    summary = final_state.get("summary") or {}
+    issues = final_state.get("issues") or []
+    return {
+        "health_score": final_state.get("health_score"),
+        "issues": issues,
+        "issue_count": final_state.get("issue_count", len(issues)),
+        "issues_truncated": final_state.get("issue_count", len(issues)) > len(issues),
+        "record_count": summary.get("records", 0),
+        "summary": summary,
+        "changes": final_state.get("changes")
+    }
+
 @app.post("/revops/hygiene/scan")
-async def run_hygiene_scan():
+async def run_hygiene_scan(seed_records: Optional[int] = None, incremental: bool = False, full: bool = False):
     """
     Triggers the Data Hygiene Agent.
-    1. Scans CRM (Mock Seeder).
+    1. Streams the CRM page by page (HubSpot, or the seeder; `seed_records` forces a seeded CRM of that size).
     2. Detects Stale Deals & Missing Fields.
-    3. Returns System Health Score.
+    3. Returns System Health Score (issues capped, full count in `issue_count`).
+    `incremental=true` reads only records changed since the last scan and merges them
+    into the workspace's stored issue set (`full=true` rebuilds it).
     """
     logger.info("Running Hygiene Scan")
-    from app.agents.hygiene_graph import create_hygiene_graph
-    
-    graph = create_hygiene_graph()
+    graph = await graph_registry.get("hygiene")
     
     # Run
     final_state = await graph.ainvoke({
@@ -448,13 +625,44 @@ async def run_hygiene_scan():
         "issues": [],
         "health_score": 0,
         "status": "STARTING"
-    })
+    }, config=_hygiene_scan_config(seed_records, incremental=incremental, full=full))
     
-    return {
-        "health_score": final_state.get("health_score"),
-        "issues": final_state.get("issues"),
-        "record_count": len(final_state.get("raw_data").get("deals", [])) + len(final_state.get("raw_data").get("contacts", []))
-    }
+    return _hygiene_result(final_state)
+
+@app.post("/revops/hygiene/scan/stream")
+async def stream_hygiene_scan(seed_records: Optional[int] = None, incremental: bool = False, full: bool = False):
+    """
+    Same scan as /revops/hygiene/scan as SSE: a `progress` event per CRM page
+    (records scanned / expected, issues so far), then `done` with the result.
+    """
+    progress: asyncio.Queue = asyncio.Queue()
+    config = _hygiene_scan_config(seed_records, on_progress=progress.put_nowait, incremental=incremental, full=full)
+    graph = await graph_registry.get("hygiene")
+
+    async def run():
+        try:
+            return await graph.ainvoke({
+                "raw_data": {},
+                "issues": [],
+                "health_score": 0,
+                "status": "STARTING"
+            }, config=config)
+        finally:
+            progress.put_nowait(None)
+
+    async def events():
+        task = asyncio.create_task(run())
+        try:
+            while (update := await progress.get()) is not None:
+                yield _sse("progress", update)
+            yield _sse("done", _hygiene_result(await task))
+        except Exception as e:
+            logger.error(f"Hygiene scan failed: {e}")
+            yield _sse("error", {"message": str(e)})
+        finally:
+            task.cancel()
+
+    return StreamingResponse(events(), media_type="text/event-stream")
 
 @app.post("/executive/briefing/generate")
 async def generate_briefing():
@@ -464,10 +672,9 @@ async def generate_briefing():
     2. Synthesizes a 'Smart Brevity' memo.
     """
     logger.info("Generating Executive Briefing")
-    from app.agents.executive_graph import create_executive_graph
     from app.seeders.briefing_seeder import BriefingSeeder
     
-    graph = create_executive_graph()
+    graph = await graph_registry.get("executive")
     
     # Seed Data
     raw_stats = BriefingSeeder.generate_weekly_stats()
@@ -482,43 +689,35 @@ async def generate_briefing():
     
     return final_state.get("briefing_memo")
 
+@app.post("/executive/briefing/generate/stream")
+async def generate_briefing_stream():
+    """
+    Streaming variant of /executive/briefing/generate (SSE).
+    Events: `partial` memo (subject and tldr first) as tokens arrive, then `done`.
+    """
+    logger.info("Generating Executive Briefing (stream)")
+    from app.seeders.briefing_seeder import BriefingSeeder
+    from app.agents.executive_graph import FALLBACK_MEMO
+
+    try:
+        nodes = await graph_registry.get("executive_stream")
+    except ValueError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+    raw_stats = BriefingSeeder.generate_weekly_stats()
+    return _sse_json_stream(nodes.stream_memo(raw_stats), FALLBACK_MEMO)
+
 
 # --- Listener Swarm Endpoints ---
 
-@app.post("/listener/process")
-async def process_signal(event: Dict[str, Any]):
-    """
-    Triggers the Listener Agent (Signals).
-    7-Step Veto Pipeline.
-    Input: Raw Event (Trigger, Domain, etc.)
-    Output: Governance Decision.
-    """
-    logger.info(f"Listener receiving event: {event.get('trigger')}")
-    from app.agents.listener_graph import create_listener_graph
-    
-    graph = create_listener_graph()
-    
-    final_state = await graph.ainvoke({
-        "domain": event.get("domain", "Unknown"),
-        "raw_event": event,
-        "signal_def": {},
-        "suppressed": False,
-        "suppression_reason": "",
-        "archetype": "None",
-        "confidence_score": 0.0,
-        "confidence_drivers": [],
-        "confidence_risks": [],
-        "decision": "STARTING",
-        "rationale": {},
-        "draft_email": None
-    })
-    
+def _listener_response(final_state: Dict[str, Any]) -> Dict[str, Any]:
     return {
         "signal": final_state.get("raw_event").get("trigger"),
         "decision": final_state.get("decision"),
         "suppressed": final_state.get("suppressed"),
         "suppression_reason": final_state.get("suppression_reason"),
         "archetype": final_state.get("archetype"),
+        "corroborated_combos": final_state.get("corroborated_combos", []),
         "confidence": {
             "score": final_state.get("confidence_score"),
             "drivers": final_state.get("confidence_drivers"),
@@ -528,6 +727,128 @@ async def process_signal(event: Dict[str, Any]):
         "draft": final_state.get("draft_email")
     }
 
+def _listener_batch_stats(results: List[Dict[str, Any]], elapsed_s: float) -> Dict[str, Any]:
+    decisions: Dict[str, int] = {}
+    for r in results:
+        decisions[r["decision"]] = decisions.get(r["decision"], 0) + 1
+    latencies = sorted(r["latency_ms"] for r in results) or [0.0]
+    return {
+        "events": len(results),
+        "elapsed_ms": round(elapsed_s * 1000, 2),
+        "events_per_sec": round(len(results) / elapsed_s, 1) if elapsed_s else None,
+        "latency_ms_p50": latencies[len(latencies) // 2],
+        "latency_ms_max": latencies[-1],
+        "decisions": decisions
+    }
+
+async def _flush_signal_window():
+    if settings.SIGNAL_WINDOW_PERSIST:
+        from app.agents.listener_graph import get_signal_window
+        await get_signal_window().flush()
+
+@app.post("/listener/process")
+async def process_signal(event: Dict[str, Any]):
+    """
+    Triggers the Listener Agent (Signals).
+    7-Step Veto Pipeline.
+    Input: Raw Event (Trigger, Domain, etc.)
+    Output: Governance Decision.
+    """
+    logger.info(f"Listener receiving event: {event.get('trigger')}")
+    from app.agents.listener_graph import initial_listener_state
+    
+    graph = await graph_registry.get("listener")
+    
+    final_state = await graph.ainvoke(initial_listener_state(event))
+    await _flush_signal_window()
+    
+    return _listener_response(final_state)
+
+@app.get("/listener/window/stats")
+def signal_window_stats():
+    """Correlation window size and how many observed events completed a combo."""
+    from app.agents.listener_graph import get_signal_window
+    return get_signal_window().stats()
+
+LISTENER_STREAM_CHUNK = 500
+
+@app.post("/listener/process/batch")
+async def process_signal_batch(events: List[Dict[str, Any]]):
+    """
+    Batch variant of /listener/process.
+    Runs the same veto pipeline over a list of events (up to LISTENER_BATCH_MAX_EVENTS),
+    in chunks so a large batch doesn't stall the event loop.
+    Output: decisions in input order (each with latency_ms) + throughput stats.
+    """
+    if len(events) > settings.LISTENER_BATCH_MAX_EVENTS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {settings.LISTENER_BATCH_MAX_EVENTS} events per batch; use /listener/process/stream"
+        )
+    logger.info(f"Listener receiving batch of {len(events)} events")
+    processor = await graph_registry.get("listener_batch")
+    
+    start = time.perf_counter()
+    results: List[Dict[str, Any]] = []
+    for i in range(0, len(events), LISTENER_STREAM_CHUNK):
+        # Decide in chunks and yield between them so other requests keep running
+        results.extend(processor.process(events[i:i + LISTENER_STREAM_CHUNK]))
+        await asyncio.sleep(0)
+    elapsed = time.perf_counter() - start
+    await _flush_signal_window()
+    
+    return {
+        "results": [{**_listener_response(r), "latency_ms": r["latency_ms"]} for r in results],
+        "stats": _listener_batch_stats(results, elapsed)
+    }
+
+@app.post("/listener/process/stream")
+async def process_signal_stream(request: Request):
+    """
+    Streaming variant of /listener/process/batch.
+    Input: NDJSON (one event per line). Output: NDJSON decisions in input order,
+    emitted per chunk as they are decided, followed by a final {"stats": ...} line.
+    """
+    processor = await graph_registry.get("listener_batch")
+    # Read the body before streaming: StreamingResponse consumes `receive` to watch for disconnects
+    body = await request.body()
+
+    def read_events():
+        for line in body.splitlines():
+            if line.strip():
+                yield json.loads(line)
+
+    async def decide():
+        start = time.perf_counter()
+        all_results: List[Dict[str, Any]] = []
+        pending: List[Dict[str, Any]] = []
+
+        def flush():
+            results = processor.process(pending)
+            pending.clear()
+            all_results.extend(results)
+            return "".join(
+                json.dumps({**_listener_response(r), "latency_ms": r["latency_ms"]}) + "\n" for r in results
+            )
+
+        try:
+            for event in read_events():
+                pending.append(event)
+                if len(pending) >= LISTENER_STREAM_CHUNK:
+                    yield flush()
+                    await asyncio.sleep(0)  # let other requests run between chunks
+            if pending:
+                yield flush()
+        except ValueError as e:
+            # Emit what was decided before the bad line, then stop
+            if pending:
+                yield flush()
+            yield json.dumps({"error": f"Invalid NDJSON line: {e}"}) + "\n"
+        await _flush_signal_window()
+        yield json.dumps({"stats": _listener_batch_stats(all_results, time.perf_counter() - start)}) + "\n"
+
+    return StreamingResponse(decide(), media_type="application/x-ndjson")
+
 # --- Sales War Room Endpoint ---
 
 class DealAnalysisRequest(BaseModel):
@@ -541,9 +862,7 @@ async def analyze_deal(request: DealAnalysisRequest):
     """
     logger.info(f"Analyzing deal: {request.deal_id}")
     
-    from app.agents.sales_graph import create_sales_graph
-    
-    graph = create_sales_graph()
+    graph = await graph_registry.get("sales")
     
     # Initial state
     final_state = await graph.ainvoke({
@@ -578,9 +897,7 @@ async def scan_expansion(request: ExpansionScanRequest):
     """
     logger.info(f"Scanning expansion for: {request.domain}")
     
-    from app.agents.expansion_graph import create_expansion_graph
-    
-    graph = create_expansion_graph()
+    graph = await graph_registry.get("expansion")
     
     # Initial state
     final_state = await graph.ainvoke({
@@ -598,35 +915,141 @@ async def scan_expansion(request: ExpansionScanRequest):
         "proposal": final_state.get("proposal")
     }
 
+class ExpansionBulkScanRequest(BaseModel):
+    domains: Optional[List[str]] = None   # default: every account in the workspace
+    seed_accounts: Optional[int] = None   # synthetic customer base of this size (load testing)
+    top_k: int = 25
+    draft_top: int = 5
+
+async def _workspace_account_domains(page_size: int = 1000) -> List[str]:
+    from app.providers.adapters import SupabaseAdapter
+    from app.core.supabase import get_workspace_id, execute_async
+
+    db = SupabaseAdapter(workspace_id=get_workspace_id())
+    if not db.client:
+        return []
+    domains: List[str] = []
+    while True:
+        response = await execute_async(db.client.table("accounts")
+            .select("domain")
+            .eq("workspace_id", db.workspace_id)
+            .order("domain")
+            .range(len(domains), len(domains) + page_size - 1))
+        rows = response.data or []
+        domains.extend(row["domain"] for row in rows if row.get("domain"))
+        if len(rows) < page_size:
+            return domains
+
+@app.post("/expansion/bulk-scan")
+async def bulk_scan_expansion(request: ExpansionBulkScanRequest):
+    """
+    Rank the whole customer base by expected ARR impact of its best expansion signal
+    (vectorized rules, no LLM), then draft proposals for the top `draft_top` accounts only.
+    Reports throughput in accounts/second.
+    """
+    from app.agents.expansion_graph import score_customer_base, usage_batches
+    from app.seeders.usage_seeder import UsageSeeder
+
+    if not 1 <= request.top_k <= 1000 or not 0 <= request.draft_top <= min(request.top_k, 50):
+        raise HTTPException(status_code=400, detail="top_k must be 1-1000 and draft_top 0-min(top_k, 50)")
+    if request.seed_accounts is not None and not 0 < request.seed_accounts <= 5_000_000:
+        raise HTTPException(status_code=400, detail="seed_accounts must be between 1 and 5,000,000")
+
+    if request.seed_accounts:
+        batches = UsageSeeder.iter_usage_batches(request.seed_accounts)
+    else:
+        domains = request.domains
+        if domains is None:
+            try:
+                domains = await _workspace_account_domains()
+            except Exception as e:
+                logger.error(f"Account list failed: {e}")
+                raise HTTPException(status_code=500, detail=str(e))
+        batches = usage_batches(domains)
+
+    logger.info("Running bulk expansion scan")
+    return await score_customer_base(batches, top_k=request.top_k, draft_top=request.draft_top)
+
 # --- RevOps System Health Endpoint ---
 
 @app.post("/revops/scan")
-async def scan_system_health():
+async def scan_system_health(full: bool = False):
     """
     Run system health check using the Hygiene Graph.
     Returns data quality issues and auto-fix suggestions.
+    Incremental: only records changed since the previous scan are re-evaluated
+    (`full=true` re-reads the whole CRM).
     """
     logger.info("Running system health scan")
     
-    from app.agents.hygiene_graph import create_hygiene_graph
-    
-    graph = create_hygiene_graph()
+    graph = await graph_registry.get("hygiene")
     
     # Initial state
     final_state = await graph.ainvoke({
-        "crm_data": {},
+        "raw_data": {},
         "issues": [],
         "health_score": 0,
-        "auto_fixes": []
-    })
+        "status": "STARTING"
+    }, config=_hygiene_scan_config(None, incremental=True, full=full))
     
     return {
         "health_score": final_state.get("health_score"),
         "issues": final_state.get("issues"),
+        "issue_count": final_state.get("issue_count"),
+        "changes": final_state.get("changes"),
         "auto_fixes": final_state.get("auto_fixes"),
         "scan_time": "just now"
     }
 
+@app.get("/revops/issues")
+async def list_hygiene_issues(entity: Optional[str] = None, issue_type: Optional[str] = None,
+                              severity: Optional[str] = None, after: Optional[int] = None, limit: int = 50):
+    """
+    Open hygiene issues from the last scans (hygiene_issues), filterable by entity,
+    issue_type and severity. Keyset-paginated: pass `next_cursor` back as `after`.
+    """
+    from app.core.supabase import get_workspace_id
+    from app.services.hygiene_issues import ENTITIES, ISSUE_ENTITY, MAX_PAGE_SIZE, SEVERITIES, HygieneIssueRepository
+
+    if entity and entity not in ENTITIES:
+        raise HTTPException(status_code=400, detail=f"entity must be one of {list(ENTITIES)}")
+    if issue_type and issue_type not in ISSUE_ENTITY:
+        raise HTTPException(status_code=400, detail=f"issue_type must be one of {list(ISSUE_ENTITY)}")
+    if severity and severity not in SEVERITIES:
+        raise HTTPException(status_code=400, detail=f"severity must be one of {list(SEVERITIES)}")
+    if not 0 < limit <= MAX_PAGE_SIZE:
+        raise HTTPException(status_code=400, detail=f"limit must be between 1 and {MAX_PAGE_SIZE}")
+
+    repo = HygieneIssueRepository(get_workspace_id())
+    if not repo.client:
+        return {"issues": [], "next_cursor": None}
+    try:
+        return await repo.list_issues(entity, issue_type, severity, after, limit)
+    except Exception as e:
+        logger.error(f"Hygiene issue query failed: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/revops/health")
+async def get_hygiene_health(history: int = 0):
+    """
+    Latest stored health score (written by every /revops/scan), without running a scan.
+    `history=N` also returns the last N scores, newest first.
+    """
+    from app.core.supabase import get_workspace_id
+    from app.services.hygiene_issues import HygieneIssueRepository
+
+    if not 0 <= history <= 1000:
+        raise HTTPException(status_code=400, detail="history must be between 0 and 1000")
+    repo = HygieneIssueRepository(get_workspace_id())
+    if not repo.client:
+        return {"latest": None, "history": []}
+    try:
+        rows = await repo.health_history(limit=max(1, history))
+    except Exception as e:
+        logger.error(f"Hygiene health query failed: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+    return {"latest": rows[0] if rows else None, "history": rows if history else []}
+
 # --- Analytics Endpoint ---
 
 @app.get("/analytics/agent-metrics")
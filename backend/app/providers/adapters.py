@@ -1,51 +1,127 @@
+import asyncio
+import logging
 import os
 import httpx
 import json
-from typing import List, Dict, Any, Optional
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.output_parsers import JsonOutputParser
-
+from datetime import datetime, timezone
+from typing import AsyncIterator, List, Dict, Any, Optional, Set
 from .interfaces import LLMProvider, SearchProvider, CRMClient, StorageProvider
+from app.core.http import http_clients
+from app.core.llm_cache import LLMResponseCache, cache_key, get_llm_cache
+from app.core.ratelimit import rate_limits
+from app.core.search_cache import SearchResultCache, get_search_cache
+from app.providers.prompt_registry import PromptChainRegistry, get_chat_model, get_prompt_registry
 
 # --- Gemini Adapter ---
 class GeminiAdapter(LLMProvider):
-    def __init__(self):
+    MODEL = "gemini-1.5-flash"
+
+    def __init__(self, cache: Optional[LLMResponseCache] = None):
         api_key = os.getenv("GOOGLE_API_KEY")
         if not api_key:
             raise ValueError("GOOGLE_API_KEY is not set")
         
-        # Use 1.5 Flash for speed/cost (as per spec)
-        self.llm = ChatGoogleGenerativeAI(
-            model="gemini-1.5-flash",
-            temperature=0.0,
-            convert_system_message_to_human=True
-        )
+        # Use 1.5 Flash for speed/cost (as per spec). One client per process.
+        self.llm = get_chat_model(self.MODEL, temperature=0.0, google_api_key=api_key)
+        # temperature=0.0: identical inputs are answered from the shared response cache
+        self.cache = cache or get_llm_cache()
+
+    @property
+    def chains(self) -> PromptChainRegistry:
+        return get_prompt_registry(self.llm)
+
+    def _cache_for(self, cache: bool) -> Optional[LLMResponseCache]:
+        # cache=False: the caller wants a fresh answer to the same prompt (e.g. a regenerate)
+        return self.cache if cache else None
+
+    async def generate_json(self, prompt: str, schema: Dict[str, Any], system_prompt: str = "",
+                            cache: bool = True) -> Dict[str, Any]:
+        store = self._cache_for(cache)
+        key = cache_key(self.MODEL, "json", system_prompt, prompt, self.chains.schema_text(schema))
+        if store:
+            cached = await store.get(key)
+            if cached is not None:
+                return cached
 
-    async def generate_json(self, prompt: str, schema: Dict[str, Any], system_prompt: str = "") -> Dict[str, Any]:
         # Note: In a real prod implementation, we would use strict structured output mode.
         # For v1 with LangChain, we rely on prompting + JSON mode.
-        messages = [
-            ("system", f"{system_prompt}\nYou must output strictly valid JSON matching this schema: {json.dumps(schema)}"),
-            ("human", prompt)
-        ]
-        chain = ChatPromptTemplate.from_messages(messages) | self.llm | JsonOutputParser()
-        return await chain.ainvoke({})
-
-    async def generate_text(self, prompt: str, system_prompt: str = "") -> str:
-        messages = [
-            ("system", system_prompt),
-            ("human", prompt)
-        ]
-        chain = ChatPromptTemplate.from_messages(messages) | self.llm
-        result = await chain.ainvoke({})
+        chain = self.chains.json_chain(system_prompt, schema)
+        async with rate_limits.guard("gemini"):
+            result = await chain.ainvoke({"prompt": prompt})
+        if store and result is not None:
+            await store.put(key, result)
+        return result
+
+    async def generate_text(self, prompt: str, system_prompt: str = "", cache: bool = True) -> str:
+        store = self._cache_for(cache)
+        key = cache_key(self.MODEL, "text", system_prompt, prompt)
+        if store:
+            cached = await store.get(key)
+            if cached is not None:
+                return cached
+
+        chain = self.chains.text_chain(system_prompt)
+        async with rate_limits.guard("gemini"):
+            result = await chain.ainvoke({"prompt": prompt})
+        if store and result.content:
+            await store.put(key, result.content)
         return result.content
 
+    async def stream_text(self, prompt: str, system_prompt: str = "", cache: bool = True) -> AsyncIterator[str]:
+        store = self._cache_for(cache)
+        key = cache_key(self.MODEL, "text", system_prompt, prompt)
+        if store:
+            cached = await store.get(key)
+            if cached is not None:
+                yield cached
+                return
+
+        parts = []
+        async with rate_limits.guard("gemini"):
+            async for chunk in self.chains.text_chain(system_prompt).astream({"prompt": prompt}):
+                if chunk.content:
+                    parts.append(chunk.content)
+                    yield chunk.content
+        if store and parts:
+            await store.put(key, "".join(parts))
+
+    async def stream_json(self, prompt: str, schema: Dict[str, Any], system_prompt: str = "",
+                          cache: bool = True) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Yields the partially parsed object each time the model's output grows it
+        (JsonOutputParser repairs the unfinished JSON on every chunk), so early
+        fields like `subject` arrive long before the response completes.
+        """
+        store = self._cache_for(cache)
+        key = cache_key(self.MODEL, "json", system_prompt, prompt, self.chains.schema_text(schema))
+        if store:
+            cached = await store.get(key)
+            if cached is not None:
+                yield cached
+                return
+
+        last = None
+        async with rate_limits.guard("gemini"):
+            async for partial in self.chains.json_chain(system_prompt, schema).astream({"prompt": prompt}):
+                if partial and partial != last:
+                    last = partial
+                    yield partial
+        if store and last is not None:
+            await store.put(key, last)
+
 # --- Tavily Adapter ---
 class TavilyAdapter(SearchProvider):
-    def __init__(self):
+    SEARCH_DEPTH = "basic"  # Free tier friendly
+
+    def __init__(self, client: Optional[httpx.AsyncClient] = None, cache: Optional[SearchResultCache] = None):
         self.api_key = os.getenv("TAVILY_API_KEY")
         self.base_url = "https://api.tavily.com/search"
+        self._client = client
+        self.cache = cache or get_search_cache()
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        return self._client or http_clients.get("tavily")
 
     async def search(self, query: str, max_results: int = 5) -> List[Dict[str, Any]]:
         if not self.api_key:
@@ -53,42 +129,116 @@ class TavilyAdapter(SearchProvider):
             print("WARNING: No TAVILY_API_KEY. Returning mock data.")
             return [{"url": "https://example.com", "title": "Mock Result", "content": "This is a mock search result."}]
 
-        async with httpx.AsyncClient() as client:
-            resp = await client.post(
-                self.base_url,
-                json={
-                    "api_key": self.api_key,
-                    "query": query,
-                    "search_depth": "basic", # Free tier friendly
-                    "max_results": max_results
-                }
-            )
-            resp.raise_for_status()
-            data = resp.json()
-            return data.get("results", [])
+        if self.cache:
+            return await self.cache.fetch(query, max_results, self.SEARCH_DEPTH,
+                                          lambda: self._search(query, max_results))
+        return await self._search(query, max_results)
+
+    async def _search(self, query: str, max_results: int) -> List[Dict[str, Any]]:
+        resp = await self.client.post(
+            self.base_url,
+            json={
+                "api_key": self.api_key,
+                "query": query,
+                "search_depth": self.SEARCH_DEPTH,
+                "max_results": max_results
+            }
+        )
+        resp.raise_for_status()
+        data = resp.json()
+        return data.get("results", [])
 
 # --- HubSpot Adapter ---
 class HubSpotAdapter(CRMClient):
-    def __init__(self):
+    COMPANY_PROPERTIES = ["name", "domain", "industry", "lifecycle_stage"]
+
+    def __init__(self, client: Optional[httpx.AsyncClient] = None, batched: bool = True):
         self.access_token = os.getenv("HUBSPOT_ACCESS_TOKEN")
         self.base_url = "https://api.hubapi.com/crm/v3/objects/companies"
         self.headers = {
             "Authorization": f"Bearer {self.access_token}",
             "Content-Type": "application/json"
         }
+        self._client = client
+        # Reads/writes from every adapter instance coalesce into shared batch calls
+        self.batcher = get_hubspot_batcher() if batched and client is None else None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        return self._client or http_clients.get("hubspot")
 
     async def read_company(self, record_id: str) -> Dict[str, Any]:
         if not self.access_token: 
              return {"id": record_id, "properties": {"name": "Mock Company"}}
+        if self.batcher:
+            return await self.batcher.read(str(record_id))
+        return await self._read_one(record_id)
 
-        async with httpx.AsyncClient() as client:
-            resp = await client.get(
-                f"{self.base_url}/{record_id}", 
-                headers=self.headers,
-                params={"properties": ["name", "domain", "industry", "lifecycle_stage"]}
-            )
-            resp.raise_for_status()
-            return resp.json()
+    async def _read_one(self, record_id: str) -> Dict[str, Any]:
+        resp = await self.client.get(
+            f"{self.base_url}/{record_id}", 
+            headers=self.headers,
+            params={"properties": self.COMPANY_PROPERTIES}
+        )
+        resp.raise_for_status()
+        return resp.json()
+
+    async def read_companies(self, record_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Batch read (max 100 ids). Records HubSpot could not return are absent from the result."""
+        resp = await self.client.post(
+            f"{self.base_url}/batch/read",
+            headers=self.headers,
+            json={"properties": self.COMPANY_PROPERTIES, "inputs": [{"id": rid} for rid in record_ids]}
+        )
+        resp.raise_for_status()  # 207 (partial success) is not an error
+        return {str(r["id"]): r for r in resp.json().get("results", [])}
+
+    async def list_objects(self, object_type: str, properties: List[str], after: Optional[str] = None,
+                           limit: int = 100) -> tuple:
+        """One page of any CRM object type (max 100). Returns (records, cursor for the next page or None)."""
+        params = {"limit": limit, "properties": ",".join(properties), "archived": "false"}
+        if after:
+            params["after"] = after
+        resp = await self.client.get(
+            f"https://api.hubapi.com/crm/v3/objects/{object_type}", headers=self.headers, params=params
+        )
+        resp.raise_for_status()
+        data = resp.json()
+        return data.get("results", []), data.get("paging", {}).get("next", {}).get("after")
+
+    async def count_objects(self, object_type: str) -> Optional[int]:
+        """Total records of an object type (search API), for progress reporting."""
+        resp = await self.client.post(
+            f"https://api.hubapi.com/crm/v3/objects/{object_type}/search",
+            headers=self.headers, json={"limit": 1}
+        )
+        if resp.status_code != 200:
+            return None
+        return resp.json().get("total")
+
+    async def search_modified_since(self, object_type: str, modified_property: str, since_ms: int,
+                                    properties: List[str], after: Optional[str] = None, limit: int = 100) -> tuple:
+        """
+        One page of records modified at or after `since_ms` (epoch millis), oldest first.
+        Returns (records, cursor for the next page or None). The search API stops paging
+        at 10,000 results; callers continue with a later `since_ms`.
+        """
+        payload = {
+            "filterGroups": [{"filters": [{
+                "propertyName": modified_property, "operator": "GTE", "value": str(since_ms)
+            }]}],
+            "sorts": [{"propertyName": modified_property, "direction": "ASCENDING"}],
+            "properties": [*properties, modified_property],
+            "limit": limit,
+        }
+        if after:
+            payload["after"] = after
+        resp = await self.client.post(
+            f"https://api.hubapi.com/crm/v3/objects/{object_type}/search", headers=self.headers, json=payload
+        )
+        resp.raise_for_status()
+        data = resp.json()
+        return data.get("results", []), data.get("paging", {}).get("next", {}).get("after")
 
     async def search_company(self, domain: str) -> Optional[Dict[str, Any]]:
         # This requires the 'companies.search' scope and endpoint
@@ -104,32 +254,235 @@ class HubSpotAdapter(CRMClient):
                 }]
             }]
         }
-        async with httpx.AsyncClient() as client:
-            resp = await client.post(search_url, headers=self.headers, json=payload)
-            if resp.status_code == 200:
-                results = resp.json().get("results")
-                if results: return results[0]
+        resp = await self.client.post(search_url, headers=self.headers, json=payload)
+        if resp.status_code == 200:
+            results = resp.json().get("results")
+            if results: return results[0]
         return None
 
     async def write_properties(self, record_id: str, properties: Dict[str, Any]) -> bool:
         if not self.access_token:
             print(f"MOCK WRITE to {record_id}: {properties}")
             return True
+        if self.batcher:
+            return await self.batcher.write(str(record_id), properties)
+        return await self._write_one(record_id, properties)
+
+    async def _write_one(self, record_id: str, properties: Dict[str, Any]) -> bool:
+        resp = await self.client.patch(
+            f"{self.base_url}/{record_id}",
+            headers=self.headers,
+            json={"properties": properties}
+        )
+        return resp.status_code == 200
+
+    async def update_companies(self, updates: Dict[str, Dict[str, Any]]) -> List[str]:
+        """Batch update (max 100 records). Returns the ids HubSpot confirmed."""
+        resp = await self.client.post(
+            f"{self.base_url}/batch/update",
+            headers=self.headers,
+            json={"inputs": [{"id": rid, "properties": props} for rid, props in updates.items()]}
+        )
+        resp.raise_for_status()
+        return [str(r["id"]) for r in resp.json().get("results", [])]
+
+
+class HubSpotBatcher:
+    """
+    Coalesces concurrent company reads and property writes into HubSpot batch calls.
+
+    Calls arriving within `max_wait_s` of the first one share one
+    `batch/read` / `batch/update` request (up to BATCH_SIZE records). Repeated reads
+    of a record share a single input, and writes to the same record are merged in
+    arrival order (HubSpot rejects duplicate ids in one batch). Each caller's future
+    resolves on its own: records missing from a partial (207) response, and whole
+    batches that fail, are retried as ordinary single-record calls.
+    """
+
+    BATCH_SIZE = 100  # HubSpot batch endpoint limit
+
+    def __init__(self, crm: HubSpotAdapter, max_wait_s: float = 0.05):
+        self.crm = crm
+        self.max_wait_s = max_wait_s
+        self._reads: Dict[str, List[asyncio.Future]] = {}
+        self._writes: Dict[str, tuple] = {}  # record_id -> (merged properties, futures)
+        self._read_timer: Optional[asyncio.TimerHandle] = None
+        self._write_timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: Set[asyncio.Task] = set()  # in-flight batches (the loop only holds weak refs)
+        self.calls = 0
+        self.batch_calls = 0
+        self.reads = 0
+        self.writes = 0
+        self.deduped = 0
+        self.fallbacks = 0
+
+    async def read(self, record_id: str) -> Dict[str, Any]:
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        self.reads += 1
+        if record_id in self._reads:
+            self.deduped += 1
+        self._reads.setdefault(record_id, []).append(fut)
+        if len(self._reads) >= self.BATCH_SIZE:
+            self._flush_reads()
+        elif self._read_timer is None:
+            self._read_timer = loop.call_later(self.max_wait_s, self._flush_reads)
+        return await fut
+
+    async def write(self, record_id: str, properties: Dict[str, Any]) -> bool:
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        self.writes += 1
+        if record_id in self._writes:
+            self.deduped += 1
+            merged, futures = self._writes[record_id]
+            merged.update(properties)
+            futures.append(fut)
+        else:
+            self._writes[record_id] = (dict(properties), [fut])
+        if len(self._writes) >= self.BATCH_SIZE:
+            self._flush_writes()
+        elif self._write_timer is None:
+            self._write_timer = loop.call_later(self.max_wait_s, self._flush_writes)
+        return await fut
+
+    def _flush_reads(self) -> None:
+        if self._read_timer is not None:
+            self._read_timer.cancel()
+            self._read_timer = None
+        batch, self._reads = self._reads, {}
+        if batch:
+            self._spawn(self._run_reads(batch))
+
+    def _flush_writes(self) -> None:
+        if self._write_timer is not None:
+            self._write_timer.cancel()
+            self._write_timer = None
+        batch, self._writes = self._writes, {}
+        if batch:
+            self._spawn(self._run_writes(batch))
+
+    def _spawn(self, coro) -> None:
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def drain(self) -> None:
+        """Send anything still waiting for its batch window and wait for in-flight batches."""
+        self._flush_reads()
+        self._flush_writes()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
 
-        async with httpx.AsyncClient() as client:
-            resp = await client.patch(
-                f"{self.base_url}/{record_id}",
-                headers=self.headers,
-                json={"properties": properties}
-            )
-            return resp.status_code == 200
+    @staticmethod
+    def _resolve(futures: List[asyncio.Future], result: Any = None, error: Optional[BaseException] = None) -> None:
+        for fut in futures:
+            if fut.done():  # caller was cancelled meanwhile
+                continue
+            if error is not None:
+                fut.set_exception(error)
+            else:
+                fut.set_result(result)
+
+    async def _single(self, futures: List[asyncio.Future], call) -> None:
+        self.calls += 1
+        try:
+            self._resolve(futures, await call())
+        except Exception as e:
+            self._resolve(futures, error=e)
+
+    async def _run_reads(self, batch: Dict[str, List[asyncio.Future]]) -> None:
+        try:
+            if len(batch) == 1:
+                (rid, futures), = batch.items()
+                await self._single(futures, lambda: self.crm._read_one(rid))
+                return
+            self.calls += 1
+            self.batch_calls += 1
+            try:
+                found = await self.crm.read_companies(list(batch))
+            except Exception as e:
+                logging.warning(f"HubSpot batch read of {len(batch)} records failed, falling back: {e}")
+                found = {}
+            missing = [rid for rid in batch if rid not in found]
+            for rid, record in found.items():
+                # Every caller gets its own copy to mutate
+                for fut in batch.get(rid, []):
+                    self._resolve([fut], json.loads(json.dumps(record)))
+            self.fallbacks += len(missing)
+            await asyncio.gather(*(
+                self._single(batch[rid], lambda rid=rid: self.crm._read_one(rid)) for rid in missing
+            ))
+        finally:
+            for rid, futures in batch.items():
+                self._resolve(futures, error=RuntimeError(f"HubSpot read of {rid} did not complete"))
+
+    async def _run_writes(self, batch: Dict[str, tuple]) -> None:
+        try:
+            if len(batch) == 1:
+                (rid, (props, futures)), = batch.items()
+                await self._single(futures, lambda: self.crm._write_one(rid, props))
+                return
+            self.calls += 1
+            self.batch_calls += 1
+            try:
+                updated = set(await self.crm.update_companies({rid: props for rid, (props, _) in batch.items()}))
+            except Exception as e:
+                logging.warning(f"HubSpot batch update of {len(batch)} records failed, falling back: {e}")
+                updated = set()
+            missing = [rid for rid in batch if rid not in updated]
+            for rid in updated & batch.keys():
+                self._resolve(batch[rid][1], True)
+            self.fallbacks += len(missing)
+            await asyncio.gather(*(
+                self._single(batch[rid][1], lambda rid=rid: self.crm._write_one(rid, batch[rid][0]))
+                for rid in missing
+            ))
+        finally:
+            for rid, (_, futures) in batch.items():
+                self._resolve(futures, error=RuntimeError(f"HubSpot write to {rid} did not complete"))
+
+    def stats(self) -> Dict[str, Any]:
+        requests = self.reads + self.writes
+        return {
+            "reads": self.reads,
+            "writes": self.writes,
+            "deduped": self.deduped,
+            "api_calls": self.calls,
+            "batch_calls": self.batch_calls,
+            "fallbacks": self.fallbacks,
+            "requests_per_call": round(requests / self.calls, 2) if self.calls else 0.0
+        }
+
+
+_hubspot_batcher: Optional[HubSpotBatcher] = None
+
+
+def get_hubspot_batcher() -> Optional[HubSpotBatcher]:
+    """Process-wide batcher; None when HUBSPOT_BATCHING is off."""
+    global _hubspot_batcher
+    from app.core.config import settings
+    if not settings.HUBSPOT_BATCHING:
+        return None
+    if _hubspot_batcher is None:
+        _hubspot_batcher = HubSpotBatcher(HubSpotAdapter(batched=False), max_wait_s=settings.HUBSPOT_BATCH_WAIT_S)
+    return _hubspot_batcher
+
+
+async def close_hubspot_batcher() -> None:
+    global _hubspot_batcher
+    if _hubspot_batcher is not None:
+        await _hubspot_batcher.drain()
+        _hubspot_batcher = None
 
 # --- Supabase Adapter ---
-from supabase import create_client, Client
+from supabase import Client
+from app.core.supabase import execute_async
 
 class SupabaseAdapter(StorageProvider):
     def __init__(self, workspace_id: str | None = None):
         from app.core.config import settings
+        from app.core.supabase import get_supabase_client
         url = os.getenv("SUPABASE_URL")
         key = os.getenv("SUPABASE_SERVICE_ROLE_KEY")  # Changed to service role key
         self.workspace_id = workspace_id or settings.DEFAULT_WORKSPACE_ID
@@ -137,7 +490,8 @@ class SupabaseAdapter(StorageProvider):
             print("WARNING: SUPABASE_URL or SUPABASE_SERVICE_ROLE_KEY missing")
             self.client = None
         else:
-            self.client: Client = create_client(url, key)
+            # Shared per-credential client; cheap to construct the adapter per request
+            self.client: Client = get_supabase_client(url, key)
     
     async def ensure_account(self, domain: str, record_id: str | None = None) -> str:
         """
@@ -155,13 +509,12 @@ class SupabaseAdapter(StorageProvider):
         if not self.client: return None
         try:
             # Look for latest dossier for this domain in this workspace
-            response = self.client.table("account_dossiers")\
+            response = await execute_async(self.client.table("account_dossiers")\
                 .select("dossier_json")\
                 .eq("workspace_id", self.workspace_id)\
                 .eq("domain", domain)\
                 .order("created_at", desc=True)\
-                .limit(1)\
-                .execute()
+                .limit(1))
             
             if response.data and len(response.data) > 0:
                 return response.data[0]["dossier_json"]
@@ -173,11 +526,10 @@ class SupabaseAdapter(StorageProvider):
     async def fetch_drafts(self, status: str = "NEEDS_REVIEW") -> List[Dict[str, Any]]:
         if not self.client: return []
         try:
-            response = self.client.table("sniper_drafts")\
+            response = await execute_async(self.client.table("sniper_drafts")\
                 .select("draft_json, status, draft_id")\
                 .eq("workspace_id", self.workspace_id)\
-                .eq("status", status)\
-                .execute()
+                .eq("status", status))
             
             # Enrich the JSON with the top-level status/id if needed
             results = []
@@ -205,7 +557,7 @@ class SupabaseAdapter(StorageProvider):
                 "draft_json": draft,
                 "status": draft.get("status", "NEEDS_REVIEW")
             }
-            self.client.table("sniper_drafts").insert(payload).execute()
+            await execute_async(self.client.table("sniper_drafts").insert(payload))
             return True
         except Exception as e:
             print(f"Supabase Error (save_draft): {e}")
@@ -223,8 +575,31 @@ class SupabaseAdapter(StorageProvider):
                 "config_id": dossier.get("config_id"),
                 "dossier_json": dossier
             }
-            self.client.table("account_dossiers").insert(payload).execute()
+            if not (account_id and payload["config_id"]):
+                await execute_async(self.client.table("account_dossiers").insert(payload))
+                return True
+            # One row per workspace + account + config (idx_unique_dossier_per_account_config,
+            # migration 008). The index is partial, so ON CONFLICT can't target it: a refresh
+            # updates the existing row and only the first save inserts.
+            if await self._update_dossier(payload):
+                return True
+            try:
+                await execute_async(self.client.table("account_dossiers").insert(payload))
+            except Exception as e:
+                if getattr(e, "code", None) != "23505":
+                    raise
+                # Another worker saved this account first
+                return await self._update_dossier(payload)
             return True
         except Exception as e:
             print(f"Supabase Error (save_dossier): {e}")
             return False
+
+    async def _update_dossier(self, payload: Dict[str, Any]) -> bool:
+        """Replace the stored dossier for the payload's account + config. False if there is none."""
+        response = await execute_async(self.client.table("account_dossiers")\
+            .update({**payload, "updated_at": datetime.now(timezone.utc).isoformat()})\
+            .eq("workspace_id", payload["workspace_id"])\
+            .eq("account_id", payload["account_id"])\
+            .eq("config_id", payload["config_id"]))
+        return bool(response.data)
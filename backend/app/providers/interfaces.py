@@ -1,17 +1,30 @@
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any, Optional
+from typing import AsyncIterator, List, Dict, Any, Optional
 
 class LLMProvider(ABC):
     @abstractmethod
-    async def generate_json(self, prompt: str, schema: Dict[str, Any], system_prompt: str = "") -> Dict[str, Any]:
-        """Generate a JSON response validated against the provided JSON schema."""
+    async def generate_json(self, prompt: str, schema: Dict[str, Any], system_prompt: str = "",
+                            cache: bool = True) -> Dict[str, Any]:
+        """
+        Generate a JSON response validated against the provided JSON schema.
+        `cache=False` skips the response cache (callers that want a new variation each time).
+        """
         pass
 
     @abstractmethod
-    async def generate_text(self, prompt: str, system_prompt: str = "") -> str:
+    async def generate_text(self, prompt: str, system_prompt: str = "", cache: bool = True) -> str:
         """Generate a raw text response."""
         pass
 
+    async def stream_text(self, prompt: str, system_prompt: str = "", cache: bool = True) -> AsyncIterator[str]:
+        """Yield text chunks as they are generated. Default: one chunk with the full response."""
+        yield await self.generate_text(prompt, system_prompt, cache=cache)
+
+    async def stream_json(self, prompt: str, schema: Dict[str, Any], system_prompt: str = "",
+                          cache: bool = True) -> AsyncIterator[Dict[str, Any]]:
+        """Yield progressively more complete JSON objects; the last one is the full response."""
+        yield await self.generate_json(prompt, schema, system_prompt, cache=cache)
+
 class SearchProvider(ABC):
     @abstractmethod
     async def search(self, query: str, max_results: int = 5) -> List[Dict[str, Any]]:
@@ -0,0 +1,163 @@
+import hashlib
+import json
+import os
+import threading
+from typing import Any, Dict, Optional, Tuple, Type
+
+from langchain_core.messages import SystemMessage
+from langchain_core.output_parsers import JsonOutputParser
+from langchain_core.prompts import ChatPromptTemplate
+from pydantic import BaseModel
+
+DEFAULT_MODEL = "gemini-1.5-flash"
+JSON_INSTRUCTION = "You must output strictly valid JSON matching this schema: "
+
+_models: Dict[Tuple[str, float], Any] = {}
+_model_schemas: Dict[Type[BaseModel], Dict[str, Any]] = {}
+_lock = threading.Lock()
+
+
+def get_chat_model(model: str = DEFAULT_MODEL, temperature: float = 0.0, google_api_key: Optional[str] = None):
+    """One ChatGoogleGenerativeAI client per (model, temperature) for the whole process."""
+    key = (model, temperature)
+    llm = _models.get(key)
+    if llm is None:
+        from langchain_google_genai import ChatGoogleGenerativeAI
+        with _lock:
+            llm = _models.get(key)
+            if llm is None:
+                llm = _models[key] = ChatGoogleGenerativeAI(
+                    model=model,
+                    temperature=temperature,
+                    google_api_key=google_api_key or os.getenv("GOOGLE_API_KEY"),
+                    convert_system_message_to_human=True
+                )
+    return llm
+
+
+def model_schema(model: Type[BaseModel]) -> Dict[str, Any]:
+    """Cached `model_json_schema()` for a contract model (e.g. Signal, DraftEmail). Treat as read-only."""
+    schema = _model_schemas.get(model)
+    if schema is None:
+        schema = _model_schemas[model] = model.model_json_schema()
+    return schema
+
+
+class PromptChainRegistry:
+    """
+    Precompiled prompt chains bound to one chat model.
+
+    A JSON chain is compiled once per (system prompt, schema) pair: the system message,
+    including the serialized schema, is built a single time and only the human prompt
+    is templated per call. System text is a literal message, so braces in prompts or
+    schemas are never parsed as template variables.
+    """
+
+    def __init__(self, llm: Any, max_chains: int = 256):
+        self.llm = llm
+        self.max_chains = max_chains
+        self._chains: Dict[str, Any] = {}
+        self._schema_text: Dict[int, Tuple[Dict[str, Any], str]] = {}
+        self.compiled = 0
+        self.reused = 0
+
+    def schema_text(self, schema: Dict[str, Any]) -> str:
+        # Keyed by identity: schemas are module constants or model_schema() results.
+        # The schema is kept referenced so its id can't be reused by another object.
+        entry = self._schema_text.get(id(schema))
+        if entry is None or entry[0] is not schema:
+            if len(self._schema_text) >= self.max_chains:
+                self._schema_text.clear()
+            entry = self._schema_text[id(schema)] = (schema, json.dumps(schema))
+        return entry[1]
+
+    def _chain(self, key_parts: Tuple[str, ...], build) -> Any:
+        key = hashlib.sha256("\x00".join(key_parts).encode("utf-8")).hexdigest()
+        chain = self._chains.get(key)
+        if chain is not None:
+            self.reused += 1
+            return chain
+        if len(self._chains) >= self.max_chains:
+            self._chains.clear()
+        chain = self._chains[key] = build()
+        self.compiled += 1
+        return chain
+
+    def json_chain(self, system_prompt: str, schema: Dict[str, Any]) -> Any:
+        schema_text = self.schema_text(schema)
+        return self._chain(("json", system_prompt, schema_text), lambda: (
+            ChatPromptTemplate.from_messages([
+                SystemMessage(content=f"{system_prompt}\n{JSON_INSTRUCTION}{schema_text}"),
+                ("human", "{prompt}")
+            ]) | self.llm | JsonOutputParser()
+        ))
+
+    def text_chain(self, system_prompt: str) -> Any:
+        return self._chain(("text", system_prompt), lambda: (
+            ChatPromptTemplate.from_messages([
+                SystemMessage(content=system_prompt),
+                ("human", "{prompt}")
+            ]) | self.llm
+        ))
+
+    def stats(self) -> Dict[str, int]:
+        return {"chains": len(self._chains), "compiled": self.compiled, "reused": self.reused}
+
+
+_registries: Dict[int, PromptChainRegistry] = {}
+
+
+def get_prompt_registry(llm: Optional[Any] = None) -> PromptChainRegistry:
+    """Registry bound to `llm` (default: the shared process model)."""
+    llm = llm or get_chat_model()
+    registry = _registries.get(id(llm))
+    if registry is None or registry.llm is not llm:
+        registry = _registries[id(llm)] = PromptChainRegistry(llm)
+    return registry
+
+
+if __name__ == "__main__":
+    import asyncio
+    import time
+
+    from langchain_core.language_models.fake_chat_models import FakeListChatModel
+    from langchain_google_genai import ChatGoogleGenerativeAI
+
+    from app.contracts.schemas import DraftEmail, Signal
+
+    system = "You are an expert GTM researcher."
+    schema = {"type": "object", "properties": {"signals": {"type": "array", "items": model_schema(Signal)}}}
+    fake = FakeListChatModel(responses=['{"signals": []}'])
+
+    def per_call_build():
+        # What GeminiAdapter / score_fit did on every call before the registry
+        ChatGoogleGenerativeAI(model=DEFAULT_MODEL, temperature=0.0, google_api_key="bench")
+        Signal.model_json_schema()
+        DraftEmail.model_json_schema()
+        return ChatPromptTemplate.from_messages([
+            SystemMessage(content=f"{system}\n{JSON_INSTRUCTION}{json.dumps(schema)}"),
+            ("human", "{prompt}")
+        ]) | fake | JsonOutputParser()
+
+    registry = PromptChainRegistry(fake)
+
+    def registry_lookup():
+        model_schema(Signal)
+        model_schema(DraftEmail)
+        return registry.json_chain(system, schema)
+
+    # Client construction is ~100ms, so the per-call path gets a smaller sample
+    for label, get_chain, N in (("per-call build", per_call_build, 30), ("registry", registry_lookup, 2000)):
+        start = time.perf_counter()
+        for _ in range(N):
+            get_chain()
+        setup_us = (time.perf_counter() - start) / N * 1e6
+
+        async def run():
+            for i in range(N):
+                await get_chain().ainvoke({"prompt": f"Company #{i}"})
+        start = time.perf_counter()
+        asyncio.run(run())
+        call_us = (time.perf_counter() - start) / N * 1e6
+        print(f"{label:>15}: setup {setup_us:8.1f}us/call, end-to-end (fake model) {call_us:8.1f}us/call")
+    print(registry.stats())
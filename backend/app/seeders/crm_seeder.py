@@ -1,7 +1,11 @@
 
 import random
-from typing import Dict, List, Any
-from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List, Tuple
+from datetime import datetime, timedelta, timezone
+
+def _utc_now() -> datetime:
+    # Activity dates are naive UTC, the hygiene engine's reference frame
+    return datetime.now(timezone.utc).replace(tzinfo=None)
 
 class CRMSeeder:
     """
@@ -23,7 +27,7 @@ class CRMSeeder:
                 "name": f"Opportunity #{100+i}",
                 "stage": random.choice(["discovery", "presentation", "contract_sent", "negotiation"]),
                 "amount": random.choice([10000, 25000, 50000, 120000]),
-                "last_activity_date": (datetime.now() - timedelta(days=days_ago)).isoformat(),
+                "last_activity_date": (_utc_now() - timedelta(days=days_ago)).isoformat(),
                 "owner_id": "rep_01"
             }
             deals.append(deal)
@@ -51,6 +55,41 @@ class CRMSeeder:
             }
         }
 
+    @staticmethod
+    def iter_messy_batches(record_count: int, page_size: int = 10_000, seed: int | None = None,
+                           now: datetime | None = None) -> Iterator[Tuple[str, Dict[str, List[Any]]]]:
+        """
+        Same mix as `generate_messy_data`, generated lazily as column batches of
+        `page_size` rows: ("deals", batch) pages first, then ("contacts", batch).
+        Memory stays at one page, so millions of rows are fine.
+        """
+        rng = random.Random(seed)
+        now = now or _utc_now()
+        stages = ["discovery", "presentation", "contract_sent", "negotiation"]
+        amounts = [10000, 25000, 50000, 120000]
+
+        for offset in range(0, record_count, page_size):
+            ids = range(100 + offset, 100 + min(record_count, offset + page_size))
+            days_ago = [rng.randint(45, 120) if rng.random() < 0.4 else rng.randint(1, 14) for _ in ids]
+            yield "deals", {
+                "deal_id": [f"deal_{i}" for i in ids],
+                "name": [f"Opportunity #{i}" for i in ids],
+                "stage": [rng.choice(stages) for _ in ids],
+                "amount": [rng.choice(amounts) for _ in ids],
+                "last_activity_date": [(now - timedelta(days=d)).isoformat() for d in days_ago],
+                "owner_id": ["rep_01"] * len(ids),
+            }
+
+        for offset in range(0, record_count, page_size):
+            ids = range(offset, min(record_count, offset + page_size))
+            missing = [rng.random() < 0.5 for _ in ids]
+            yield "contacts", {
+                "contact_id": [f"contact_{500 + i}" for i in ids],
+                "email": [f"john.doe.{i}@example.com" if rng.random() > 0.2 else None for i in ids],
+                "title": [None if m else "Director of Sales" for m in missing],
+                "phone": [None if m else "+1-555-0100" for m in missing],
+            }
+
 if __name__ == "__main__":
     import json
     print(json.dumps(CRMSeeder.generate_messy_data(5), indent=2))
@@ -1,6 +1,6 @@
 
 import random
-from typing import Dict, Any
+from typing import Any, Dict, Iterator, List
 
 class UsageSeeder:
     """
@@ -60,6 +60,33 @@ class UsageSeeder:
             }
         }
 
+    @staticmethod
+    def iter_usage_batches(account_count: int, page_size: int = 10_000,
+                           seed: int | None = None) -> Iterator[Dict[str, List[Any]]]:
+        """
+        Same distributions as `generate_usage_report`, for `account_count` synthetic
+        accounts, generated lazily as column batches of `page_size` rows
+        (see app.services.expansion_engine.USAGE_COLUMNS).
+        """
+        rng = random.Random(seed)
+        for offset in range(0, account_count, page_size):
+            n = min(page_size, account_count - offset)
+            caps = [rng.choice([10, 20, 50, 100, 500]) for _ in range(n)]
+            rates = [rng.uniform(0.4, 0.98) for _ in range(n)]
+            yield {
+                "domain": [f"account-{offset + i}.example.com" for i in range(n)],
+                "plan": ["Enterprise" if cap > 100 else "Pro" for cap in caps],
+                "license_cap": caps,
+                "active_users": [int(cap * rate) for cap, rate in zip(caps, rates)],
+                "utilization_pct": [round(rate * 100, 1) for rate in rates],
+                "api_access": [rng.choice(["NONE", "LOW", "HIGH"]) for _ in range(n)],
+                "reporting": [rng.choice(["LOW", "MED", "HIGH"]) for _ in range(n)],
+                "ai_assistant": [rng.choice(["NONE", "NONE", "LOW", "HIGH"]) for _ in range(n)],
+                "nps": [rng.randint(6, 10) for _ in range(n)],
+                "last_login_days_ago": [rng.randint(0, 5) for _ in range(n)],
+                "tickets_open": [rng.randint(0, 3) for _ in range(n)],
+            }
+
 if __name__ == "__main__":
     # Test
     print(UsageSeeder.generate_usage_report("stripe.com"))
@@ -0,0 +1,164 @@
+import asyncio
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from app.services.hygiene_engine import RecordBatch, batch_len
+
+ENTITIES = ("deals", "contacts")
+
+
+@dataclass
+class ScanPage:
+    entity: str          # "deals" | "contacts"
+    batch: RecordBatch   # columns named as the hygiene engine expects (DEAL_COLUMNS / CONTACT_COLUMNS)
+
+    def __len__(self) -> int:
+        return batch_len(self.batch)
+
+
+class CRMScanSource(ABC):
+    """
+    Where a hygiene scan reads CRM records from. Pages are yielded one at a time,
+    so a scan holds at most one page of raw records regardless of portal size.
+    """
+
+    name: str = "source"
+    # True when pages(since=...) really returns only changed records; otherwise
+    # `since` is ignored and incremental scans re-read everything
+    incremental: bool = False
+
+    @abstractmethod
+    def pages(self, since: Optional[datetime] = None) -> AsyncIterator[ScanPage]:
+        """Yield every deal page, then every contact page (only those modified at or after `since`, if given)."""
+
+    async def count(self, entity: str) -> Optional[int]:
+        """Expected records for `entity`, if known cheaply (progress reporting)."""
+        return None
+
+
+class SeederScanSource(CRMScanSource):
+    """Synthetic dirty CRM (CRMSeeder) of any size, generated page by page."""
+
+    name = "seeder"
+
+    def __init__(self, record_count: int = 15, page_size: int = 10_000, seed: Optional[int] = None):
+        self.record_count = record_count
+        self.page_size = page_size
+        self.seed = seed
+
+    async def pages(self, since: Optional[datetime] = None) -> AsyncIterator[ScanPage]:
+        from app.seeders.crm_seeder import CRMSeeder
+        for entity, batch in CRMSeeder.iter_messy_batches(self.record_count, self.page_size, seed=self.seed):
+            yield ScanPage(entity, batch)
+            await asyncio.sleep(0)  # generation is CPU-bound; let other requests run between pages
+
+    async def count(self, entity: str) -> Optional[int]:
+        return self.record_count
+
+
+class HubSpotScanSource(CRMScanSource):
+    """
+    Deals and contacts from the HubSpot CRM v3 list endpoints, 100 per page,
+    following the `paging.next.after` cursor. HubSpot property names are mapped
+    to the hygiene engine's columns.
+    """
+
+    name = "hubspot"
+    incremental = True
+    PAGE_SIZE = 100  # HubSpot maximum
+    SEARCH_RESULT_LIMIT = 10_000  # the search API will not page past this many results
+    MODIFIED_PROPERTY = {"deals": "hs_lastmodifieddate", "contacts": "lastmodifieddate"}
+    # engine column -> HubSpot property ("id" is the record id, not a property)
+    PROPERTY_MAP: Dict[str, Dict[str, str]] = {
+        "deals": {
+            "deal_id": "id",
+            "name": "dealname",
+            "amount": "amount",
+            "last_activity_date": "notes_last_updated",  # "Last Activity Date"
+            "stage": "dealstage",
+            "owner_id": "hubspot_owner_id",
+        },
+        "contacts": {
+            "contact_id": "id",
+            "email": "email",
+            "title": "jobtitle",
+            "phone": "phone",
+        },
+    }
+
+    def __init__(self, crm: Any = None, page_size: int = PAGE_SIZE):
+        from app.providers.adapters import HubSpotAdapter
+        self.crm = crm or HubSpotAdapter(batched=False)
+        self.page_size = min(page_size, self.PAGE_SIZE)
+
+    async def pages(self, since: Optional[datetime] = None) -> AsyncIterator[ScanPage]:
+        for entity in ENTITIES:
+            mapping = self.PROPERTY_MAP[entity]
+            properties = [prop for prop in mapping.values() if prop != "id"]
+            if since is not None:
+                async for page in self._changed_pages(entity, mapping, properties, since):
+                    yield page
+                continue
+            after = None
+            while True:
+                records, after = await self.crm.list_objects(entity, properties, after=after, limit=self.page_size)
+                if records:
+                    yield ScanPage(entity, self._to_batch(records, mapping))
+                if not after:
+                    break
+
+    async def _changed_pages(self, entity: str, mapping: Dict[str, str], properties: List[str],
+                             since: datetime) -> AsyncIterator[ScanPage]:
+        """Records modified since `since` via the search API, oldest change first."""
+        modified = self.MODIFIED_PROPERTY[entity]
+        since_ms = int(since.timestamp() * 1000)
+        after = None
+        while True:
+            records, after = await self.crm.search_modified_since(
+                entity, modified, since_ms, properties, after=after, limit=self.page_size
+            )
+            if records:
+                yield ScanPage(entity, self._to_batch(records, mapping))
+            if not after:
+                break
+            if int(after) >= self.SEARCH_RESULT_LIMIT:
+                # Result window exhausted: search again from the newest change seen so far.
+                # Records sharing that timestamp are re-read, which merging makes harmless.
+                newest = _epoch_ms((records[-1].get("properties") or {}).get(modified))
+                since_ms = newest if newest and newest > since_ms else since_ms + 1
+                after = None
+
+    @staticmethod
+    def _to_batch(records: List[Dict[str, Any]], mapping: Dict[str, str]) -> RecordBatch:
+        props = [r.get("properties") or {} for r in records]
+        return {
+            column: [r.get("id") for r in records] if prop == "id" else [p.get(prop) for p in props]
+            for column, prop in mapping.items()
+        }
+
+    async def count(self, entity: str) -> Optional[int]:
+        try:
+            return await self.crm.count_objects(entity)
+        except Exception:
+            return None
+
+
+def _epoch_ms(value: Any) -> Optional[int]:
+    if not value:
+        return None
+    try:
+        return int(datetime.fromisoformat(str(value).replace("Z", "+00:00")).timestamp() * 1000)
+    except ValueError:
+        return int(value) if str(value).isdigit() else None
+
+
+def default_scan_source() -> CRMScanSource:
+    """HubSpot when a token is configured, otherwise the seeded demo CRM."""
+    from app.core.config import settings
+    from app.providers.adapters import HubSpotAdapter
+    crm = HubSpotAdapter(batched=False)
+    if crm.access_token:
+        return HubSpotScanSource(crm)
+    return SeederScanSource(record_count=settings.HYGIENE_SEED_RECORDS)
@@ -0,0 +1,74 @@
+import logging
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Tuple
+
+from app.contracts.schemas import AccountDossier
+
+CacheKey = Tuple[str, str, str]  # (workspace_id, domain, config_id)
+
+
+class DossierCache:
+    """
+    Two-tier dossier lookup for the Researcher freshness gate.
+    Tier 1: in-process LRU. Tier 2: latest row in `account_dossiers`.
+    Freshness is decided by the caller's RefreshPolicy.ttl_days, so entries are
+    never expired here, only evicted by size.
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._lru: "OrderedDict[CacheKey, AccountDossier]" = OrderedDict()
+        self.hits = 0
+        self.db_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def is_fresh(dossier: AccountDossier, ttl_days: int, now: Optional[datetime] = None) -> bool:
+        created = dossier.created_at
+        if created.tzinfo is not None:
+            created = created.astimezone(timezone.utc).replace(tzinfo=None)
+        now = now or datetime.utcnow()
+        return now - created < timedelta(days=ttl_days)
+
+    def put(self, workspace_id: str, dossier: AccountDossier) -> None:
+        key = (workspace_id, dossier.domain, dossier.config_id)
+        self._lru[key] = dossier
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.max_entries:
+            self._lru.popitem(last=False)
+
+    def invalidate(self, workspace_id: str, domain: str, config_id: str) -> None:
+        self._lru.pop((workspace_id, domain, config_id), None)
+
+    async def get(self, workspace_id: str, domain: str, config_id: str) -> Optional[AccountDossier]:
+        key = (workspace_id, domain, config_id)
+        dossier = self._lru.get(key)
+        if dossier is not None:
+            self._lru.move_to_end(key)
+            self.hits += 1
+            return dossier
+
+        from app.providers.adapters import SupabaseAdapter
+        db = SupabaseAdapter(workspace_id=workspace_id)
+        dossier_json = await db.fetch_dossier(domain)
+        if dossier_json and dossier_json.get("config_id") == config_id:
+            try:
+                dossier = AccountDossier(**dossier_json)
+            except Exception as e:
+                logging.warning(f"Ignoring unparseable cached dossier for {domain}: {e}")
+                dossier = None
+
+        if dossier is None:
+            self.misses += 1
+            return None
+
+        self.db_hits += 1
+        self.put(workspace_id, dossier)
+        return dossier
+
+    def stats(self) -> dict:
+        return {"entries": len(self._lru), "hits": self.hits, "db_hits": self.db_hits, "misses": self.misses}
+
+
+dossier_cache = DossierCache()
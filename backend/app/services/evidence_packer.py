@@ -0,0 +1,230 @@
+import hashlib
+import math
+import re
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Pattern, Sequence
+
+CHARS_PER_TOKEN = 4          # Gemini/GPT-style tokenizers average ~4 chars per English token
+PASSAGE_CHARS = 600          # long paragraphs are split at sentence boundaries around this size
+SHINGLE_WORDS = 5
+MINHASH_PERMS = 64
+LSH_BANDS = 16               # 16 bands x 4 rows: pairs above ~0.7 Jaccard almost always collide
+DUPLICATE_JACCARD = 0.8
+
+# Vocabulary per signal type in SIGNAL_EXTRACTION_PROMPT / Signal.signal_type
+SIGNAL_KEYWORDS: Dict[str, Sequence[str]] = {
+    "EXEC_HIRE": ("hire", "hiring", "appoint", "joins", "chief", "vp", "vice president", "head of",
+                  "cro", "cmo", "ceo", "director", "promoted", "leadership"),
+    "FUNDING": ("funding", "raised", "raises", "series a", "series b", "series c", "seed", "investment",
+                "investor", "valuation", "led by", "round"),
+    "TECH_STACK": ("crm", "salesforce", "hubspot", "marketo", "pardot", "segment", "snowflake", "stack",
+                   "integration", "api", "platform", "aws"),
+    "GTM_TOOLING": ("outreach", "salesloft", "gong", "apollo", "zoominfo", "clearbit", "6sense",
+                    "demandbase", "attribution", "pipeline", "revops", "sales ops", "enablement"),
+    "PARTNER": ("partner", "partnership", "integrates with", "alliance", "reseller", "marketplace"),
+    "EXPANSION": ("expand", "expansion", "new office", "opens", "launches in", "international",
+                  "emea", "apac", "headcount", "growth"),
+    "COMPLIANCE": ("soc 2", "soc2", "gdpr", "hipaa", "iso 27001", "compliance", "certified"),
+    "PRODUCT_LAUNCH": ("launch", "launches", "introducing", "announces", "release", "new product", "beta"),
+    "NEWS": ("announced", "today", "press release", "news"),
+}
+RELIABILITY_WEIGHT = {"HIGH": 1.2, "MED": 1.0, "LOW": 0.6}
+
+_SPLIT_PARAGRAPHS = re.compile(r"\n\s*\n")
+_SPLIT_SENTENCES = re.compile(r"(?<=[.!?])\s+")
+_WORDS = re.compile(r"[a-z0-9]+")
+_PRIME = (1 << 61) - 1
+
+
+@lru_cache(maxsize=None)
+def _keyword_pattern(signal_type: str) -> Optional[Pattern[str]]:
+    """Whole-word match of any keyword of `signal_type` ("cro" must not match "across"), plurals included."""
+    keywords = SIGNAL_KEYWORDS.get(signal_type)
+    if not keywords:
+        return None
+    alternatives = "|".join(r"\s+".join(map(re.escape, kw.split())) for kw in keywords)
+    return re.compile(rf"\b({alternatives})s?\b")
+
+
+def estimate_tokens(text: str) -> int:
+    return math.ceil(len(text) / CHARS_PER_TOKEN) if text else 0
+
+
+@dataclass
+class Passage:
+    source_index: int
+    position: int       # order within the whole input, used to restore reading order
+    text: str
+    tokens: int
+    score: float = 0.0
+
+
+@dataclass
+class PackResult:
+    text: str
+    tokens: int
+    passages_in: int
+    passages_kept: int
+    duplicates: int
+    tokens_in: int
+    sources_kept: List[int] = field(default_factory=list)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "tokens": self.tokens,
+            "tokens_in": self.tokens_in,
+            "passages_in": self.passages_in,
+            "passages_kept": self.passages_kept,
+            "duplicates": self.duplicates,
+        }
+
+
+class EvidencePacker:
+    """
+    Builds the LLM context from evidence items within a token budget.
+
+    1. Split excerpts into paragraph/sentence passages.
+    2. Drop near-duplicates across sources (word shingles + MinHash, LSH-bucketed so
+       the check is ~linear in the number of passages).
+    3. Rank passages by keyword relevance to the requested signal types, weighted by
+       source reliability, and fill the budget best-first.
+    Kept passages are emitted grouped by source in the original source order, so
+    citations (evidence IDs / URLs) stay next to their text.
+    """
+
+    def __init__(self, token_budget: int = 3000, dedupe_threshold: float = DUPLICATE_JACCARD):
+        self.token_budget = token_budget
+        self.dedupe_threshold = dedupe_threshold
+        self._perms = _seeded_params(MINHASH_PERMS)
+
+    # --- passages ---
+
+    @staticmethod
+    def split(text: str) -> List[str]:
+        passages = []
+        for para in _SPLIT_PARAGRAPHS.split(text or ""):
+            para = " ".join(para.split())
+            if not para:
+                continue
+            if len(para) <= PASSAGE_CHARS:
+                passages.append(para)
+                continue
+            chunk = ""
+            for sentence in _SPLIT_SENTENCES.split(para):
+                if chunk and len(chunk) + len(sentence) > PASSAGE_CHARS:
+                    passages.append(chunk)
+                    chunk = ""
+                chunk = f"{chunk} {sentence}" if chunk else sentence
+                # A single run-on "sentence" (nav menus, minified text) is hard-cut
+                while len(chunk) > 2 * PASSAGE_CHARS:
+                    passages.append(chunk[:PASSAGE_CHARS])
+                    chunk = chunk[PASSAGE_CHARS:]
+            if chunk:
+                passages.append(chunk)
+        return passages
+
+    # --- near-duplicate detection ---
+
+    def signature(self, text: str) -> List[int]:
+        words = _WORDS.findall(text.lower())
+        n = max(1, len(words) - SHINGLE_WORDS + 1)
+        shingles = {
+            int.from_bytes(hashlib.blake2b(" ".join(words[i:i + SHINGLE_WORDS]).encode(), digest_size=8).digest(), "big")
+            for i in range(n)
+        } or {0}
+        return [min((a * s + b) % _PRIME for s in shingles) for a, b in self._perms]
+
+    def dedupe(self, passages: List[Passage]) -> List[Passage]:
+        rows = MINHASH_PERMS // LSH_BANDS
+        buckets: Dict[tuple, List[int]] = {}
+        signatures: List[List[int]] = []
+        kept: List[Passage] = []
+        for passage in passages:
+            sig = self.signature(passage.text)
+            bands = [(b, tuple(sig[b * rows:(b + 1) * rows])) for b in range(LSH_BANDS)]
+            candidates = {i for band in bands for i in buckets.get(band, ())}
+            if any(_jaccard(sig, signatures[i]) >= self.dedupe_threshold for i in candidates):
+                continue
+            idx = len(kept)
+            kept.append(passage)
+            signatures.append(sig)
+            for band in bands:
+                buckets.setdefault(band, []).append(idx)
+        return kept
+
+    # --- relevance ---
+
+    @staticmethod
+    def relevance(text: str, signal_types: Iterable[str]) -> float:
+        lowered = text.lower()
+        hits = 0
+        for sig_type in signal_types:
+            pattern = _keyword_pattern(sig_type)
+            if pattern is not None:
+                # Distinct keywords present, so repeating one word doesn't inflate the score
+                hits += len({m.group(1) for m in pattern.finditer(lowered)})
+        # Favour dense passages over long ones that mention a keyword once
+        return hits / math.sqrt(max(1, estimate_tokens(text)) / 50)
+
+    def pack(self, items: Sequence[Any], signal_types: Optional[Iterable[str]] = None,
+             token_budget: Optional[int] = None, label=None) -> PackResult:
+        """
+        Pack `items` (objects with `excerpt`, `url`, optional `evidence_id`/`reliability`)
+        into at most `token_budget` tokens. `label(item)` formats each source header.
+        """
+        budget = token_budget or self.token_budget
+        signal_types = list(signal_types or SIGNAL_KEYWORDS)
+        label = label or (lambda item: f"Source: {item.url}")
+
+        passages: List[Passage] = []
+        for idx, item in enumerate(items):
+            weight = RELIABILITY_WEIGHT.get(getattr(item, "reliability", "MED"), 1.0)
+            for text in self.split(getattr(item, "excerpt", "") or ""):
+                passage = Passage(idx, len(passages), text, estimate_tokens(text))
+                passage.score = self.relevance(text, signal_types) * weight
+                passages.append(passage)
+        tokens_in = sum(p.tokens for p in passages)
+
+        # Best passages first, so of two near-duplicates the more relevant/reliable copy survives
+        ranked = self.dedupe(sorted(passages, key=lambda p: (-p.score, p.position)))
+
+        chosen: Dict[int, List[Passage]] = {}
+        used = 0
+        for passage in ranked:
+            header = 0 if passage.source_index in chosen else estimate_tokens(label(items[passage.source_index])) + 2
+            if used + passage.tokens + header > budget:
+                continue
+            used += passage.tokens + header
+            chosen.setdefault(passage.source_index, []).append(passage)
+
+        blocks = []
+        for source_index in sorted(chosen):
+            body = "\n".join(p.text for p in sorted(chosen[source_index], key=lambda p: p.position))
+            blocks.append(f"{label(items[source_index])}\nContent: {body}\n---\n")
+
+        return PackResult(
+            text="".join(blocks),
+            tokens=used,
+            passages_in=len(passages),
+            passages_kept=sum(len(v) for v in chosen.values()),
+            duplicates=len(passages) - len(ranked),
+            tokens_in=tokens_in,
+            sources_kept=sorted(chosen),
+        )
+
+
+def _seeded_params(n: int) -> List[tuple]:
+    # Deterministic across processes (unlike hash()), so packing is reproducible and
+    # identical evidence keeps hitting the LLM response cache.
+    params = []
+    for i in range(n):
+        digest = hashlib.blake2b(f"minhash-{i}".encode(), digest_size=16).digest()
+        a = int.from_bytes(digest[:8], "big") % (_PRIME - 1) + 1
+        b = int.from_bytes(digest[8:], "big") % _PRIME
+        params.append((a, b))
+    return params
+
+
+def _jaccard(a: List[int], b: List[int]) -> float:
+    return sum(x == y for x, y in zip(a, b)) / len(a)
@@ -0,0 +1,337 @@
+import heapq
+import math
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Sequence, Tuple
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:  # pure-Python fallback, same results
+    np = None
+    NUMPY_AVAILABLE = False
+
+from app.services.hygiene_engine import RecordBatch, batch_len
+
+CHUNK_SIZE = 50_000
+
+# Columns the rules read, flattened from a UsageSeeder report
+USAGE_COLUMNS = (
+    "domain", "plan", "license_cap", "active_users", "utilization_pct",
+    "api_access", "reporting", "ai_assistant", "nps", "last_login_days_ago", "tickets_open",
+)
+SIGNAL_TYPES = ("SEAT_EXPANSION", "ENTERPRISE_UPGRADE", "AI_ASSISTANT_ADDON")
+CONFIDENCE = {"SEAT_EXPANSION": 0.95, "ENTERPRISE_UPGRADE": 0.85, "AI_ASSISTANT_ADDON": 0.6}
+
+
+@dataclass
+class ExpansionRules:
+    seat_pressure: float = 0.90        # utilization above this -> seat expansion
+    target_utilization: float = 0.75   # propose enough seats to bring utilization back here
+    pro_seat_arr: float = 600.0
+    enterprise_seat_arr: float = 1_200.0
+    ai_addon_arr: float = 240.0        # per active user
+    ai_addon_min_nps: int = 8
+    # At-risk accounts (unhappy, noisy or gone quiet) have their expected impact discounted
+    at_risk_nps: int = 7
+    at_risk_tickets: int = 3
+    at_risk_inactive_days: int = 14
+    at_risk_discount: float = 0.5
+
+
+def to_usage_batch(reports: Sequence[Dict[str, Any]]) -> RecordBatch:
+    """UsageSeeder reports (nested dicts) -> usage batch."""
+    subs = [r["subscription"] for r in reports]
+    features = [r["features"] for r in reports]
+    health = [r["health"] for r in reports]
+    return {
+        "domain": [r["domain"] for r in reports],
+        "plan": [s["plan"] for s in subs],
+        "license_cap": [s["license_cap"] for s in subs],
+        "active_users": [s["active_users"] for s in subs],
+        "utilization_pct": [s["utilization_pct"] for s in subs],
+        "api_access": [f["api_access"] for f in features],
+        "reporting": [f["reporting"] for f in features],
+        "ai_assistant": [f["ai_assistant"] for f in features],
+        "nps": [h["nps"] for h in health],
+        "last_login_days_ago": [h["last_login_days_ago"] for h in health],
+        "tickets_open": [h["tickets_open"] for h in health],
+    }
+
+
+def report_from_row(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Usage batch row -> UsageSeeder-shaped report (what generate_proposal reads)."""
+    return {
+        "domain": row["domain"],
+        "subscription": {
+            "plan": row["plan"],
+            "license_cap": row["license_cap"],
+            "active_users": row["active_users"],
+            "utilization_pct": row["utilization_pct"],
+        },
+        "features": {key: row[key] for key in ("api_access", "reporting", "ai_assistant")},
+        "health": {key: row[key] for key in ("nps", "last_login_days_ago", "tickets_open")},
+    }
+
+
+@dataclass
+class _Scored:
+    """Per-account rule outputs for one chunk: ARR impact per signal type and the best signal."""
+    impact: Dict[str, Sequence[float]]   # signal type -> ARR impact (0 where the rule did not fire)
+    discount: Sequence[float]
+    best: Sequence[int]                  # index into SIGNAL_TYPES
+    expected: Sequence[float]            # confidence x impact x discount of the best signal
+
+
+@dataclass
+class ExpansionScan:
+    """
+    Bulk expansion scoring over usage batches.
+
+    Every rule is a whole-column expression (NumPy when installed): each account
+    gets an ARR impact per signal, weighted by the signal's confidence and an
+    at-risk discount, and its best signal is the one with the highest expected
+    ARR. Only the running top-K rows are kept, so memory does not grow with the
+    customer base; signal evidence is built only for those rows.
+    """
+
+    rules: ExpansionRules = field(default_factory=ExpansionRules)
+    top_k: int = 25
+    accounts: int = 0
+    opportunities: int = 0
+    expected_pipeline_arr: float = 0.0
+    counts: Dict[str, int] = field(default_factory=dict)
+    _top: List[Tuple[float, int, Dict[str, Any]]] = field(default_factory=list)  # min-heap
+
+    def add_reports(self, reports: Sequence[Dict[str, Any]]) -> int:
+        """Score UsageSeeder reports. Returns the number of accounts with an opportunity."""
+        return sum(self.add_batch(to_usage_batch(reports[i:i + CHUNK_SIZE]))
+                   for i in range(0, len(reports), CHUNK_SIZE))
+
+    def add_batch(self, batch: RecordBatch) -> int:
+        n = batch_len(batch)
+        if not n:
+            return 0
+        scored = _score_numpy(batch, self.rules) if NUMPY_AVAILABLE else _score_python(batch, self.rules)
+        offset = self.accounts
+        self.accounts += n
+
+        if NUMPY_AVAILABLE:
+            has = scored.expected > 0
+            found = int(has.sum())
+            self.expected_pipeline_arr += float(scored.expected[has].sum())
+            for i, kind in enumerate(SIGNAL_TYPES):
+                hits = int((has & (scored.best == i)).sum())
+                if hits:
+                    self.counts[kind] = self.counts.get(kind, 0) + hits
+            # Candidates for the running top-K: this chunk's K best, ties at the cut in input order
+            idx = np.flatnonzero(has)
+            if len(idx) > self.top_k:
+                expected = scored.expected[idx]
+                cut = np.partition(expected, len(idx) - self.top_k)[len(idx) - self.top_k]
+                above = np.flatnonzero(expected > cut)
+                ties = np.flatnonzero(expected == cut)[:self.top_k - len(above)]
+                idx = idx[np.sort(np.concatenate([above, ties]))]
+            candidates = idx.tolist()
+        else:
+            candidates = [i for i in range(n) if scored.expected[i] > 0]
+            found = len(candidates)
+            for i in candidates:
+                self.expected_pipeline_arr += scored.expected[i]
+                kind = SIGNAL_TYPES[scored.best[i]]
+                self.counts[kind] = self.counts.get(kind, 0) + 1
+
+        self.opportunities += found
+        for i in candidates:
+            expected = float(scored.expected[i])
+            if len(self._top) >= self.top_k and expected <= self._top[0][0]:
+                continue
+            entry = (expected, -(offset + i), _row(batch, scored, i))  # earlier accounts win ties
+            if len(self._top) < self.top_k:
+                heapq.heappush(self._top, entry)
+            else:
+                heapq.heapreplace(self._top, entry)
+        return found
+
+    def ranked(self) -> List[Dict[str, Any]]:
+        """Top-K opportunities, highest expected ARR first."""
+        ranked = sorted(self._top, key=lambda e: (-e[0], -e[1]))
+        return [_describe(rank, row, self.rules) for rank, (_, _, row) in enumerate(ranked, start=1)]
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "accounts": self.accounts,
+            "opportunities": self.opportunities,
+            "by_signal": dict(self.counts),
+            "expected_pipeline_arr": round(self.expected_pipeline_arr),
+        }
+
+
+def _row(batch: RecordBatch, scored: _Scored, i: int) -> Dict[str, Any]:
+    row = {col: _scalar(batch[col][i]) for col in USAGE_COLUMNS}
+    row["impact"] = {kind: float(scored.impact[kind][i]) for kind in SIGNAL_TYPES}
+    row["discount"] = float(scored.discount[i])
+    row["best"] = SIGNAL_TYPES[int(scored.best[i])]
+    return row
+
+
+def _scalar(value: Any) -> Any:
+    return value.item() if hasattr(value, "item") else value
+
+
+def _evidence(kind: str, row: Dict[str, Any], rules: ExpansionRules) -> str:
+    if kind == "SEAT_EXPANSION":
+        return (f"License utilization at {row['utilization_pct']}% ({row['active_users']}/{row['license_cap']}). "
+                f"{_extra_seats(row['active_users'], row['license_cap'], rules)} more seats bring it to "
+                f"{rules.target_utilization:.0%}.")
+    if kind == "ENTERPRISE_UPGRADE":
+        return "High API consumption detected on non-Enterprise plan."
+    return f"Heavy reporting usage without the AI Assistant (NPS {row['nps']})."
+
+
+def _extra_seats(active: int, cap: int, rules: ExpansionRules) -> int:
+    return max(math.ceil(active / rules.target_utilization) - cap, 1)
+
+
+def _describe(rank: int, row: Dict[str, Any], rules: ExpansionRules) -> Dict[str, Any]:
+    signals = [{
+        "type": kind,
+        "evidence": _evidence(kind, row, rules),
+        "confidence": CONFIDENCE[kind],
+        "arr_impact": round(row["impact"][kind]),
+        "expected_arr": round(row["impact"][kind] * CONFIDENCE[kind] * row["discount"]),
+    } for kind in SIGNAL_TYPES if row["impact"][kind] > 0]
+    best = next(s for s in signals if s["type"] == row["best"])
+    return {
+        "rank": rank,
+        "domain": row["domain"],
+        "signal": best,
+        "signals": signals,
+        "expected_arr": best["expected_arr"],
+        "at_risk": row["discount"] < 1,
+        "usage_report": report_from_row(row),
+    }
+
+
+# --- NumPy rules ---
+
+def _labels(values: Any) -> "np.ndarray":
+    # Label columns stay Python strings: building a fixed-width unicode array from a
+    # list costs several times more than the object array and its comparisons
+    return values if isinstance(values, np.ndarray) else np.asarray(values, dtype=object)
+
+
+def _score_numpy(batch: RecordBatch, rules: ExpansionRules) -> _Scored:
+    cap = np.asarray(batch["license_cap"], dtype=np.float64)
+    active = np.asarray(batch["active_users"], dtype=np.float64)
+    plan = _labels(batch["plan"])
+    enterprise_plan = plan == "Enterprise"
+    seat_arr = np.where(enterprise_plan, rules.enterprise_seat_arr, rules.pro_seat_arr)
+
+    utilization = np.divide(active, cap, out=np.zeros_like(active), where=cap > 0)
+    extra_seats = np.maximum(np.ceil(active / rules.target_utilization) - cap, 1)
+    # Rule 1: Seat Pressure
+    seat = np.where(utilization > rules.seat_pressure, extra_seats * seat_arr, 0.0)
+    # Rule 2: API Power User on a non-Enterprise plan
+    api_high = _labels(batch["api_access"]) == "HIGH"
+    upgrade = np.where(api_high & ~enterprise_plan, cap * (rules.enterprise_seat_arr - rules.pro_seat_arr), 0.0)
+    # Rule 3: Reporting-heavy, happy account without the AI Assistant
+    nps = np.asarray(batch["nps"], dtype=np.float64)
+    ai = _labels(batch["ai_assistant"])
+    ai_unused = (ai == "NONE") | (ai == "LOW")
+    reporting_high = _labels(batch["reporting"]) == "HIGH"
+    addon = np.where(reporting_high & ai_unused & (nps >= rules.ai_addon_min_nps), active * rules.ai_addon_arr, 0.0)
+
+    at_risk = (nps < rules.at_risk_nps) \
+        | (np.asarray(batch["tickets_open"], dtype=np.float64) >= rules.at_risk_tickets) \
+        | (np.asarray(batch["last_login_days_ago"], dtype=np.float64) > rules.at_risk_inactive_days)
+    discount = np.where(at_risk, rules.at_risk_discount, 1.0)
+
+    impact = {"SEAT_EXPANSION": seat, "ENTERPRISE_UPGRADE": upgrade, "AI_ASSISTANT_ADDON": addon}
+    weighted = np.stack([impact[kind] * CONFIDENCE[kind] for kind in SIGNAL_TYPES]) * discount
+    best = np.argmax(weighted, axis=0)  # first type wins ties, like SIGNAL_TYPES order
+    return _Scored(impact, discount, best, weighted[best, np.arange(len(best))])
+
+
+# --- Pure-Python rules (no NumPy) ---
+
+def _score_python(batch: RecordBatch, rules: ExpansionRules) -> _Scored:
+    impact: Dict[str, List[float]] = {kind: [] for kind in SIGNAL_TYPES}
+    discounts, best, expected = [], [], []
+    for cap, active, plan, api, reporting, ai, nps, tickets, idle in zip(
+            *(batch[col] for col in ("license_cap", "active_users", "plan", "api_access", "reporting",
+                                     "ai_assistant", "nps", "tickets_open", "last_login_days_ago"))):
+        seat_arr = rules.enterprise_seat_arr if plan == "Enterprise" else rules.pro_seat_arr
+        utilization = active / cap if cap > 0 else 0.0
+        row = {
+            "SEAT_EXPANSION": float(_extra_seats(active, cap, rules) * seat_arr)
+            if utilization > rules.seat_pressure else 0.0,
+            "ENTERPRISE_UPGRADE": cap * (rules.enterprise_seat_arr - rules.pro_seat_arr)
+            if api == "HIGH" and plan != "Enterprise" else 0.0,
+            "AI_ASSISTANT_ADDON": active * rules.ai_addon_arr
+            if reporting == "HIGH" and ai in ("NONE", "LOW") and nps >= rules.ai_addon_min_nps else 0.0,
+        }
+        at_risk = nps < rules.at_risk_nps or tickets >= rules.at_risk_tickets \
+            or idle > rules.at_risk_inactive_days
+        discount = rules.at_risk_discount if at_risk else 1.0
+        weighted = [row[kind] * CONFIDENCE[kind] * discount for kind in SIGNAL_TYPES]
+        top = max(range(len(SIGNAL_TYPES)), key=lambda i: (weighted[i], -i))
+        for kind in SIGNAL_TYPES:
+            impact[kind].append(row[kind])
+        discounts.append(discount)
+        best.append(top)
+        expected.append(weighted[top])
+    return _Scored(impact, discounts, best, expected)
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    from app.seeders.usage_seeder import UsageSeeder
+
+    def legacy(report):
+        # The pre-engine analyze_growth rules, one account at a time
+        signals = []
+        if report["signals"]["seat_constrained"]:
+            signals.append({"type": "SEAT_EXPANSION", "confidence": 0.95})
+        if report["features"]["api_access"] == "HIGH" and report["subscription"]["plan"] != "Enterprise":
+            signals.append({"type": "ENTERPRISE_UPGRADE", "confidence": 0.85})
+        return max(signals, key=lambda x: x["confidence"]) if signals else None
+
+    sizes = [int(s) for s in sys.argv[1:]] or [10_000, 100_000, 1_000_000]
+    print(f"numpy: {NUMPY_AVAILABLE}")
+    for size in sizes:
+        # Usage is generated columnar and not timed; the legacy loop gets its dict reports
+        batches = list(UsageSeeder.iter_usage_batches(size, page_size=CHUNK_SIZE, seed=7))
+        reports = [report_from_row({col: b[col][i] for col in USAGE_COLUMNS}) for b in batches
+                   for i in range(batch_len(b))] if size <= 100_000 else None
+        if reports:
+            for r in reports:
+                s = r["subscription"]
+                r["signals"] = {"seat_constrained": s["active_users"] / s["license_cap"] > 0.90}
+            start = time.perf_counter()
+            for r in reports:
+                legacy(r)
+            t_legacy = time.perf_counter() - start
+
+        scan = ExpansionScan(top_k=25)
+        start = time.perf_counter()
+        for b in batches:
+            scan.add_batch(b)
+        ranked = scan.ranked()
+        t_engine = time.perf_counter() - start
+        line = f"{size:>9,} accounts: engine {t_engine:6.3f}s ({size / t_engine:>10,.0f} accounts/s)"
+        if NUMPY_AVAILABLE:
+            # Sources that already hold arrays (warehouse exports) skip the list -> array step
+            arrays = [{col: np.asarray(v) for col, v in b.items()} for b in batches]
+            columnar = ExpansionScan(top_k=25)
+            start = time.perf_counter()
+            for b in arrays:
+                columnar.add_batch(b)
+            columnar.ranked()
+            t_columnar = time.perf_counter() - start
+            line += f" | columnar {t_columnar:6.3f}s ({size / t_columnar:>11,.0f} accounts/s)"
+        if reports:
+            line += f" | legacy rules {t_legacy:6.3f}s ({size / t_legacy:>10,.0f} accounts/s)"
+        print(f"{line} | {scan.opportunities:,} opportunities, top: {ranked[0]['domain']} "
+              f"${ranked[0]['expected_arr']:,}")
@@ -1,70 +1,169 @@
+import asyncio
 import httpx
+import logging
 import random
-from typing import Optional, Dict
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from app.core.http import http_clients
 
 class Fetcher:
     """
     Robust HTTP Client for the Researcher Agent.
-    Features: User-Agent rotation, Timeout handling, Jina Reader fallback.
+    Features: User-Agent rotation, Timeout handling, Jina Reader fallback,
+    shared connection pool, per-host concurrency cap, hedged proxy requests.
     """
-    
+
     USER_AGENTS = [
         "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
         "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
         "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
     ]
 
-    def __init__(self):
-        self.client = httpx.AsyncClient(timeout=10.0, follow_redirects=True)
+    PER_HOST_LIMIT = 2       # concurrent requests per host
+    PROXY_HOST = "r.jina.ai"
+    PROXY_LIMIT = 8          # the proxy serves every host's fallback, so it gets its own cap
+    HEDGE_AFTER_S = 3.0      # start the Jina request if direct is still pending after this
+    BLOCKED_STATUSES = (403, 401, 503)
+
+    def __init__(self, client: Optional[httpx.AsyncClient] = None):
+        self._client = client
+        # (event loop, host) -> [semaphore, requests holding or waiting on it].
+        # Entries are dropped when the last request for a host finishes, so the
+        # map only holds hosts with requests in flight.
+        self._host_limits: Dict[Tuple[asyncio.AbstractEventLoop, str], List[Any]] = {}
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        # Pooled "web" client owned by the app lifespan
+        return self._client or http_clients.get("web")
 
-    async def fetch(self, url: str) -> Dict[str, str]:
+    @asynccontextmanager
+    async def _host_limit(self, url: str, acquired: Optional[asyncio.Event] = None) -> AsyncIterator[None]:
+        host = urlparse(url).netloc
+        key = (asyncio.get_running_loop(), host)
+        entry = self._host_limits.get(key)
+        if entry is None:
+            limit = self.PROXY_LIMIT if host == self.PROXY_HOST else self.PER_HOST_LIMIT
+            entry = self._host_limits[key] = [asyncio.Semaphore(limit), 0]
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                if acquired:
+                    acquired.set()
+                yield
+        finally:
+            entry[1] -= 1
+            if not entry[1]:
+                del self._host_limits[key]
+
+    async def _read_limited(self, url: str, headers: Dict[str, str], max_chars: Optional[int],
+                            acquired: Optional[asyncio.Event] = None) -> httpx.Response | Dict[str, str]:
         """
-        Attempts to fetch a URL. Returns dict with 'content', 'status', 'method'.
+        Stream the body and stop once `max_chars` characters are decoded, so large pages
+        don't get downloaded in full only to be truncated.
+        Returns the raw response when the status isn't 200. `acquired` is set once
+        the request holds its host slot.
         """
-        headers = {"User-Agent": random.choice(self.USER_AGENTS)}
-        
-        try:
-            # 1. Direct Request
-            print(f"🌐 Fetching {url}...")
-            resp = await self.client.get(url, headers=headers)
-            
-            if resp.status_code == 200:
+        async with self._host_limit(url, acquired):
+            async with self.client.stream("GET", url, headers=headers) as resp:
+                if resp.status_code != 200:
+                    return resp
+                parts = []
+                size = 0
+                async for text in resp.aiter_text():
+                    parts.append(text)
+                    size += len(text)
+                    if max_chars is not None and size >= max_chars:
+                        break
+                content = "".join(parts)
                 return {
-                    "content": resp.text,
-                    "status": "success", 
-                    "method": "direct",
+                    "content": content[:max_chars] if max_chars is not None else content,
+                    "status": "success",
                     "url": str(resp.url)
                 }
-            
+
+    async def _fetch_direct(self, url: str, max_chars: Optional[int],
+                            acquired: Optional[asyncio.Event] = None) -> Dict[str, str]:
+        headers = {"User-Agent": random.choice(self.USER_AGENTS)}
+        print(f"🌐 Fetching {url}...")
+        result = await self._read_limited(url, headers, max_chars, acquired)
+        if isinstance(result, dict):
+            result["method"] = "direct"
+            return result
+        if result.status_code in self.BLOCKED_STATUSES:
+            return {"content": "", "status": "blocked", "error_code": result.status_code}
+        return {"content": "", "status": "error", "error_code": result.status_code}
+
+    async def fetch(self, url: str, max_chars: Optional[int] = None) -> Dict[str, str]:
+        """
+        Attempts to fetch a URL. Returns dict with 'content', 'status', 'method'.
+        If the direct request is slow, a Jina Reader request is hedged in parallel
+        and whichever succeeds first wins.
+        """
+        acquired = asyncio.Event()
+        direct = asyncio.create_task(self._fetch_direct(url, max_chars, acquired))
+        slot = asyncio.create_task(acquired.wait())
+        proxy: Optional[asyncio.Task] = None
+
+        try:
+            # 1. Direct Request (give it a head start). The hedge timer starts once it
+            # holds a host slot: waiting behind other requests to the same host is not
+            # slowness, and hedging it would only add proxy load under contention.
+            await asyncio.wait({direct, slot}, return_when=asyncio.FIRST_COMPLETED)
+            done, _ = await asyncio.wait({direct}, timeout=self.HEDGE_AFTER_S)
+            if not done:
+                logging.info(f"{url} slow (> {self.HEDGE_AFTER_S}s). Hedging with Jina Reader Proxy")
+                proxy = asyncio.create_task(self._fetch_via_jina(url, max_chars))
+                pending = {direct, proxy}
+                while pending:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        if task.exception() is None and task.result()["status"] == "success":
+                            return task.result()
+                # Neither succeeded; fall through to report the direct outcome
+
+            try:
+                result = direct.result()
+            except Exception as e:
+                print(f"❌ Error fetching {url}: {e}. Trying Fallback...")
+                return proxy.result() if proxy else await self._fetch_via_jina(url, max_chars)
+
+            if result["status"] == "success":
+                return result
+
             # 2. Fallback: Jina Reader (Free Markdown Proxy)
             # Used when sites block bots or possess complex JS
-            if resp.status_code in [403, 401, 503]:
-                print(f"⚠️ Direct access blocked ({resp.status_code}). Trying Jina Reader Proxy...")
-                return await self._fetch_via_jina(url)
-                
-            return {"content": "", "status": "error", "error_code": resp.status_code}
-            
-        except Exception as e:
-            print(f"❌ Error fetching {url}: {e}. Trying Fallback...")
-            return await self._fetch_via_jina(url)
+            if result["status"] == "blocked":
+                if proxy:
+                    return proxy.result()
+                print(f"⚠️ Direct access blocked ({result['error_code']}). Trying Jina Reader Proxy...")
+                return await self._fetch_via_jina(url, max_chars)
 
-    async def _fetch_via_jina(self, url: str) -> Dict[str, str]:
+            result["status"] = "error"
+            return result
+        finally:
+            for task in (direct, slot, proxy):
+                if task and not task.done():
+                    task.cancel()
+
+    async def _fetch_via_jina(self, url: str, max_chars: Optional[int] = None) -> Dict[str, str]:
         """
         Uses https://r.jina.ai/ to get a clean Markdown representation of the page.
         """
         jina_url = f"https://r.jina.ai/{url}"
         try:
-            resp = await self.client.get(jina_url)
-            if resp.status_code == 200:
-                 return {
-                    "content": resp.text,
-                    "status": "success",
-                    "method": "jina_proxy",
-                    "url": url
-                }
-            return {"content": "", "status": "error", "error_code": resp.status_code}
+            result = await self._read_limited(jina_url, {}, max_chars)
+            if isinstance(result, dict):
+                result["method"] = "jina_proxy"
+                result["url"] = url
+                return result
+            return {"content": "", "status": "error", "error_code": result.status_code}
         except Exception as e:
             return {"content": "", "status": "error", "error_msg": str(e)}
 
     async def close(self):
-        await self.client.aclose()
+        # Only close an injected client; the shared pool is closed on app shutdown
+        if self._client:
+            await self._client.aclose()
@@ -2,14 +2,21 @@ import os
 import httpx
 from typing import Optional, Dict, Any
 
+from app.core.http import http_clients
+
 class HubSpotService:
-    def __init__(self):
+    def __init__(self, client: Optional[httpx.AsyncClient] = None):
         self.access_token = os.getenv("HUBSPOT_ACCESS_TOKEN")
         self.base_url = "https://api.hubapi.com/crm/v3/objects"
         self.headers = {
             "Authorization": f"Bearer {self.access_token}",
             "Content-Type": "application/json"
         }
+        self._client = client
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        return self._client or http_clients.get("hubspot")
 
     async def get_company_by_domain(self, domain: str) -> Optional[Dict[str, Any]]:
         if not self.access_token:
@@ -28,12 +35,11 @@ class HubSpotService:
             "properties": ["name", "domain", "city", "description", "industry"]
         }
         
-        async with httpx.AsyncClient() as client:
-            response = await client.post(url, headers=self.headers, json=payload)
-            if response.status_code == 200:
-                results = response.json().get('results')
-                return results[0] if results else None
-            return None
+        response = await self.client.post(url, headers=self.headers, json=payload)
+        if response.status_code == 200:
+            results = response.json().get('results')
+            return results[0] if results else None
+        return None
 
     async def update_company(self, company_id: str, properties: Dict[str, str]):
         if not self.access_token:
@@ -41,5 +47,4 @@ class HubSpotService:
             return
             
         url = f"{self.base_url}/companies/{company_id}"
-        async with httpx.AsyncClient() as client:
-            await client.patch(url, headers=self.headers, json={"properties": properties})
+        await self.client.patch(url, headers=self.headers, json={"properties": properties})
@@ -0,0 +1,429 @@
+import warnings
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:  # pure-Python fallback, same results
+    np = None
+    NUMPY_AVAILABLE = False
+
+CHUNK_SIZE = 50_000
+
+STALE_FIX = "Move to 'Closed Lost' or enrolling in 'Wake Up' sequence."
+FUTURE_FIX = "Correct the activity date; future dates hide deals from staleness checks."
+ENRICH_FIX = "Auto-Enrich via Clearbit/Apollo."
+DEAL_FIELDS_FIX = "Ask the deal owner to complete the record."
+
+# Bit per missing field, in description order
+CONTACT_FIELDS = (("email", "Email"), ("title", "Title"))
+DEAL_FIELDS = (("last_activity_date", "Last Activity Date"), ("amount", "Amount"))
+
+# Columns the rules read. A record batch maps each column to an equal-length sequence
+# (list or NumPy array); sources that page columnar data skip the row -> column step.
+DEAL_COLUMNS = ("deal_id", "name", "amount", "last_activity_date")
+CONTACT_COLUMNS = ("contact_id", "email", "title")
+RecordBatch = Dict[str, Sequence[Any]]
+
+
+def utc_now() -> datetime:
+    """Current time in the engine's reference frame: naive UTC."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def to_utc(value: datetime) -> datetime:
+    """Aware datetimes -> naive UTC; naive ones are taken to be UTC already."""
+    if value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def epoch_s(value: datetime) -> float:
+    """Unix time of an engine datetime (naive values are UTC, not local time)."""
+    return to_utc(value).replace(tzinfo=timezone.utc).timestamp()
+
+
+def to_batch(records: Sequence[Dict[str, Any]], columns: Sequence[str]) -> RecordBatch:
+    """Row dicts -> record batch (missing keys become None)."""
+    return {col: [r.get(col) for r in records] for col in columns}
+
+
+def batch_len(batch: RecordBatch) -> int:
+    return len(next(iter(batch.values()), ()))
+
+
+@dataclass
+class HygieneRules:
+    stale_days: int = 30
+    high_value_amount: float = 50_000
+    future_grace_days: int = 1  # clock skew / timezone slack before a date counts as "future"
+
+
+@dataclass
+class _Flagged:
+    """Only the columns needed to describe the flagged rows of one chunk; issues are built on demand."""
+    kind: str
+    ids: Sequence[Any]
+    names: Sequence[Any] = ()
+    amounts: Sequence[Any] = ()
+    days: Sequence[Any] = ()
+    missing: Sequence[int] = ()
+
+
+@dataclass
+class HygieneScan:
+    """
+    Streaming rule evaluation over CRM records.
+
+    Feed records in chunks (`add_deals` / `add_contacts`); each chunk is turned into
+    columns and every rule is evaluated as a whole-column mask (NumPy when
+    installed). Only the flagged rows' ids and description fields are kept, so
+    memory grows with the number of issues, not the number of records, and issue
+    dicts are only materialized when `issues()` is iterated.
+
+    Dates are compared in UTC: offset-suffixed values (HubSpot's `...Z`) are
+    converted, naive ones are read as UTC, and `now` is normalized the same way.
+    """
+
+    rules: HygieneRules = field(default_factory=HygieneRules)
+    now: datetime = field(default_factory=utc_now)
+    total_records: int = 0
+    flagged_records: int = 0
+    counts: Dict[str, int] = field(default_factory=dict)
+    _flagged: List[_Flagged] = field(default_factory=list)
+
+    def __post_init__(self):
+        self.now = to_utc(self.now)
+
+    # --- ingest ---
+
+    def add_deals(self, deals: Sequence[Dict[str, Any]]) -> int:
+        """Evaluate deal records (row dicts). Returns the number of issues found."""
+        return sum(self.add_deal_batch(to_batch(deals[i:i + CHUNK_SIZE], DEAL_COLUMNS))
+                   for i in range(0, len(deals), CHUNK_SIZE))
+
+    def add_contacts(self, contacts: Sequence[Dict[str, Any]]) -> int:
+        """Evaluate contact records (row dicts). Returns the number of issues found."""
+        return sum(self.add_contact_batch(to_batch(contacts[i:i + CHUNK_SIZE], CONTACT_COLUMNS))
+                   for i in range(0, len(contacts), CHUNK_SIZE))
+
+    def add_deal_batch(self, batch: RecordBatch) -> int:
+        flagged = _deal_rules_numpy(batch, self.rules, self.now) if NUMPY_AVAILABLE \
+            else _deal_rules_python(batch, self.rules, self.now)
+        return self._record(batch_len(batch), flagged)
+
+    def add_contact_batch(self, batch: RecordBatch) -> int:
+        flagged = _contact_rules_numpy(batch) if NUMPY_AVAILABLE else _contact_rules_python(batch)
+        return self._record(batch_len(batch), flagged)
+
+    def _record(self, n_records: int, flagged: List[_Flagged]) -> int:
+        self.total_records += n_records
+        found = 0
+        for f in flagged:
+            if len(f.ids):
+                self._flagged.append(f)
+                self.counts[f.kind] = self.counts.get(f.kind, 0) + len(f.ids)
+                found += len(f.ids)
+        # Rules within an entity are mutually exclusive per record, so issues == flagged records
+        self.flagged_records += found
+        return found
+
+    # --- results ---
+
+    @property
+    def issue_count(self) -> int:
+        return sum(self.counts.values())
+
+    @property
+    def health_score(self) -> int:
+        return health_score(self.flagged_records, self.total_records)
+
+    def issues(self) -> Iterator[Dict[str, Any]]:
+        """Issue dicts in scan order, built lazily."""
+        for f in self._flagged:
+            yield from _describe(f, self.rules)
+
+    def flagged(self) -> Iterator[Tuple[str, Any]]:
+        """(issue type, record id) for every flagged record, without building issue dicts."""
+        for f in self._flagged:
+            for record_id in f.ids:
+                yield f.kind, record_id
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "records": self.total_records,
+            "flagged_records": self.flagged_records,
+            "issues": self.issue_count,
+            "by_type": dict(self.counts),
+            "health_score": self.health_score,
+        }
+
+
+def health_score(flagged_records: int, total_records: int) -> int:
+    """Share of clean records, 0-100 (100 for an empty CRM)."""
+    if not total_records:
+        return 100
+    # Floor at 0, max 100
+    return max(0, int(100 - (flagged_records / total_records * 100)))
+
+
+def _describe(f: _Flagged, rules: HygieneRules) -> Iterator[Dict[str, Any]]:
+    if f.kind == "STALE_DEAL":
+        for deal_id, name, amount, days in zip(f.ids, f.names, f.amounts, f.days):
+            amount = _number(amount)
+            yield {
+                "type": "STALE_DEAL",
+                "severity": "HIGH" if amount > rules.high_value_amount else "MED",
+                "entity_id": deal_id,
+                "description": f"Deal '{name}' (${amount:,.0f}) untouched for {int(days)} days.",
+                "suggested_fix": STALE_FIX
+            }
+    elif f.kind == "FUTURE_ACTIVITY":
+        for deal_id, name, days in zip(f.ids, f.names, f.days):
+            yield {
+                "type": "FUTURE_ACTIVITY",
+                "severity": "LOW",
+                "entity_id": deal_id,
+                "description": f"Deal '{name}' has last activity {int(-days)} days in the future.",
+                "suggested_fix": FUTURE_FIX
+            }
+    elif f.kind == "INCOMPLETE_DEAL":
+        for deal_id, name, bits in zip(f.ids, f.names, f.missing):
+            yield {
+                "type": "INCOMPLETE_DEAL",
+                "severity": "MED",
+                "entity_id": deal_id,
+                "description": f"Deal '{name}' missing: {_missing_labels(int(bits), DEAL_FIELDS)}.",
+                "suggested_fix": DEAL_FIELDS_FIX
+            }
+    elif f.kind == "INCOMPLETE_CONTACT":
+        for contact_id, bits in zip(f.ids, f.missing):
+            yield {
+                "type": "INCOMPLETE_CONTACT",
+                "severity": "LOW",
+                "entity_id": contact_id,
+                "description": f"Contact matches but missing: {_missing_labels(int(bits), CONTACT_FIELDS)}.",
+                "suggested_fix": ENRICH_FIX
+            }
+
+
+def _missing_labels(bits: int, fields) -> str:
+    return ", ".join(label for i, (_, label) in enumerate(fields) if bits & (1 << i))
+
+
+def _number(value: Any) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _parse_date(value: Any) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return to_utc(parsed)
+
+
+# --- NumPy rules ---
+
+def _dates_numpy(values: List[Any]):
+    """ISO strings -> datetime64[us], NaT for missing/unparseable. One C-level parse per chunk."""
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")  # offset-suffixed strings are converted to UTC (like _parse_date), with a warning
+        try:
+            return np.array([v or None for v in values], dtype="datetime64[us]")
+        except ValueError:
+            pass
+    # A malformed value poisons the bulk parse; fall back to row-wise for this chunk
+    parsed = [_parse_date(v) for v in values]
+    return np.array([p if p is not None else None for p in parsed], dtype="datetime64[us]")
+
+
+def _empty_numpy(values: Sequence[Any]):
+    """Mask of None / empty-string entries."""
+    if isinstance(values, np.ndarray) and values.dtype != object:
+        return np.zeros(len(values), dtype=bool) if values.dtype.kind != "U" else values == ""
+    arr = np.asarray(values, dtype=object)
+    return (arr == None) | (arr == "")  # noqa: E711  (element-wise)
+
+
+def _deal_rules_numpy(batch: RecordBatch, rules: HygieneRules, now: datetime) -> List[_Flagged]:
+    ids = np.asarray(batch["deal_id"], dtype=object)
+    names = np.asarray(batch["name"], dtype=object)
+    amounts = np.asarray(batch["amount"], dtype=object)
+    dates = batch["last_activity_date"]
+    if not (isinstance(dates, np.ndarray) and dates.dtype.kind == "M"):
+        dates = _dates_numpy(dates)
+    amount_missing = _empty_numpy(batch["amount"])
+
+    date_missing = np.isnat(dates)
+    # Whole days, truncated like timedelta.days
+    age_days = np.floor((np.datetime64(now, "us") - dates) / np.timedelta64(1, "D"))
+
+    missing_bits = date_missing.astype(np.int64) | (amount_missing.astype(np.int64) << 1)
+    incomplete = missing_bits > 0
+    stale = ~incomplete & (age_days > rules.stale_days)
+    future = ~incomplete & (age_days < -rules.future_grace_days)
+
+    flagged = []
+    for kind, mask in (("STALE_DEAL", stale), ("FUTURE_ACTIVITY", future), ("INCOMPLETE_DEAL", incomplete)):
+        idx = np.flatnonzero(mask)
+        if not len(idx):
+            continue
+        flagged.append(_Flagged(
+            kind, ids[idx], names[idx],
+            amounts=amounts[idx],
+            days=age_days[idx],
+            missing=missing_bits[idx]
+        ))
+    return flagged
+
+
+def _contact_rules_numpy(batch: RecordBatch) -> List[_Flagged]:
+    bits = np.zeros(batch_len(batch), dtype=np.int64)
+    for i, (key, _) in enumerate(CONTACT_FIELDS):
+        bits |= _empty_numpy(batch[key]).astype(np.int64) << i
+    idx = np.flatnonzero(bits)
+    if not len(idx):
+        return []
+    ids = np.asarray(batch["contact_id"], dtype=object)[idx]
+    return [_Flagged("INCOMPLETE_CONTACT", ids, missing=bits[idx])]
+
+
+# --- Pure-Python rules (no NumPy) ---
+
+def _deal_rules_python(batch: RecordBatch, rules: HygieneRules, now: datetime) -> List[_Flagged]:
+    buckets: Dict[str, _Flagged] = {
+        kind: _Flagged(kind, [], [], [], [], []) for kind in ("STALE_DEAL", "FUTURE_ACTIVITY", "INCOMPLETE_DEAL")
+    }
+    for deal_id, name, amount, date in zip(*(batch[col] for col in DEAL_COLUMNS)):
+        last_active = _parse_date(date)
+        bits = (last_active is None) | ((amount is None or amount == "") << 1)
+        if bits:
+            kind, days = "INCOMPLETE_DEAL", 0
+        else:
+            days = (now - last_active).days
+            if days > rules.stale_days:
+                kind = "STALE_DEAL"
+            elif days < -rules.future_grace_days:
+                kind = "FUTURE_ACTIVITY"
+            else:
+                continue
+        f = buckets[kind]
+        f.ids.append(deal_id)
+        f.names.append(name)
+        f.amounts.append(amount)
+        f.days.append(days)
+        f.missing.append(bits)
+    return list(buckets.values())
+
+
+def _contact_rules_python(batch: RecordBatch) -> List[_Flagged]:
+    f = _Flagged("INCOMPLETE_CONTACT", [], missing=[])
+    columns = [batch[key] for key, _ in CONTACT_FIELDS]
+    for contact_id, *values in zip(batch["contact_id"], *columns):
+        bits = 0
+        for i, value in enumerate(values):
+            if value is None or value == "":
+                bits |= 1 << i
+        if bits:
+            f.ids.append(contact_id)
+            f.missing.append(bits)
+    return [f]
+
+
+def scan_records(deals: Iterable[Sequence[Dict[str, Any]]] = (), contacts: Iterable[Sequence[Dict[str, Any]]] = (),
+                 rules: Optional[HygieneRules] = None, now: Optional[datetime] = None) -> HygieneScan:
+    """Run a scan over iterables of record chunks (e.g. CRM pages)."""
+    scan = HygieneScan(rules=rules or HygieneRules(), now=now or utc_now())
+    for chunk in deals:
+        scan.add_deals(chunk)
+    for chunk in contacts:
+        scan.add_contacts(chunk)
+    return scan
+
+
+if __name__ == "__main__":
+    import random
+    import sys
+    import time
+
+    # Synthetic CRM with the seeder's mix: 40% stale deals, ~50% incomplete contacts.
+    # Generation is not timed; records are produced and evaluated in CHUNK_SIZE pages.
+    def deal_chunk(offset: int, n: int, now: datetime):
+        return [{
+            "deal_id": f"deal_{offset + i}",
+            "name": f"Opportunity #{offset + i}",
+            "amount": random.choice([10000, 25000, 50000, 120000]),
+            "last_activity_date": (now - timedelta(days=random.randint(45, 120) if random.random() < 0.4
+                                                   else random.randint(1, 14))).isoformat(),
+        } for i in range(n)]
+
+    def contact_chunk(offset: int, n: int):
+        return [{
+            "contact_id": f"contact_{offset + i}",
+            "email": f"c{offset + i}@example.com" if random.random() > 0.2 else None,
+            "title": "Director of Sales" if random.random() > 0.5 else None,
+        } for i in range(n)]
+
+    def legacy(deals, contacts, now):
+        # The pre-engine detect_anomalies loop
+        issues = []
+        for deal in deals:
+            days_inactive = (now - datetime.fromisoformat(deal["last_activity_date"])).days
+            if days_inactive > 30:
+                issues.append({
+                    "type": "STALE_DEAL",
+                    "severity": "HIGH" if deal["amount"] > 50000 else "MED",
+                    "entity_id": deal["deal_id"],
+                    "description": f"Deal '{deal['name']}' (${deal['amount']:,}) untouched for {days_inactive} days.",
+                    "suggested_fix": STALE_FIX
+                })
+        for contact in contacts:
+            missing = [label for key, label in CONTACT_FIELDS if not contact[key]]
+            if missing:
+                issues.append({"type": "INCOMPLETE_CONTACT", "entity_id": contact["contact_id"],
+                               "description": f"Contact matches but missing: {', '.join(missing)}."})
+        return len(issues)
+
+    random.seed(7)
+    sizes = [int(s) for s in sys.argv[1:]] or [10_000, 100_000, 1_000_000]
+    print(f"numpy: {NUMPY_AVAILABLE}")
+    for size in sizes:
+        now = utc_now()
+        scan, columnar = HygieneScan(now=now), HygieneScan(now=now)
+        t_legacy = t_engine = t_columnar = 0.0
+        legacy_issues = 0
+        for offset in range(0, size, CHUNK_SIZE):
+            n = min(CHUNK_SIZE, size - offset)
+            deals, contacts = deal_chunk(offset, n, now), contact_chunk(offset, n)
+            start = time.perf_counter()
+            legacy_issues += legacy(deals, contacts, now)
+            t_legacy += time.perf_counter() - start
+            start = time.perf_counter()
+            scan.add_deals(deals)
+            scan.add_contacts(contacts)
+            t_engine += time.perf_counter() - start
+            # Pages that already arrive as columns (seeder, warehouse exports)
+            deal_batch, contact_batch = to_batch(deals, DEAL_COLUMNS), to_batch(contacts, CONTACT_COLUMNS)
+            deal_batch["last_activity_date"] = _dates_numpy(deal_batch["last_activity_date"]) \
+                if NUMPY_AVAILABLE else deal_batch["last_activity_date"]
+            start = time.perf_counter()
+            columnar.add_deal_batch(deal_batch)
+            columnar.add_contact_batch(contact_batch)
+            t_columnar += time.perf_counter() - start
+        records = 2 * size
+        assert scan.issue_count == legacy_issues, (scan.issue_count, legacy_issues)
+        start = time.perf_counter()
+        first_page = [issue for _, issue in zip(range(50), scan.issues())]
+        t_page = time.perf_counter() - start
+        print(f"{records:>9,} records: legacy {t_legacy:6.2f}s ({records / t_legacy:>10,.0f} rec/s) | "
+              f"engine {t_engine:6.2f}s ({records / t_engine:>10,.0f} rec/s) | "
+              f"columnar {t_columnar:6.2f}s ({records / t_columnar:>11,.0f} rec/s) | "
+              f"{scan.issue_count:,} issues, first 50 built in {t_page * 1000:.2f}ms")
@@ -0,0 +1,134 @@
+import logging
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+ENTITIES = ("deals", "contacts")
+SEVERITIES = ("HIGH", "MED", "LOW")
+ISSUE_ENTITY = {
+    "STALE_DEAL": "deals",
+    "FUTURE_ACTIVITY": "deals",
+    "INCOMPLETE_DEAL": "deals",
+    "INCOMPLETE_CONTACT": "contacts",
+}
+ISSUE_COLUMNS = "issue_id, entity, entity_id, issue_type, severity, description, suggested_fix, detected_at, updated_at"
+HEALTH_COLUMNS = "scanned_at, health_score, total_records, flagged_records, counts, scan_mode, records_fetched"
+MAX_PAGE_SIZE = 500
+_WRITE_CHUNK = 500  # rows / ids per PostgREST request
+
+
+class HygieneIssueRepository:
+    """
+    Materialized hygiene results in Supabase (migration 010): the open issue per CRM
+    record in `hygiene_issues`, and one `hygiene_health_scores` row per scan.
+
+    Scans write the pages they re-read, so incremental scans keep the tables current
+    at the cost of the churn. If a write fails (e.g. the migration is not applied)
+    the rest of the scan skips persistence; the next full scan rewrites everything.
+    """
+
+    def __init__(self, workspace_id: Optional[str] = None):
+        from app.providers.adapters import SupabaseAdapter
+        db = SupabaseAdapter(workspace_id=workspace_id)
+        self.client = db.client
+        self.workspace_id = db.workspace_id
+        self.failed = False
+
+    @property
+    def writable(self) -> bool:
+        return self.client is not None and not self.failed
+
+    async def _write(self, what: str, query: Any) -> None:
+        from app.core.supabase import execute_async
+        try:
+            await execute_async(query)
+        except Exception as e:
+            self.failed = True
+            logging.warning(f"Hygiene {what} not persisted for workspace {self.workspace_id}: {e}")
+
+    async def apply(self, issues: Sequence[Dict[str, Any]], resolved: Sequence[Tuple[str, str]],
+                    scanned_at: datetime) -> None:
+        """Upsert the issues open on a page of records and delete the ones that cleared."""
+        updated_at = scanned_at.isoformat()
+        rows = [{
+            "workspace_id": self.workspace_id,
+            "entity": ISSUE_ENTITY[issue["type"]],
+            "entity_id": str(issue["entity_id"]),
+            "issue_type": issue["type"],
+            "severity": issue["severity"],
+            "description": issue["description"],
+            "suggested_fix": issue["suggested_fix"],
+            "updated_at": updated_at,
+        } for issue in issues]
+        for start in range(0, len(rows), _WRITE_CHUNK):
+            if not self.writable:
+                return
+            await self._write("issues", self.client.table("hygiene_issues")
+                .upsert(rows[start:start + _WRITE_CHUNK], on_conflict="workspace_id,entity,entity_id"))
+
+        by_entity: Dict[str, List[str]] = defaultdict(list)
+        for entity, record_id in resolved:
+            by_entity[entity].append(record_id)
+        for entity, ids in by_entity.items():
+            for start in range(0, len(ids), _WRITE_CHUNK):
+                if not self.writable:
+                    return
+                await self._write("resolved issues", self.client.table("hygiene_issues")
+                    .delete()
+                    .eq("workspace_id", self.workspace_id)
+                    .eq("entity", entity)
+                    .in_("entity_id", ids[start:start + _WRITE_CHUNK]))
+
+    async def prune(self, scan_started: datetime) -> None:
+        """After a full scan: drop issues the scan did not refresh (resolved or deleted records)."""
+        if self.writable:
+            await self._write("issue prune", self.client.table("hygiene_issues")
+                .delete()
+                .eq("workspace_id", self.workspace_id)
+                .lt("updated_at", scan_started.isoformat()))
+
+    async def record_health(self, summary: Dict[str, Any], changes: Dict[str, Any], scanned_at: datetime) -> None:
+        if self.writable:
+            await self._write("health score", self.client.table("hygiene_health_scores").insert({
+                "workspace_id": self.workspace_id,
+                "scanned_at": scanned_at.isoformat(),
+                "health_score": summary["health_score"],
+                "total_records": summary["records"],
+                "flagged_records": summary["flagged_records"],
+                "counts": summary["by_type"],
+                "scan_mode": changes["mode"],
+                "records_fetched": changes["records_fetched"],
+            }))
+
+    # --- reads (errors propagate to the endpoint) ---
+
+    async def list_issues(self, entity: Optional[str] = None, issue_type: Optional[str] = None,
+                          severity: Optional[str] = None, after: Optional[int] = None,
+                          limit: int = 50) -> Dict[str, Any]:
+        """One page of open issues in detection order; pass `next_cursor` back as `after`."""
+        from app.core.supabase import execute_async
+        query = self.client.table("hygiene_issues").select(ISSUE_COLUMNS).eq("workspace_id", self.workspace_id)
+        if entity:
+            query = query.eq("entity", entity)
+        if issue_type:
+            query = query.eq("issue_type", issue_type)
+        if severity:
+            query = query.eq("severity", severity)
+        if after is not None:
+            query = query.gt("issue_id", after)
+        response = await execute_async(query.order("issue_id").limit(limit))
+        issues = response.data or []
+        return {
+            "issues": issues,
+            "next_cursor": issues[-1]["issue_id"] if len(issues) == limit else None,
+        }
+
+    async def health_history(self, limit: int = 1) -> List[Dict[str, Any]]:
+        """Most recent health score rows, newest first."""
+        from app.core.supabase import execute_async
+        response = await execute_async(self.client.table("hygiene_health_scores")
+            .select(HEALTH_COLUMNS)
+            .eq("workspace_id", self.workspace_id)
+            .order("scanned_at", desc=True)
+            .limit(limit))
+        return response.data or []
@@ -0,0 +1,334 @@
+import asyncio
+import json
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from app.services.hygiene_engine import (
+    CONTACT_COLUMNS, DEAL_COLUMNS, HygieneRules, HygieneScan, RecordBatch, _parse_date, batch_len, epoch_s,
+    health_score, utc_now
+)
+
+ENTITY_COLUMNS = {"deals": DEAL_COLUMNS, "contacts": CONTACT_COLUMNS}
+ID_COLUMN = {"deals": "deal_id", "contacts": "contact_id"}
+DAY_S = 86400
+
+# What merging a page changed: issues now open on its records (re-described, so
+# day counts are current) and (entity, record_id) of records whose issue cleared
+PageChanges = Tuple[List[Dict[str, Any]], List[Tuple[str, str]]]
+_SQL_PARAMS = 500  # ids per IN (...) lookup
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS hygiene_workspaces (
+    workspace_id TEXT PRIMARY KEY,
+    source TEXT NOT NULL,
+    cursor TEXT,
+    scanned_at REAL,
+    total_records INTEGER NOT NULL DEFAULT 0,
+    counts TEXT NOT NULL DEFAULT '{}'
+);
+CREATE TABLE IF NOT EXISTS hygiene_records (
+    workspace_id TEXT NOT NULL,
+    entity TEXT NOT NULL,
+    record_id TEXT NOT NULL,
+    issue_type TEXT,
+    activity_at REAL,
+    seen_at REAL NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (workspace_id, entity, record_id)
+);
+CREATE INDEX IF NOT EXISTS idx_hygiene_records_activity ON hygiene_records(workspace_id, entity, activity_at);
+CREATE INDEX IF NOT EXISTS idx_hygiene_records_issue ON hygiene_records(workspace_id, issue_type);
+"""
+
+
+def new_delta() -> Dict[str, Any]:
+    return {"records_fetched": 0, "new_records": 0, "removed_records": 0, "opened": {}, "resolved": {}}
+
+
+def _bump(counts: Dict[str, int], key: str, n: int = 1) -> None:
+    counts[key] = counts.get(key, 0) + n
+    if not counts[key]:
+        del counts[key]
+
+
+class HygieneStore:
+    """
+    Per-workspace hygiene state for incremental scans, in a local SQLite file.
+
+    One row per CRM record holds its rule inputs and current issue type (rules are
+    mutually exclusive per record), and the workspace row holds the change cursor
+    plus running totals. Merging a page of changed records adjusts the totals by
+    the difference to what was stored, so the health score never needs a recount.
+    SQLite calls are blocking, so every public method offloads to a thread.
+    """
+
+    def __init__(self, path: str = "hygiene.db"):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        if path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+
+    # --- sync internals (run in a worker thread) ---
+
+    def _state(self, workspace_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM hygiene_workspaces WHERE workspace_id = ?", (workspace_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        state = dict(row)
+        state["counts"] = json.loads(state["counts"])
+        return state
+
+    def _begin(self, workspace_id: str, source: str) -> Optional[Dict[str, Any]]:
+        """State to resume from; a new workspace or a different source starts empty."""
+        state = self._state(workspace_id)
+        if state is not None and state["source"] == source:
+            return state
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute("DELETE FROM hygiene_records WHERE workspace_id = ?", (workspace_id,))
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO hygiene_workspaces (workspace_id, source) VALUES (?, ?)",
+                    (workspace_id, source)
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return None
+
+    def _merge(self, workspace_id: str, entity: str, batch: RecordBatch, rules: HygieneRules,
+               now: datetime, delta: Dict[str, Any], fetched: bool = True) -> PageChanges:
+        """
+        Evaluate one page and fold the change in each record's issue into the totals.
+        `fetched` is False for stored rows re-evaluated without reading the source.
+        """
+        n = batch_len(batch)
+        if not n:
+            return [], []
+        scan = HygieneScan(rules=rules, now=now)
+        if entity == "deals":
+            scan.add_deal_batch(batch)
+        else:
+            scan.add_contact_batch(batch)
+        issue_by_id = {str(record_id): kind for kind, record_id in scan.flagged()}
+
+        columns = ENTITY_COLUMNS[entity]
+        ids = [str(record_id) for record_id in batch[ID_COLUMN[entity]]]
+        values = [batch[col] for col in columns]
+        dates = batch["last_activity_date"] if entity == "deals" else [None] * n
+        seen_at = epoch_s(now)
+        rows = []
+        for i, record_id in enumerate(ids):
+            activity = _parse_date(dates[i]) if dates[i] is not None else None
+            rows.append((
+                workspace_id, entity, record_id, issue_by_id.get(record_id),
+                epoch_s(activity) if activity else None, seen_at,
+                json.dumps({col: v[i] for col, v in zip(columns, values)}, default=str)
+            ))
+
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                previous: Dict[str, Optional[str]] = {}
+                for start in range(0, n, _SQL_PARAMS):
+                    chunk = ids[start:start + _SQL_PARAMS]
+                    previous.update(self._conn.execute(
+                        f"SELECT record_id, issue_type FROM hygiene_records WHERE workspace_id = ? AND entity = ? "
+                        f"AND record_id IN ({','.join('?' * len(chunk))})", (workspace_id, entity, *chunk)
+                    ).fetchall())
+
+                totals = self._conn.execute(
+                    "SELECT total_records, counts FROM hygiene_workspaces WHERE workspace_id = ?", (workspace_id,)
+                ).fetchone()
+                total, counts = totals["total_records"], json.loads(totals["counts"])
+                resolved = []
+                for record_id in dict.fromkeys(ids):  # a page may repeat a record
+                    new, known = issue_by_id.get(record_id), record_id in previous
+                    old = previous.get(record_id)
+                    if not known:
+                        total += 1
+                        delta["new_records"] += 1
+                    if old == new:
+                        continue
+                    if old:
+                        _bump(counts, old, -1)
+                        _bump(delta["resolved"], old)
+                        if not new:
+                            resolved.append((entity, record_id))
+                    if new:
+                        _bump(counts, new)
+                        _bump(delta["opened"], new)
+
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO hygiene_records "
+                    "(workspace_id, entity, record_id, issue_type, activity_at, seen_at, data) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    rows
+                )
+                self._conn.execute(
+                    "UPDATE hygiene_workspaces SET total_records = ?, counts = ? WHERE workspace_id = ?",
+                    (total, json.dumps(counts), workspace_id)
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        if fetched:
+            delta["records_fetched"] += n
+        return list(scan.issues()), resolved
+
+    def _rows_to_batch(self, entity: str, rows: Sequence[sqlite3.Row]) -> RecordBatch:
+        data = [json.loads(r["data"]) for r in rows]
+        return {col: [d.get(col) for d in data] for col in ENTITY_COLUMNS[entity]}
+
+    def _recheck_time_rules(self, workspace_id: str, rules: HygieneRules, last_scan: float,
+                            now: datetime, delta: Dict[str, Any]) -> PageChanges:
+        """
+        Deals whose stored verdict may have changed only because time passed:
+        activity that aged past the stale threshold since the last scan, and
+        future-dated activity that has come due. Both are index range reads, so
+        the cost follows how many deals crossed a threshold, not portal size.
+        """
+        now_ts = epoch_s(now)
+        margin = DAY_S  # the engine counts whole days; re-evaluate a day either side
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT data FROM hygiene_records WHERE workspace_id = ? AND entity = 'deals' "
+                "AND activity_at > ? AND activity_at <= ? AND issue_type IS NOT 'STALE_DEAL'",
+                (workspace_id, last_scan - (rules.stale_days + 1) * DAY_S - margin,
+                 now_ts - rules.stale_days * DAY_S)
+            ).fetchall()
+            rows += self._conn.execute(
+                "SELECT data FROM hygiene_records WHERE workspace_id = ? AND issue_type = 'FUTURE_ACTIVITY' "
+                "AND activity_at <= ?",
+                (workspace_id, now_ts + (rules.future_grace_days + 1) * DAY_S)
+            ).fetchall()
+        delta["time_rechecked"] = len(rows)
+        if not rows:
+            return [], []
+        return self._merge(workspace_id, "deals", self._rows_to_batch("deals", rows), rules, now, delta,
+                           fetched=False)
+
+    def _prune(self, workspace_id: str, before: float, delta: Dict[str, Any]) -> None:
+        """After a full pass: drop records the source no longer returned (deleted in the CRM)."""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                gone = self._conn.execute(
+                    "SELECT issue_type, COUNT(*) AS n FROM hygiene_records "
+                    "WHERE workspace_id = ? AND seen_at < ? GROUP BY issue_type", (workspace_id, before)
+                ).fetchall()
+                if gone:
+                    totals = self._conn.execute(
+                        "SELECT total_records, counts FROM hygiene_workspaces WHERE workspace_id = ?", (workspace_id,)
+                    ).fetchone()
+                    total, counts = totals["total_records"], json.loads(totals["counts"])
+                    for r in gone:
+                        total -= r["n"]
+                        delta["removed_records"] += r["n"]
+                        if r["issue_type"]:
+                            _bump(counts, r["issue_type"], -r["n"])
+                            _bump(delta["resolved"], r["issue_type"], r["n"])
+                    self._conn.execute(
+                        "DELETE FROM hygiene_records WHERE workspace_id = ? AND seen_at < ?", (workspace_id, before)
+                    )
+                    self._conn.execute(
+                        "UPDATE hygiene_workspaces SET total_records = ?, counts = ? WHERE workspace_id = ?",
+                        (total, json.dumps(counts), workspace_id)
+                    )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def _finish(self, workspace_id: str, cursor: Optional[str], scanned_at: float) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE hygiene_workspaces SET cursor = ?, scanned_at = ? WHERE workspace_id = ?",
+                (cursor, scanned_at, workspace_id)
+            )
+
+    def _issues(self, workspace_id: str, limit: int, rules: HygieneRules, now: datetime) -> List[Dict[str, Any]]:
+        """Current issues, described from the stored rule inputs (day counts are as of `now`)."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT entity, data FROM hygiene_records WHERE workspace_id = ? AND issue_type IS NOT NULL "
+                "ORDER BY entity DESC, record_id LIMIT ?", (workspace_id, limit)
+            ).fetchall()
+        scan = HygieneScan(rules=rules, now=now)
+        for entity in ("deals", "contacts"):
+            entity_rows = [r for r in rows if r["entity"] == entity]
+            if not entity_rows:
+                continue
+            batch = self._rows_to_batch(entity, entity_rows)
+            if entity == "deals":
+                scan.add_deal_batch(batch)
+            else:
+                scan.add_contact_batch(batch)
+        return list(scan.issues())
+
+    # --- async API ---
+
+    async def begin(self, workspace_id: str, source: str) -> Optional[Dict[str, Any]]:
+        return await asyncio.to_thread(self._begin, workspace_id, source)
+
+    async def merge(self, workspace_id: str, entity: str, batch: RecordBatch, rules: HygieneRules,
+                    now: datetime, delta: Dict[str, Any]) -> PageChanges:
+        return await asyncio.to_thread(self._merge, workspace_id, entity, batch, rules, now, delta)
+
+    async def recheck_time_rules(self, workspace_id: str, rules: HygieneRules, last_scan: float,
+                                 now: datetime, delta: Dict[str, Any]) -> PageChanges:
+        return await asyncio.to_thread(self._recheck_time_rules, workspace_id, rules, last_scan, now, delta)
+
+    async def prune(self, workspace_id: str, before: float, delta: Dict[str, Any]) -> None:
+        await asyncio.to_thread(self._prune, workspace_id, before, delta)
+
+    async def finish(self, workspace_id: str, cursor: Optional[str], scanned_at: float) -> None:
+        await asyncio.to_thread(self._finish, workspace_id, cursor, scanned_at)
+
+    async def summary(self, workspace_id: str) -> Dict[str, Any]:
+        state = await asyncio.to_thread(self._state, workspace_id) or {"total_records": 0, "counts": {}}
+        flagged = sum(state["counts"].values())
+        return {
+            "records": state["total_records"],
+            "flagged_records": flagged,
+            "issues": flagged,
+            "by_type": state["counts"],
+            "health_score": health_score(flagged, state["total_records"]),
+            "cursor": state.get("cursor"),
+            "scanned_at": state.get("scanned_at"),
+        }
+
+    async def issues(self, workspace_id: str, limit: int, rules: HygieneRules,
+                     now: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        return await asyncio.to_thread(self._issues, workspace_id, limit, rules, now or utc_now())
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_hygiene_store: Optional[HygieneStore] = None
+
+
+def get_hygiene_store() -> HygieneStore:
+    global _hygiene_store
+    if _hygiene_store is None:
+        from app.core.config import settings
+        _hygiene_store = HygieneStore(settings.HYGIENE_STORE_PATH)
+    return _hygiene_store
+
+
+def close_hygiene_store() -> None:
+    global _hygiene_store
+    if _hygiene_store is not None:
+        _hygiene_store.close()
+        _hygiene_store = None
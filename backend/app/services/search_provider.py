@@ -15,34 +15,54 @@ class SearchProvider(Protocol):
 # --- Implementation: Tavily (Free Tier) ---
 import os
 import httpx
+from typing import Optional
+
+from app.core.http import http_clients
+from app.core.search_cache import SearchResultCache, get_search_cache
 
 class TavilySearchProvider:
-    def __init__(self):
+    SEARCH_DEPTH = "basic"
+
+    def __init__(self, client: Optional[httpx.AsyncClient] = None, cache: Optional[SearchResultCache] = None):
         self.api_key = os.getenv("TAVILY_API_KEY")
         self.base_url = "https://api.tavily.com/search"
+        self._client = client
+        # Shares entries with TavilyAdapter: both cache the raw Tavily results
+        self.cache = cache or get_search_cache()
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        return self._client or http_clients.get("tavily")
 
     async def search(self, query: str, max_results: int = 5) -> List[SearchResult]:
         if not self.api_key:
             print("[WARN] No TAVILY_API_KEY found. Returning mock data.")
             return [SearchResult(url="https://example.com", title="Mock Result", content="Mock Content", score=1.0)]
 
+        if self.cache:
+            results = await self.cache.fetch(query, max_results, self.SEARCH_DEPTH,
+                                             lambda: self._search(query, max_results))
+        else:
+            results = await self._search(query, max_results)
+
+        return [
+            SearchResult(
+                url=r.get("url"),
+                title=r.get("title"),
+                content=r.get("content"),
+                score=r.get("score")
+            ) for r in results
+        ]
+
+    async def _search(self, query: str, max_results: int) -> List[dict]:
         payload = {
             "api_key": self.api_key,
             "query": query,
-            "search_depth": "basic",
+            "search_depth": self.SEARCH_DEPTH,
             "max_results": max_results
         }
         
-        async with httpx.AsyncClient() as client:
-            resp = await client.post(self.base_url, json=payload)
-            resp.raise_for_status()
-            data = resp.json()
-            
-            return [
-                SearchResult(
-                    url=r.get("url"),
-                    title=r.get("title"),
-                    content=r.get("content"),
-                    score=r.get("score")
-                ) for r in data.get("results", [])
-            ]
+        resp = await self.client.post(self.base_url, json=payload)
+        resp.raise_for_status()
+        data = resp.json()
+        return data.get("results", [])
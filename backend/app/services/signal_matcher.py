@@ -0,0 +1,120 @@
+import json
+from collections import deque
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+CANON_PATH = Path(__file__).resolve().parent.parent / "data" / "signals_canon.json"
+
+
+def load_canon(path: Path = CANON_PATH) -> Dict[str, Any]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {"signals": []}
+
+
+class SignalCanonMatcher:
+    """
+    Aho-Corasick automaton over the canonical signal triggers.
+
+    Built once from the canon; matching an event trigger is a single pass over the
+    event text (O(len(text) + matches)) no matter how many canonical signals exist.
+    Triggers written as alternatives ("hires / promotes") index each alternative.
+    A signal matches when any of its patterns is a substring of the event trigger
+    (case-insensitive); matches are ranked by the longest pattern hit, i.e. the
+    most specific trigger wins, with canon order as the tie-breaker.
+    """
+
+    def __init__(self, signals: List[Dict[str, Any]]):
+        self.signals = signals
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[tuple]] = [[]]  # (signal_index, pattern_length)
+        for idx, sig in enumerate(signals):
+            for pattern in self._patterns(sig.get("trigger", "")):
+                self._add(pattern, idx)
+        self._build_failure_links()
+
+    @classmethod
+    def from_file(cls, path: Path = CANON_PATH) -> "SignalCanonMatcher":
+        return cls(load_canon(path).get("signals", []))
+
+    @staticmethod
+    def _patterns(trigger: str) -> List[str]:
+        trigger = trigger.lower().strip()
+        if not trigger:
+            return []
+        patterns = {trigger}
+        if " / " in trigger:
+            patterns.update(p.strip() for p in trigger.split(" / ") if p.strip())
+        return list(patterns)
+
+    def _add(self, pattern: str, idx: int) -> None:
+        node = 0
+        for ch in pattern:
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            node = nxt
+        self._out[node].append((idx, len(pattern)))
+
+    def _build_failure_links(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in self._goto[node].items():
+                queue.append(child)
+                f = self._fail[node]
+                while f and ch not in self._goto[f]:
+                    f = self._fail[f]
+                self._fail[child] = self._goto[f].get(ch, 0)
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+    def match(self, trigger: str) -> List[Dict[str, Any]]:
+        """All canonical signals whose trigger appears in `trigger`, most specific first."""
+        best: Dict[int, int] = {}
+        node = 0
+        for ch in (trigger or "").lower():
+            while node and ch not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(ch, 0)
+            for idx, length in self._out[node]:
+                if length > best.get(idx, 0):
+                    best[idx] = length
+        ranked = sorted(best, key=lambda i: (-best[i], i))
+        return [self.signals[i] for i in ranked]
+
+    def best(self, trigger: str) -> Optional[Dict[str, Any]]:
+        matches = self.match(trigger)
+        return matches[0] if matches else None
+
+    def match_batch(self, triggers: Iterable[str]) -> List[List[Dict[str, Any]]]:
+        """Classify many event triggers in one call (backfills). Repeated triggers are matched once."""
+        memo: Dict[str, List[Dict[str, Any]]] = {}
+        results = []
+        for trigger in triggers:
+            key = (trigger or "").lower()
+            if key not in memo:
+                memo[key] = self.match(key)
+            results.append(memo[key])
+        return results
+
+
+if __name__ == "__main__":
+    import time
+
+    matcher = SignalCanonMatcher.from_file()
+    sample = ["receives_financing", "Company hires / promotes new CRO", "Hiring for Sales roles in EMEA", "random noise"]
+    for t in sample:
+        print(t, "->", [s["signal_id"] for s in matcher.match(t)])
+
+    events = [f"{t} #{i}" for i in range(25_000) for t in sample]
+    start = time.perf_counter()
+    matcher.match_batch(events)
+    elapsed = time.perf_counter() - start
+    print(f"{len(events)} events in {elapsed:.2f}s ({len(events) / elapsed:,.0f} events/s)")
@@ -0,0 +1,186 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional
+
+DAY_S = 86400.0
+
+
+def event_time(event: Dict[str, Any]) -> float:
+    """Epoch seconds of a raw event (`occurred_at`/`timestamp`, ISO or epoch); now if absent."""
+    value = event.get("occurred_at") or event.get("timestamp")
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return time.time()
+        if parsed.tzinfo is None:
+            parsed = parsed.replace(tzinfo=timezone.utc)
+        return parsed.timestamp()
+    return time.time()
+
+
+class SignalWindow:
+    """
+    Per-domain sliding window of combo pattern members (e.g. "hiring_sales", "tech_crm").
+
+    For each domain we keep only the latest time each member was seen, so state is
+    bounded by the number of distinct members. A new event is checked only against the
+    combos that contain one of its members, which costs O(pattern members) regardless
+    of how much history the domain has. A combo is corroborated when every member of
+    its pattern was seen within `window_days` of each other. Single-member patterns
+    are not corroboration and never fire here.
+
+    Observations can be buffered for the `signals` table (`persist=True`) and loaded
+    back with `load()`, so the window survives restarts.
+    """
+
+    def __init__(self, combos: Dict[str, Dict[str, Any]], window_days: float = 30,
+                 max_domains: int = 50_000, persist: bool = False):
+        self.combos = combos
+        self.window_s = window_days * DAY_S
+        self.max_domains = max_domains
+        self.persist = persist
+        self._index: Dict[str, List[str]] = {}
+        for key, combo in combos.items():
+            if len(combo["pattern"]) < 2:
+                continue
+            for member in combo["pattern"]:
+                self._index.setdefault(member, []).append(key)
+        self._seen: "OrderedDict[str, Dict[str, float]]" = OrderedDict()
+        self._pending: List[Dict[str, Any]] = []
+        # Sync graph nodes run on executor threads
+        self._lock = threading.Lock()
+        self.observed = 0
+        self.corroborated = 0
+
+    def observe(self, domain: str, members: Iterable[str], ts: Optional[float] = None,
+                signal_id: Optional[str] = None, record: bool = True) -> List[str]:
+        """
+        Record members seen for `domain` at `ts`; returns the combo keys this event corroborates.
+        `record=False` skips the persistence buffer (used when replaying stored rows).
+        """
+        members = [m for m in members if m in self._index]
+        if not domain or not members:
+            return []
+        ts = time.time() if ts is None else ts
+
+        with self._lock:
+            seen = self._seen.get(domain)
+            if seen is None:
+                seen = self._seen[domain] = {}
+                while len(self._seen) > self.max_domains:
+                    self._seen.popitem(last=False)
+            else:
+                self._seen.move_to_end(domain)
+
+            for member in members:
+                if ts > seen.get(member, 0.0):
+                    seen[member] = ts
+            self._evict(seen)
+
+            matched = []
+            for key in dict.fromkeys(k for m in members for k in self._index[m]):
+                stamps = [seen.get(m) for m in self.combos[key]["pattern"]]
+                if None not in stamps and max(stamps) - min(stamps) <= self.window_s:
+                    matched.append(key)
+
+            self.observed += 1
+            self.corroborated += bool(matched)
+            if self.persist and record:
+                self._pending.append({
+                    "domain": domain,
+                    "signal_type": signal_id or members[0],
+                    "signal_data": {"members": members, "observed_at": ts}
+                })
+
+        # Larger patterns are stronger corroboration; combo library order breaks ties
+        order = list(self.combos)
+        return sorted(matched, key=lambda k: (-len(self.combos[k]["pattern"]), order.index(k)))
+
+    def _evict(self, seen: Dict[str, float]) -> None:
+        newest = max(seen.values())
+        for member in [m for m, t in seen.items() if newest - t > self.window_s]:
+            del seen[member]
+
+    def seen(self, domain: str) -> Dict[str, float]:
+        with self._lock:
+            return dict(self._seen.get(domain, {}))
+
+    async def flush(self, workspace_id: Optional[str] = None) -> int:
+        """Write buffered observations to the `signals` table. Returns rows written."""
+        with self._lock:
+            rows, self._pending = self._pending, []
+        if not rows:
+            return 0
+
+        from app.providers.adapters import SupabaseAdapter
+        from app.core.supabase import execute_async
+        db = SupabaseAdapter(workspace_id=workspace_id)
+        if not db.client:
+            return 0
+        try:
+            await execute_async(db.client.table("signals").insert(
+                [{**row, "workspace_id": db.workspace_id} for row in rows]
+            ))
+            return len(rows)
+        except Exception as e:
+            logging.warning(f"Signal window flush failed ({len(rows)} rows dropped): {e}")
+            return 0
+
+    async def load(self, workspace_id: Optional[str] = None, page_size: int = 1000,
+                   limit: Optional[int] = None) -> int:
+        """
+        Rebuild the window from recent `signals` rows, newest first, paging until the
+        rows run out (or `limit` rows). Returns rows applied.
+        """
+        from app.providers.adapters import SupabaseAdapter
+        from app.core.supabase import execute_async
+        db = SupabaseAdapter(workspace_id=workspace_id)
+        if not db.client:
+            return 0
+        since = datetime.fromtimestamp(time.time() - self.window_s, tz=timezone.utc).isoformat()
+
+        applied = fetched = 0
+        while limit is None or fetched < limit:
+            size = page_size if limit is None else min(page_size, limit - fetched)
+            try:
+                # signal_id breaks created_at ties (one flush shares a timestamp), so pages don't overlap
+                response = await execute_async(db.client.table("signals")
+                    .select("domain, signal_data")
+                    .eq("workspace_id", db.workspace_id)
+                    .gte("created_at", since)
+                    .order("created_at", desc=True)
+                    .order("signal_id", desc=True)
+                    .range(fetched, fetched + size - 1))
+            except Exception as e:
+                logging.warning(f"Signal window load failed after {fetched} rows: {e}")
+                break
+            rows = response.data or []
+            if not rows:
+                break  # a short page may only be the server's max-rows cap, so stop on an empty one
+            fetched += len(rows)
+            for row in rows:
+                data = row.get("signal_data") or {}
+                if data.get("members"):
+                    self.observe(row["domain"], data["members"], data.get("observed_at"), record=False)
+                    applied += 1
+        return applied
+
+    def clear(self) -> None:
+        with self._lock:
+            self._seen.clear()
+            self._pending.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "domains": len(self._seen),
+            "window_days": self.window_s / DAY_S,
+            "observed": self.observed,
+            "corroborated": self.corroborated,
+            "pending_writes": len(self._pending)
+        }
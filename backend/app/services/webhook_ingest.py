@@ -0,0 +1,124 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Set
+
+
+@dataclass
+class _PendingRun:
+    record_id: str
+    first_seen: float
+    events: int = 0
+    properties: Set[str] = field(default_factory=set)
+    timer: Optional[asyncio.TimerHandle] = None
+
+
+class WebhookCoalescer:
+    """
+    Ingest stage for HubSpot company webhooks.
+
+    HubSpot retries deliveries and sends one event per changed property, so a single
+    edit can arrive as several events in one payload or spread over a few seconds.
+    Events are dropped if their `eventId` was already seen, and the rest are grouped
+    per `objectId`: the first event for a record opens a `debounce_s` window, later
+    events in that window only join it, and one research run is launched per record
+    when the window closes. The window is not extended by new events, so a record
+    that keeps changing is still researched at least once per window.
+    """
+
+    def __init__(self, launch: Callable[[str, Dict[str, Any]], Awaitable[Any]],
+                 debounce_s: float = 5.0, max_event_ids: int = 10_000):
+        self.launch = launch
+        self.debounce_s = debounce_s
+        self.max_event_ids = max_event_ids
+        self._pending: Dict[str, _PendingRun] = {}
+        self._event_ids: "OrderedDict[str, None]" = OrderedDict()
+        self._tasks: Set[asyncio.Task] = set()
+        self.received = 0
+        self.duplicates = 0
+        self.ignored = 0
+        self.coalesced = 0
+        self.launched = 0
+        self.launch_errors = 0
+
+    def ingest(self, events: Iterable[Dict[str, Any]]) -> Dict[str, int]:
+        """Accept a webhook payload. Returns what happened to its events."""
+        result = {"scheduled": 0, "coalesced": 0, "duplicates": 0, "ignored": 0}
+        for event in events:
+            self.received += 1
+            record_id = event.get("objectId") if isinstance(event, dict) else None
+            if record_id is None:
+                self.ignored += 1
+                result["ignored"] += 1
+                continue
+            if self._is_duplicate(event.get("eventId")):
+                self.duplicates += 1
+                result["duplicates"] += 1
+                continue
+
+            record_id = str(record_id)
+            run = self._pending.get(record_id)
+            if run is None:
+                run = self._pending[record_id] = _PendingRun(record_id, time.time())
+                run.timer = asyncio.get_running_loop().call_later(self.debounce_s, self._fire, record_id)
+                result["scheduled"] += 1
+            else:
+                self.coalesced += 1
+                result["coalesced"] += 1
+            run.events += 1
+            if event.get("propertyName"):
+                run.properties.add(event["propertyName"])
+        return result
+
+    def _is_duplicate(self, event_id: Any) -> bool:
+        if event_id is None:
+            return False
+        key = str(event_id)
+        if key in self._event_ids:
+            self._event_ids.move_to_end(key)
+            return True
+        self._event_ids[key] = None
+        while len(self._event_ids) > self.max_event_ids:
+            self._event_ids.popitem(last=False)
+        return False
+
+    def _fire(self, record_id: str) -> None:
+        run = self._pending.pop(record_id, None)
+        if run is None:
+            return
+        task = asyncio.create_task(self._launch(run))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _launch(self, run: _PendingRun) -> None:
+        try:
+            await self.launch(run.record_id, {"events": run.events, "properties": sorted(run.properties)})
+            self.launched += 1
+        except Exception as e:
+            self.launch_errors += 1
+            logging.error(f"Failed to launch research for record {run.record_id}: {e}")
+
+    async def flush(self) -> int:
+        """Launch every open window now (shutdown). Returns runs launched."""
+        pending = list(self._pending.values())
+        for run in pending:
+            if run.timer is not None:
+                run.timer.cancel()
+            self._fire(run.record_id)
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        return len(pending)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "debounce_s": self.debounce_s,
+            "events_received": self.received,
+            "duplicates_dropped": self.duplicates,
+            "ignored": self.ignored,
+            "coalesced": self.coalesced,
+            "runs_launched": self.launched,
+            "launch_errors": self.launch_errors,
+            "pending_records": len(self._pending),
+        }
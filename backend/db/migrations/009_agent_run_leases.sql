@@ -0,0 +1,153 @@
+-- Migration 009: Agent Run Leases
+-- create_agent_run claims a time-limited lease on the run, so a duplicate trigger
+-- (same workspace + idempotency key) on another worker does not run it again.
+
+-- ============================================
+-- Lease columns
+-- ============================================
+
+ALTER TABLE agent_runs ADD COLUMN IF NOT EXISTS lease_owner TEXT;
+ALTER TABLE agent_runs ADD COLUMN IF NOT EXISTS lease_expires_at TIMESTAMPTZ;
+
+-- ============================================
+-- RPC: Create Agent Run (with lease)
+-- ============================================
+
+-- Return type changes (UUID -> row), so the 007 version must be dropped first
+DROP FUNCTION IF EXISTS create_agent_run(UUID, TEXT, TEXT, UUID, JSONB);
+
+CREATE OR REPLACE FUNCTION create_agent_run(
+    p_workspace_id UUID,
+    p_idempotency_key TEXT,
+    p_agent_type TEXT,
+    p_account_id UUID,
+    p_inputs JSONB,
+    p_lease_owner TEXT DEFAULT NULL,
+    p_lease_seconds INTEGER DEFAULT 900
+)
+RETURNS TABLE (run_id UUID, status TEXT, lease_acquired BOOLEAN)
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public, pg_temp
+AS $$
+#variable_conflict use_column
+DECLARE
+    v_run_id UUID;
+    v_status TEXT;
+    v_owner TEXT;
+    v_expires TIMESTAMPTZ;
+    v_lease_until TIMESTAMPTZ;
+    calling_user_id UUID;
+BEGIN
+    calling_user_id := auth.uid();
+
+    IF calling_user_id IS NULL THEN
+        RAISE EXCEPTION 'Not authenticated';
+    END IF;
+
+    -- ENFORCE: idempotency key required
+    IF p_idempotency_key IS NULL OR p_idempotency_key = '' THEN
+        RAISE EXCEPTION 'idempotency_key is required and cannot be empty';
+    END IF;
+
+    -- Assert workspace membership
+    IF NOT EXISTS (
+        SELECT 1 FROM public.workspace_members
+        WHERE workspace_id = p_workspace_id
+        AND user_id = calling_user_id
+    ) THEN
+        RAISE EXCEPTION 'Access denied: not a member of workspace %', p_workspace_id;
+    END IF;
+
+    -- Verify account belongs to workspace
+    IF p_account_id IS NOT NULL THEN
+        IF NOT EXISTS (
+            SELECT 1 FROM public.accounts
+            WHERE account_id = p_account_id
+            AND workspace_id = p_workspace_id
+        ) THEN
+            RAISE EXCEPTION 'Access denied: account % does not belong to workspace %', p_account_id, p_workspace_id;
+        END IF;
+    END IF;
+
+    IF p_lease_owner IS NOT NULL THEN
+        v_lease_until := NOW() + make_interval(secs => p_lease_seconds);
+    END IF;
+
+    -- New run: the caller owns it
+    INSERT INTO public.agent_runs AS ar (
+        workspace_id,
+        idempotency_key,
+        agent_type,
+        account_id,
+        status,
+        inputs,
+        created_by,
+        lease_owner,
+        lease_expires_at
+    )
+    VALUES (
+        p_workspace_id,
+        p_idempotency_key,
+        p_agent_type,
+        p_account_id,
+        'PENDING',
+        p_inputs,
+        calling_user_id,
+        p_lease_owner,
+        v_lease_until
+    )
+    -- The unique index is partial, so its predicate is part of the conflict target
+    ON CONFLICT (workspace_id, idempotency_key) WHERE idempotency_key IS NOT NULL
+    DO NOTHING
+    RETURNING ar.run_id INTO v_run_id;
+
+    IF v_run_id IS NOT NULL THEN
+        RETURN QUERY SELECT v_run_id, 'PENDING'::TEXT, TRUE;
+        RETURN;
+    END IF;
+
+    -- Existing run: lock the row so concurrent claims are decided one at a time
+    SELECT ar.run_id, ar.status, ar.lease_owner, ar.lease_expires_at
+    INTO v_run_id, v_status, v_owner, v_expires
+    FROM public.agent_runs ar
+    WHERE ar.workspace_id = p_workspace_id
+    AND ar.idempotency_key = p_idempotency_key
+    FOR UPDATE;
+
+    -- Callers without a lease owner keep the 007 behaviour (return the existing run)
+    IF p_lease_owner IS NULL THEN
+        RETURN QUERY SELECT v_run_id, v_status, TRUE;
+        RETURN;
+    END IF;
+
+    -- Finished work is never repeated
+    IF v_status = 'COMPLETED' THEN
+        RETURN QUERY SELECT v_run_id, v_status, FALSE;
+        RETURN;
+    END IF;
+
+    -- Take over failed runs, unowned runs, our own lease, or a lease whose worker died
+    IF v_status = 'FAILED'
+        OR v_owner IS NULL
+        OR v_owner = p_lease_owner
+        OR v_expires IS NULL
+        OR v_expires < NOW()
+    THEN
+        UPDATE public.agent_runs ar
+        SET lease_owner = p_lease_owner,
+            lease_expires_at = v_lease_until,
+            status = CASE WHEN v_status = 'FAILED' THEN 'PENDING' ELSE ar.status END,
+            updated_at = NOW()
+        WHERE ar.run_id = v_run_id;
+
+        RETURN QUERY SELECT v_run_id, CASE WHEN v_status = 'FAILED' THEN 'PENDING' ELSE v_status END, TRUE;
+        RETURN;
+    END IF;
+
+    -- Another worker holds a live lease
+    RETURN QUERY SELECT v_run_id, v_status, FALSE;
+END;
+$$;
+
+GRANT EXECUTE ON FUNCTION create_agent_run TO authenticated;
@@ -0,0 +1,69 @@
+-- Migration 010: Hygiene Issues + Health Score History
+-- Materialized results of incremental hygiene scans. `hygiene_issues` holds the
+-- current open issue per CRM record; `hygiene_health_scores` gets one row per scan,
+-- so dashboards read the latest score without triggering a scan.
+
+-- ============================================
+-- Open issues (one per record: rules are mutually exclusive per record)
+-- ============================================
+
+CREATE TABLE IF NOT EXISTS hygiene_issues (
+    issue_id BIGINT GENERATED BY DEFAULT AS IDENTITY UNIQUE,
+    workspace_id UUID NOT NULL REFERENCES workspaces(workspace_id) ON DELETE CASCADE,
+    entity TEXT NOT NULL CHECK (entity IN ('deals', 'contacts')),
+    entity_id TEXT NOT NULL,
+    issue_type TEXT NOT NULL,
+    severity TEXT NOT NULL CHECK (severity IN ('HIGH', 'MED', 'LOW')),
+    description TEXT,
+    suggested_fix TEXT,
+    detected_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (workspace_id, entity, entity_id)
+);
+
+-- /revops/issues pages by issue_id (keyset) under each filter
+CREATE INDEX IF NOT EXISTS idx_hygiene_issues_page ON hygiene_issues(workspace_id, issue_id);
+CREATE INDEX IF NOT EXISTS idx_hygiene_issues_entity ON hygiene_issues(workspace_id, entity, issue_id);
+CREATE INDEX IF NOT EXISTS idx_hygiene_issues_type ON hygiene_issues(workspace_id, issue_type, issue_id);
+CREATE INDEX IF NOT EXISTS idx_hygiene_issues_severity ON hygiene_issues(workspace_id, severity, issue_id);
+-- Full scans drop issues they did not refresh
+CREATE INDEX IF NOT EXISTS idx_hygiene_issues_updated ON hygiene_issues(workspace_id, updated_at);
+
+-- ============================================
+-- Health score time series
+-- ============================================
+
+CREATE TABLE IF NOT EXISTS hygiene_health_scores (
+    id BIGINT GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY,
+    workspace_id UUID NOT NULL REFERENCES workspaces(workspace_id) ON DELETE CASCADE,
+    scanned_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    health_score INTEGER NOT NULL CHECK (health_score BETWEEN 0 AND 100),
+    total_records INTEGER NOT NULL,
+    flagged_records INTEGER NOT NULL,
+    counts JSONB NOT NULL DEFAULT '{}'::jsonb,
+    scan_mode TEXT NOT NULL CHECK (scan_mode IN ('full', 'incremental')),
+    records_fetched INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE INDEX IF NOT EXISTS idx_hygiene_health_scores_latest
+    ON hygiene_health_scores(workspace_id, scanned_at DESC);
+
+-- ============================================
+-- RLS: members read; only the backend (service role) writes
+-- ============================================
+
+ALTER TABLE hygiene_issues ENABLE ROW LEVEL SECURITY;
+ALTER TABLE hygiene_health_scores ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "hygiene_issues_select" ON hygiene_issues;
+CREATE POLICY "hygiene_issues_select" ON hygiene_issues FOR SELECT
+    USING (is_workspace_member(workspace_id));
+
+DROP POLICY IF EXISTS "hygiene_health_scores_select" ON hygiene_health_scores;
+CREATE POLICY "hygiene_health_scores_select" ON hygiene_health_scores FOR SELECT
+    USING (is_workspace_member(workspace_id));
+
+GRANT SELECT ON hygiene_issues TO authenticated;
+REVOKE INSERT, UPDATE, DELETE ON hygiene_issues FROM authenticated;
+GRANT SELECT ON hygiene_health_scores TO authenticated;
+REVOKE INSERT, UPDATE, DELETE ON hygiene_health_scores FROM authenticated;
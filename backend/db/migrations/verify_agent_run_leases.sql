@@ -0,0 +1,61 @@
+-- ============================================
+-- VERIFICATION: create_agent_run lease rules (migration 009)
+-- Run after 009 in the SQL editor. Every step ASSERTs its outcome and the whole
+-- script rolls back, so it leaves no rows behind. Needs one workspace member.
+-- ============================================
+
+BEGIN;
+
+DO $$
+DECLARE
+    v_workspace UUID;
+    v_user UUID;
+    v_key TEXT := 'verify-lease:' || gen_random_uuid();
+    r RECORD;
+    v_run UUID;
+BEGIN
+    SELECT workspace_id, user_id INTO v_workspace, v_user FROM public.workspace_members LIMIT 1;
+    ASSERT v_user IS NOT NULL, 'no workspace member to run as';
+    -- auth.uid() for this transaction
+    PERFORM set_config('request.jwt.claim.sub', v_user::text, true);
+    PERFORM set_config('request.jwt.claims', json_build_object('sub', v_user)::text, true);
+
+    -- 1. A new key creates the run and leases it to the caller
+    SELECT * INTO r FROM create_agent_run(v_workspace, v_key, 'RESEARCHER', NULL, '{}'::jsonb, 'worker-a', 60);
+    ASSERT r.lease_acquired AND r.status = 'PENDING', '1: new run not leased to worker-a';
+    v_run := r.run_id;
+
+    -- 2. Another worker is refused while the lease is live
+    SELECT * INTO r FROM create_agent_run(v_workspace, v_key, 'RESEARCHER', NULL, '{}'::jsonb, 'worker-b', 60);
+    ASSERT r.run_id = v_run AND NOT r.lease_acquired, '2: worker-b took a live lease';
+
+    -- 3. The owner may claim again (a retry of its own job)
+    SELECT * INTO r FROM create_agent_run(v_workspace, v_key, 'RESEARCHER', NULL, '{}'::jsonb, 'worker-a', 60);
+    ASSERT r.lease_acquired, '3: worker-a could not renew its own lease';
+
+    -- 4. An expired lease (the worker died) is taken over
+    UPDATE public.agent_runs SET lease_expires_at = NOW() - INTERVAL '1 second' WHERE run_id = v_run;
+    SELECT * INTO r FROM create_agent_run(v_workspace, v_key, 'RESEARCHER', NULL, '{}'::jsonb, 'worker-b', 60);
+    ASSERT r.lease_acquired, '4: expired lease not taken over';
+    ASSERT (SELECT lease_owner FROM public.agent_runs WHERE run_id = v_run) = 'worker-b', '4: owner not updated';
+
+    -- 5. A FAILED run is taken over even with a live lease, and goes back to PENDING
+    UPDATE public.agent_runs SET status = 'FAILED' WHERE run_id = v_run;
+    SELECT * INTO r FROM create_agent_run(v_workspace, v_key, 'RESEARCHER', NULL, '{}'::jsonb, 'worker-c', 60);
+    ASSERT r.lease_acquired AND r.status = 'PENDING', '5: failed run not retried';
+    ASSERT (SELECT status FROM public.agent_runs WHERE run_id = v_run) = 'PENDING', '5: status not reset';
+
+    -- 6. A COMPLETED run is never repeated, whoever asks
+    UPDATE public.agent_runs SET status = 'COMPLETED' WHERE run_id = v_run;
+    SELECT * INTO r FROM create_agent_run(v_workspace, v_key, 'RESEARCHER', NULL, '{}'::jsonb, 'worker-c', 60);
+    ASSERT NOT r.lease_acquired AND r.status = 'COMPLETED', '6: completed run re-leased';
+
+    -- 7. Callers without a lease owner get the existing run (pre-009 behaviour)
+    SELECT * INTO r FROM create_agent_run(v_workspace, v_key, 'RESEARCHER', NULL, '{}'::jsonb, NULL, 60);
+    ASSERT r.run_id = v_run AND r.lease_acquired, '7: ownerless call did not return the run';
+
+    RAISE NOTICE 'create_agent_run lease rules: all 7 checks passed';
+END;
+$$;
+
+ROLLBACK;
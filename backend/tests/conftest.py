@@ -0,0 +1,15 @@
+"""
+Offline unit tests: run from backend/ with `python -m pytest tests`.
+
+test_phase1_validation.py and run_simple_test.py are live checks against a
+configured Supabase project (see README_VALIDATION.md) and are run directly.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Settings requires these; nothing in the offline tests talks to Supabase
+os.environ.setdefault("SUPABASE_URL", "http://localhost:54321")
+os.environ.setdefault("SUPABASE_SERVICE_ROLE_KEY", "test-service-role-key")
+
+collect_ignore = ["test_phase1_validation.py", "run_simple_test.py"]
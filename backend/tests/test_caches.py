@@ -0,0 +1,113 @@
+import asyncio
+import sqlite3
+
+import pytest
+
+from app.core import cache_tier
+from app.core.cache_tier import CacheTier
+from app.core.llm_cache import LLMResponseCache
+from app.core.search_cache import SearchResultCache, query_class
+
+
+class Clock:
+    def __init__(self, now: float = 1_000_000.0):
+        self.now = now
+
+    def time(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache_tier.time, "time", clock.time)
+    monkeypatch.setattr("app.core.search_cache.time.time", clock.time)
+    return clock
+
+
+@pytest.mark.parametrize("query, expected", [
+    ('"acme.com" funding news', "news"),
+    ('site:acme.com "careers" OR "jobs"', "careers"),
+    ('"acme.com" tech stack', "company"),
+    ('"blogger.com" reviews', "default"),
+    ('site:about.me profile', "default"),
+    ('"acme.com" case studies', "company"),
+    ("acme newsroom", "default"),
+])
+def test_query_class_matches_whole_terms(query, expected):
+    assert query_class(query) == expected
+
+
+def test_tier_lru_and_expiry(clock):
+    tier = CacheTier("t", ":memory:", max_entries=2, max_disk_entries=10)
+    tier.put("a", "1", ttl_s=10)
+    tier.put("b", "2", ttl_s=10)
+    tier.get_memory("a")
+    tier.put("c", "3", ttl_s=10)
+    assert tier.get_memory("b") is None          # least recently used left memory...
+    assert tier.get_disk("b")[2] == "2"          # ...but not disk
+    clock.now += 11
+    assert tier.get_memory("a") is None and tier.get_disk("a") is None
+
+
+def test_tier_disk_bound_and_sweep(clock, monkeypatch):
+    monkeypatch.setattr(cache_tier, "CLEANUP_EVERY", 5)
+    tier = CacheTier("t", ":memory:", max_entries=100, max_disk_entries=3)
+    tier.put("old", "x", ttl_s=1)
+    clock.now += 2
+    for i in range(4):
+        clock.now += 1
+        tier.put(f"k{i}", "x", ttl_s=100)
+    rows = [r[0] for r in tier._conn.execute("SELECT key FROM t ORDER BY key")]
+    assert rows == ["k1", "k2", "k3"]
+    assert tier.evictions == 2
+
+
+def test_tier_replaces_table_with_old_layout(tmp_path):
+    path = str(tmp_path / "cache.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE llm_cache (key TEXT PRIMARY KEY, value TEXT, expires_at REAL, last_access REAL)")
+    conn.commit()
+    conn.close()
+    tier = CacheTier("llm_cache", path, max_entries=10, max_disk_entries=10)
+    tier.put("k", "v", ttl_s=10)
+    assert tier.get_disk("k")[2] == "v"
+
+
+def test_llm_cache_round_trip(clock, tmp_path):
+    path = str(tmp_path / "llm.db")
+    cache = LLMResponseCache(path, ttl_s=60)
+
+    async def scenario():
+        assert await cache.get("k") is None
+        await cache.put("k", {"signals": [1]})
+        hit = await cache.get("k")
+        hit["signals"].append(2)                   # callers get their own copy
+        assert await cache.get("k") == {"signals": [1]}
+
+    asyncio.run(scenario())
+    cache.close()
+    reopened = LLMResponseCache(path, ttl_s=60)
+    assert asyncio.run(reopened.get("k")) == {"signals": [1]}
+    assert reopened.stats()["disk_hits"] == 1
+
+
+def test_search_cache_serves_stale_and_refreshes(clock):
+    cache = SearchResultCache(":memory:")
+    calls = []
+
+    async def loader():
+        calls.append(1)
+        return [{"url": f"https://acme.com/{len(calls)}"}]
+
+    async def scenario():
+        first = await cache.fetch('"acme.com" funding', 1, "basic", loader)
+        clock.now += 7 * 3600                      # past the 6h news TTL, within the stale period
+        stale = await cache.fetch('"acme.com" funding', 1, "basic", loader)
+        await asyncio.gather(*cache._refreshing)
+        fresh = await cache.fetch('"acme.com" funding', 1, "basic", loader)
+        return first, stale, fresh
+
+    first, stale, fresh = asyncio.run(scenario())
+    assert stale == first and fresh != first and len(calls) == 2
+    assert cache.stats()["stale_hits"] == 1
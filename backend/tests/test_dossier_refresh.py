@@ -0,0 +1,149 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.agents import researcher_graph
+from app.agents.researcher_graph import ResearcherNodes
+from app.contracts.schemas import AccountDossier, GTMDiagnosis, RefreshPolicy, ResearchConfig
+from app.core import supabase as db
+from app.services.dossier_cache import DossierCache
+
+WORKSPACE = "ws-1"
+ACCOUNT = "acct-1"
+
+
+class UniqueViolation(Exception):
+    code = "23505"
+
+
+class Query:
+    def __init__(self, rows, op, payload=None):
+        self.rows, self.op, self.payload = rows, op, payload
+        self.filters, self.order_by, self.max_rows = [], None, None
+
+    def eq(self, column, value):
+        self.filters.append((column, value))
+        return self
+
+    def order(self, column, desc=False):
+        self.order_by = (column, desc)
+        return self
+
+    def limit(self, n):
+        self.max_rows = n
+        return self
+
+    def execute(self):
+        if self.op == "insert":
+            if any(row["account_id"] and row["config_id"]
+                   and all(row[k] == self.payload[k] for k in ("workspace_id", "account_id", "config_id"))
+                   for row in self.rows):
+                raise UniqueViolation("duplicate key value violates idx_unique_dossier_per_account_config")
+            row = {"created_at": datetime.utcnow().isoformat(), **self.payload}
+            self.rows.append(row)
+            return type("Response", (), {"data": [row]})()
+        matched = [row for row in self.rows if all(row.get(k) == v for k, v in self.filters)]
+        if self.op == "update":
+            for row in matched:
+                row.update(self.payload)
+        elif self.order_by:
+            column, desc = self.order_by
+            matched = sorted(matched, key=lambda row: row[column], reverse=desc)
+        return type("Response", (), {"data": matched[:self.max_rows]})()
+
+
+class FakeDossierTable:
+    """account_dossiers with the partial unique index from migration 008."""
+
+    def __init__(self):
+        self.rows = []
+
+    def table(self, name):
+        assert name == "account_dossiers"
+        return self
+
+    def select(self, columns):
+        return Query(self.rows, "select")
+
+    def insert(self, payload):
+        return Query(self.rows, "insert", payload)
+
+    def update(self, payload):
+        return Query(self.rows, "update", payload)
+
+
+@pytest.fixture
+def table(monkeypatch):
+    table = FakeDossierTable()
+    monkeypatch.setattr(db, "get_supabase_client", lambda *args: table)
+    monkeypatch.setattr(researcher_graph, "dossier_cache", DossierCache())
+    return table
+
+
+def dossier(age_days: float, label: str) -> AccountDossier:
+    return AccountDossier(
+        dossier_id=f"d-{label}", domain="acme.com", config_id="default_v1", signals=[],
+        gtm_diagnosis=GTMDiagnosis(fit_tier="Tier 2", diagnosis_label=label, key_drivers=[], evidence_ids=[]),
+        created_at=datetime.utcnow() - timedelta(days=age_days)
+    )
+
+
+def state(policy: RefreshPolicy, result: AccountDossier = None) -> dict:
+    config = ResearchConfig(config_id="default_v1", proposition="Auto-Research", persona="General",
+                            icp_ruleset_id="default", refresh_policy=policy)
+    return {"domain": "acme.com", "config": config, "workspace_id": WORKSPACE, "account_id": ACCOUNT,
+            "dossier": result}
+
+
+def nodes() -> ResearcherNodes:
+    return ResearcherNodes.__new__(ResearcherNodes)  # the gate and save need no providers
+
+
+def refresh(policy: RefreshPolicy, result: AccountDossier) -> dict:
+    async def run():
+        gate = await nodes().check_existing_lock(state(policy))
+        saved = await nodes().save_results(state(policy, result))
+        return gate, saved
+
+    return asyncio.run(run())
+
+
+@pytest.mark.parametrize("age_days, policy", [
+    (30, RefreshPolicy(ttl_days=14)),                                         # stale
+    (1, RefreshPolicy(ttl_days=14, force_refresh_signals=["HIRING_SALES"])),  # fresh, forced
+])
+def test_refresh_replaces_the_stored_dossier(table, age_days, policy):
+    assert asyncio.run(nodes().save_results(state(policy, dossier(age_days, "old")))) == {"status": "DONE"}
+
+    gate, saved = refresh(policy, dossier(0, "new"))
+    assert gate["status"] == "COLLECTING"
+    assert saved == {"status": "DONE"}
+    assert len(table.rows) == 1
+    assert table.rows[0]["dossier_json"]["gtm_diagnosis"]["diagnosis_label"] == "new"
+
+    # The next run sees the refreshed dossier as fresh and reuses it
+    researcher_graph.dossier_cache.invalidate(WORKSPACE, "acme.com", "default_v1")
+    gate, _ = refresh(RefreshPolicy(ttl_days=14), dossier(0, "newer"))
+    assert gate["status"] == "CACHED" and gate["dossier"].gtm_diagnosis.diagnosis_label == "new"
+
+
+def test_concurrent_first_save_updates_the_winner(table, monkeypatch):
+    from app.providers.adapters import SupabaseAdapter
+
+    adapter = SupabaseAdapter(workspace_id=WORKSPACE)
+    update = adapter._update_dossier
+    misses = []
+
+    async def late_update(payload):
+        # The first lookup misses; another worker inserts before our insert lands
+        if not misses:
+            misses.append(1)
+            table.rows.append({**payload, "dossier_json": {"label": "other worker"}})
+            return False
+        return await update(payload)
+
+    monkeypatch.setattr(adapter, "_update_dossier", late_update)
+    payload = dossier(0, "ours").model_dump(mode="json")
+    assert asyncio.run(adapter.save_dossier(payload, ACCOUNT)) is True
+    assert len(table.rows) == 1 and table.rows[0]["dossier_json"]["gtm_diagnosis"]["diagnosis_label"] == "ours"
@@ -0,0 +1,15 @@
+from app.services.evidence_packer import EvidencePacker
+
+
+def test_keywords_match_whole_words_only():
+    boilerplate = "We operate across micro markets with rapid capital growth"
+    assert EvidencePacker.relevance(boilerplate, ["EXEC_HIRE", "TECH_STACK"]) == 0.0
+
+
+def test_keywords_match_plurals_and_phrases():
+    text = "Acme appoints a new CRO and exposes public APIs; Series  B led by Foo Ventures"
+    exec_hire = EvidencePacker.relevance(text, ["EXEC_HIRE"])
+    assert exec_hire > 0
+    assert EvidencePacker.relevance(text, ["TECH_STACK"]) > 0
+    # "appoint(s)" + "cro" vs "series b" + "led by" (tolerant of the double space)
+    assert EvidencePacker.relevance(text, ["FUNDING"]) == exec_hire
@@ -0,0 +1,126 @@
+import asyncio
+
+import pytest
+
+from app.agents.expansion_graph import ExpansionNodes, score_customer_base
+from app.seeders.usage_seeder import UsageSeeder
+from app.services import expansion_engine as engine
+from app.services.expansion_engine import USAGE_COLUMNS, ExpansionRules, ExpansionScan, report_from_row
+
+numpy_only = pytest.mark.skipif(not engine.NUMPY_AVAILABLE, reason="NumPy not installed")
+
+
+def account(i, plan="Pro", cap=50, active=10, api="LOW", reporting="LOW", ai="HIGH", nps=9, idle=1, tickets=0):
+    return {
+        "domain": f"account-{i}.example.com", "plan": plan, "license_cap": cap, "active_users": active,
+        "utilization_pct": round(active / cap * 100, 1) if cap else 0.0,
+        "api_access": api, "reporting": reporting, "ai_assistant": ai,
+        "nps": nps, "last_login_days_ago": idle, "tickets_open": tickets,
+    }
+
+
+def batches_of(rows, size):
+    return [{col: [row[col] for row in rows[i:i + size]] for col in USAGE_COLUMNS}
+            for i in range(0, len(rows), size)]
+
+
+def scan_with(batches, use_numpy: bool, monkeypatch, top_k: int = 25) -> ExpansionScan:
+    monkeypatch.setattr(engine, "NUMPY_AVAILABLE", use_numpy)
+    scan = ExpansionScan(top_k=top_k)
+    for batch in batches:
+        scan.add_batch(batch)
+    return scan
+
+
+def seeded(n: int = 5000, page_size: int = 700):
+    """Seeder usage plus edge cases: empty licenses and at-risk accounts."""
+    rows = [{col: b[col][i] for col in USAGE_COLUMNS}
+            for b in UsageSeeder.iter_usage_batches(n, page_size=page_size, seed=5) for i in range(len(b["domain"]))]
+    rows += [account(n + 1, cap=0, active=0), account(n + 2, cap=0, active=5, reporting="HIGH", ai="NONE"),
+             account(n + 3, cap=0, api="HIGH"), account(n + 4, active=49, nps=5, tickets=4, idle=30)]
+    return batches_of(rows, page_size)
+
+
+@numpy_only
+def test_numpy_and_python_paths_agree_across_chunks(monkeypatch):
+    batches = seeded()
+    numpy_scan = scan_with(batches, True, monkeypatch)
+    python_scan = scan_with(batches, False, monkeypatch)
+    assert numpy_scan.summary() == python_scan.summary()
+    assert numpy_scan.ranked() == python_scan.ranked()
+    assert numpy_scan.summary()["accounts"] == 5004 and len(numpy_scan.ranked()) == 25
+
+
+@numpy_only
+def test_array_batches_score_like_list_batches(monkeypatch):
+    import numpy as np
+
+    batches = seeded(2000)
+    lists = scan_with(batches, True, monkeypatch)
+    arrays = scan_with([{col: np.asarray(v) for col, v in b.items()} for b in batches], True, monkeypatch)
+    assert lists.summary() == arrays.summary()
+    assert lists.ranked() == arrays.ranked()
+
+
+@pytest.mark.parametrize("use_numpy", [pytest.param(True, marks=numpy_only), False])
+@pytest.mark.parametrize("chunk", [1, 2, 3, 4, 7])
+def test_ties_keep_input_order_across_chunk_boundaries(use_numpy, chunk, monkeypatch):
+    # Ten accounts with the same expected ARR and one better account late in the input
+    rows = [account(i, api="HIGH") for i in range(10)] + [account(10, cap=100, api="HIGH")]
+    scan = scan_with(batches_of(rows, chunk), use_numpy, monkeypatch, top_k=4)
+    assert [r["domain"] for r in scan.ranked()] == [
+        "account-10.example.com", "account-0.example.com", "account-1.example.com", "account-2.example.com"
+    ]
+    assert [r["rank"] for r in scan.ranked()] == [1, 2, 3, 4]
+
+
+@pytest.mark.parametrize("use_numpy", [pytest.param(True, marks=numpy_only), False])
+def test_empty_licenses_do_not_divide_by_zero(use_numpy, monkeypatch):
+    rows = [account(0, cap=0, active=0), account(1, cap=0, active=5, reporting="HIGH", ai="NONE"),
+            account(2, cap=0, api="HIGH")]
+    scan = scan_with(batches_of(rows, 3), use_numpy, monkeypatch)
+    ranked = scan.ranked()
+    # No seat pressure and nothing to upgrade without licenses; the add-on still applies
+    assert [(r["domain"], r["signal"]["type"], r["expected_arr"]) for r in ranked] == [
+        ("account-1.example.com", "AI_ASSISTANT_ADDON", round(5 * 240 * 0.6))
+    ]
+    assert scan.summary()["by_signal"] == {"AI_ASSISTANT_ADDON": 1}
+
+
+def test_best_signal_is_picked_by_expected_arr_not_confidence():
+    nodes = ExpansionNodes.__new__(ExpansionNodes)  # analyze_growth needs no LLM
+    nodes.rules = ExpansionRules()
+    # 96% seats used (seat expansion, 0.95) and heavy API use on Pro (upgrade, 0.85)
+    usage = report_from_row(account(0, cap=50, active=48, api="HIGH"))
+    result = asyncio.run(nodes.analyze_growth({"usage_data": usage}))
+    assert result["status"] == "DRAFTING_PROPOSAL"
+    # Upgrade: 50 seats x $600 x 0.85 = $25,500; seats: 14 x $600 x 0.95 = $7,980
+    assert result["expansion_signal"]["type"] == "ENTERPRISE_UPGRADE"
+    assert result["expansion_signal"]["expected_arr"] == 25_500
+
+    at_risk = report_from_row(account(0, cap=50, active=48, api="HIGH", nps=5))
+    assert asyncio.run(nodes.analyze_growth({"usage_data": at_risk}))["expansion_signal"]["expected_arr"] == 12_750
+
+    quiet = report_from_row(account(0))
+    assert asyncio.run(nodes.analyze_growth({"usage_data": quiet})) == {"status": "DONE", "expansion_signal": None}
+
+
+class CountingNodes:
+    def __init__(self):
+        self.domains = []
+
+    async def generate_proposal(self, state):
+        self.domains.append(state["domain"])
+        return {"proposal_draft": f"Brief for {state['domain']}", "status": "DONE"}
+
+
+@pytest.mark.parametrize("draft_top", [0, 1, 5])
+def test_score_customer_base_drafts_only_the_top_accounts(draft_top):
+    nodes = CountingNodes()
+    result = asyncio.run(score_customer_base(seeded(3000), top_k=10, draft_top=draft_top, nodes=nodes))
+    ranked = result["ranked"]
+    assert len(ranked) == 10 and result["proposals_drafted"] == draft_top
+    assert nodes.domains == [r["domain"] for r in ranked[:draft_top]]
+    assert all(r["proposal_draft"] for r in ranked[:draft_top])
+    assert all(r["proposal_draft"] is None for r in ranked[draft_top:])
+    assert result["summary"]["accounts"] == 3004
@@ -0,0 +1,75 @@
+import asyncio
+
+import httpx
+
+from app.services.fetcher import Fetcher
+
+
+def peak_concurrency_fetcher():
+    active, peak = {}, {}
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        host = request.url.host
+        active[host] = active.get(host, 0) + 1
+        peak[host] = max(peak.get(host, 0), active[host])
+        await asyncio.sleep(0.01)
+        active[host] -= 1
+        return httpx.Response(200, text="x" * 100)
+
+    return Fetcher(httpx.AsyncClient(transport=httpx.MockTransport(handler))), peak
+
+
+async def fetch_burst(fetcher: Fetcher) -> None:
+    await asyncio.gather(
+        *(fetcher._read_limited(f"https://h{i % 3}.com/{i}", {}, 50) for i in range(30)),
+        *(fetcher._read_limited(f"https://r.jina.ai/https://h{i}.com", {}, 50) for i in range(30)),
+    )
+
+
+def test_per_host_and_proxy_limits():
+    fetcher, peak = peak_concurrency_fetcher()
+    asyncio.run(fetch_burst(fetcher))
+    assert peak == {"h0.com": 2, "h1.com": 2, "h2.com": 2, "r.jina.ai": Fetcher.PROXY_LIMIT}
+    assert fetcher._host_limits == {}  # idle hosts are not kept
+
+
+def test_fetcher_reusable_across_event_loops():
+    fetcher, peak = peak_concurrency_fetcher()
+    asyncio.run(fetch_burst(fetcher))
+    asyncio.run(fetch_burst(fetcher))
+    assert peak["h0.com"] == 2
+
+
+def hedging_fetcher(direct_delay: float):
+    proxied = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.host == Fetcher.PROXY_HOST:
+            proxied.append(str(request.url))
+            return httpx.Response(200, text="proxy")
+        await asyncio.sleep(direct_delay)
+        return httpx.Response(200, text="direct")
+
+    fetcher = Fetcher(httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+    fetcher.HEDGE_AFTER_S = 0.05
+    return fetcher, proxied
+
+
+def test_queueing_for_a_host_slot_does_not_hedge():
+    # Each direct request takes 0.04s (under the hedge delay), but six of them
+    # share two host slots, so the last ones wait ~0.08s before starting.
+    fetcher, proxied = hedging_fetcher(direct_delay=0.04)
+
+    async def burst():
+        return await asyncio.gather(*(fetcher.fetch(f"https://h.com/{i}") for i in range(6)))
+
+    results = asyncio.run(burst())
+    assert [r["method"] for r in results] == ["direct"] * 6
+    assert proxied == []
+
+
+def test_slow_direct_request_is_hedged():
+    fetcher, proxied = hedging_fetcher(direct_delay=1.0)
+    result = asyncio.run(fetcher.fetch("https://h.com/slow"))
+    assert result["method"] == "jina_proxy" and result["content"] == "proxy"
+    assert proxied == ["https://r.jina.ai/https://h.com/slow"]
@@ -0,0 +1,90 @@
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.services import hygiene_engine as engine
+from app.services.hygiene_engine import DEAL_COLUMNS, HygieneRules, HygieneScan, to_batch
+
+NOW = datetime(2026, 3, 8, 9, 30, tzinfo=timezone.utc)  # US DST starts that day
+TIMEZONES = ["UTC", "America/Los_Angeles", "Asia/Kolkata", "Pacific/Chatham"]
+
+
+@pytest.fixture(params=TIMEZONES)
+def host_tz(request, monkeypatch):
+    monkeypatch.setenv("TZ", request.param)
+    time.tzset()
+    yield request.param
+    monkeypatch.undo()
+    time.tzset()
+
+
+def deals(n: int = 2000, seed: int = 3):
+    """Dates spread across the stale and future thresholds, in every format sources send."""
+    rng = random.Random(seed)
+    formats = [
+        lambda d: d.strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + "Z",       # HubSpot
+        lambda d: d.astimezone(timezone(timedelta(hours=5, minutes=30))).isoformat(),
+        lambda d: d.astimezone(timezone(timedelta(hours=-8))).isoformat(),
+        lambda d: d.replace(tzinfo=None).isoformat(),                   # naive = UTC
+    ]
+    rows = []
+    for i in range(n):
+        offset = timedelta(days=rng.choice([-3, -2, 29, 30, 31, 32]), hours=rng.uniform(-24, 24))
+        rows.append({
+            "deal_id": f"deal_{i}",
+            "name": f"Deal {i}",
+            "amount": rng.choice([10_000, 60_000]),
+            "last_activity_date": rng.choice(formats)(NOW - offset),
+        })
+    return rows
+
+
+def verdicts(scan: HygieneScan):
+    return {(issue["entity_id"], issue["type"], issue["description"]) for issue in scan.issues()}
+
+
+def scan_with(rows, use_numpy: bool, monkeypatch) -> HygieneScan:
+    monkeypatch.setattr(engine, "NUMPY_AVAILABLE", use_numpy)
+    scan = HygieneScan(rules=HygieneRules(), now=NOW)
+    scan.add_deal_batch(to_batch(rows, DEAL_COLUMNS))
+    return scan
+
+
+@pytest.mark.skipif(not engine.NUMPY_AVAILABLE, reason="NumPy not installed")
+def test_numpy_and_python_paths_agree_in_any_host_timezone(host_tz, monkeypatch):
+    rows = deals()
+    numpy_scan = scan_with(rows, True, monkeypatch)
+    python_scan = scan_with(rows, False, monkeypatch)
+    assert verdicts(numpy_scan) == verdicts(python_scan)
+    assert numpy_scan.summary() == python_scan.summary()
+    # A malformed date drops the chunk to row-wise parsing; other records keep their verdicts
+    fallback_scan = scan_with(rows + [{**rows[0], "deal_id": "bad", "last_activity_date": "not a date"}],
+                              True, monkeypatch)
+    assert verdicts(fallback_scan) - {v for v in verdicts(fallback_scan) if v[0] == "bad"} == verdicts(numpy_scan)
+
+
+def test_verdicts_do_not_depend_on_host_timezone(monkeypatch):
+    rows = deals(500)
+    results = []
+    for tz in TIMEZONES:
+        monkeypatch.setenv("TZ", tz)
+        time.tzset()
+        results.append(verdicts(scan_with(rows, engine.NUMPY_AVAILABLE, monkeypatch)))
+    monkeypatch.undo()
+    time.tzset()
+    assert all(r == results[0] for r in results)
+
+
+def test_aware_and_naive_now_are_the_same_instant():
+    naive = HygieneScan(now=NOW.replace(tzinfo=None))
+    shifted = HygieneScan(now=NOW.astimezone(timezone(timedelta(hours=-7))))
+    assert naive.now == shifted.now
+
+
+def test_parse_date_normalizes_to_utc():
+    assert engine._parse_date("2026-03-08T09:30:00Z") == datetime(2026, 3, 8, 9, 30)
+    assert engine._parse_date("2026-03-08T15:00:00+05:30") == datetime(2026, 3, 8, 9, 30)
+    assert engine._parse_date("2026-03-08T09:30:00") == datetime(2026, 3, 8, 9, 30)
+    assert engine._parse_date("garbage") is None and engine._parse_date(None) is None
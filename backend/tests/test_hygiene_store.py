@@ -0,0 +1,232 @@
+import asyncio
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Any, AsyncIterator, Dict, Optional
+
+import pytest
+
+from app.agents import hygiene_graph
+from app.agents.hygiene_graph import HygieneNodes
+from app.services.crm_scan_source import CRMScanSource, ScanPage
+from app.services.hygiene_engine import CONTACT_COLUMNS, DEAL_COLUMNS, HygieneRules, HygieneScan, to_batch
+from app.services.hygiene_store import HygieneStore
+
+WORKSPACE = "ws-1"
+START = datetime(2026, 1, 5, 12, 0)  # naive UTC, the engine's frame
+
+
+class Clock:
+    def __init__(self):
+        self.now = START
+
+    def advance(self, **delta) -> None:
+        self.now += timedelta(**delta)
+
+
+class FakeCRM(CRMScanSource):
+    """In-memory CRM that pages records changed since a cursor, like HubSpot's search API."""
+
+    incremental = True
+
+    def __init__(self, clock: Clock, name: str = "fake", page_size: int = 7, repeat_ids: bool = False):
+        self.clock = clock
+        self.name = name
+        self.page_size = page_size
+        self.repeat_ids = repeat_ids
+        self.records: Dict[str, Dict[str, Dict[str, Any]]] = {"deals": {}, "contacts": {}}
+        self.modified: Dict[str, Dict[str, datetime]] = {"deals": {}, "contacts": {}}
+
+    def put(self, entity: str, row: Dict[str, Any]) -> None:
+        record_id = row["deal_id" if entity == "deals" else "contact_id"]
+        self.records[entity][record_id] = row
+        self.modified[entity][record_id] = self.clock.now.replace(tzinfo=timezone.utc)
+
+    def delete(self, entity: str, record_id: str) -> None:
+        del self.records[entity][record_id]
+        del self.modified[entity][record_id]
+
+    async def pages(self, since: Optional[datetime] = None) -> AsyncIterator[ScanPage]:
+        for entity, columns in (("deals", DEAL_COLUMNS), ("contacts", CONTACT_COLUMNS)):
+            rows = [row for rid, row in self.records[entity].items()
+                    if since is None or self.modified[entity][rid] >= since]
+            for i in range(0, len(rows), self.page_size):
+                page = rows[i:i + self.page_size]
+                if self.repeat_ids and page:
+                    # Search pagination may return a record twice, on the same or the next page
+                    page = page + page[:1] + rows[i + self.page_size:i + self.page_size + 1]
+                yield ScanPage(entity, to_batch(page, columns))
+
+
+def deal(i: int, days_ago: Optional[float], amount: Any = 25_000) -> Dict[str, Any]:
+    date = None if days_ago is None else (START - timedelta(days=days_ago)).isoformat()
+    return {"deal_id": f"deal_{i}", "name": f"Deal {i}", "amount": amount, "last_activity_date": date}
+
+
+def contact(i: int, email: Optional[str] = "a@b.co", title: Optional[str] = "VP") -> Dict[str, Any]:
+    return {"contact_id": f"contact_{i}", "email": email, "title": title}
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(hygiene_graph, "utc_now", lambda: clock.now)
+    return clock
+
+
+@pytest.fixture
+def store():
+    store = HygieneStore(":memory:")
+    yield store
+    store.close()
+
+
+def run_scan(store: HygieneStore, source: FakeCRM, full: bool = False) -> Dict[str, Any]:
+    nodes = HygieneNodes(rules=HygieneRules(), store_factory=lambda: store)
+    return asyncio.run(nodes._merge_changes(source, WORKSPACE, full, None))
+
+
+def assert_matches_full_recount(store: HygieneStore, source: FakeCRM, clock: Clock) -> Dict[str, Any]:
+    fresh = HygieneScan(rules=HygieneRules(), now=clock.now)
+    fresh.add_deals(list(source.records["deals"].values()))
+    fresh.add_contacts(list(source.records["contacts"].values()))
+    summary = asyncio.run(store.summary(WORKSPACE))
+    assert {k: summary[k] for k in fresh.summary()} == fresh.summary()
+    stored = asyncio.run(store.issues(WORKSPACE, 100_000, HygieneRules(), now=clock.now))
+    assert sorted(stored, key=lambda i: i["entity_id"]) == sorted(fresh.issues(), key=lambda i: i["entity_id"])
+    return summary
+
+
+def assert_delta_accounts_for(before: Dict[str, int], after: Dict[str, int], delta: Dict[str, Any]) -> None:
+    for kind in set(before) | set(after) | set(delta["opened"]) | set(delta["resolved"]):
+        assert before.get(kind, 0) + delta["opened"].get(kind, 0) - delta["resolved"].get(kind, 0) \
+            == after.get(kind, 0), kind
+
+
+def seed(source: FakeCRM, n: int = 30) -> None:
+    for i in range(n):
+        source.put("deals", deal(i, [3, 45, None, -5, 10][i % 5]))
+        source.put("contacts", contact(i, email=None if i % 4 == 0 else "a@b.co", title=None if i % 3 == 0 else "VP"))
+    # The scan cursor includes changes made at its own start time, so scan a little later
+    source.clock.advance(minutes=1)
+
+
+def test_first_scan_is_full_and_matches_recount(store, clock):
+    source = FakeCRM(clock)
+    seed(source)
+    delta = run_scan(store, source)
+    assert delta["mode"] == "full" and delta["new_records"] == 60
+    assert_delta_accounts_for({}, asyncio.run(store.summary(WORKSPACE))["by_type"], delta)
+    assert_matches_full_recount(store, source, clock)
+
+
+def test_incremental_scan_reads_only_changes(store, clock):
+    source = FakeCRM(clock)
+    seed(source)
+    run_scan(store, source)
+    before = asyncio.run(store.summary(WORKSPACE))["by_type"]
+
+    clock.advance(hours=1)
+    source.put("deals", deal(1, 2))                       # stale -> fine
+    source.put("deals", deal(2, 5))                       # incomplete -> fine
+    source.put("deals", deal(0, 50))                      # fine -> stale
+    source.put("contacts", contact(0))                    # incomplete -> fine
+    source.put("contacts", contact(100, email=None))      # new, incomplete
+    source.put("deals", deal(100, 1, amount=""))          # new, incomplete
+    delta = run_scan(store, source)
+
+    assert delta["mode"] == "incremental"
+    assert delta["records_fetched"] == 6 and delta["new_records"] == 2
+    after = assert_matches_full_recount(store, source, clock)["by_type"]
+    assert_delta_accounts_for(before, after, delta)
+
+
+def test_repeated_ids_within_and_across_pages(store, clock):
+    source = FakeCRM(clock, page_size=4, repeat_ids=True)
+    seed(source)
+    run_scan(store, source)
+    assert_matches_full_recount(store, source, clock)
+
+    clock.advance(hours=1)
+    for i in range(10):
+        source.put("deals", deal(i, 60))
+    run_scan(store, source)
+    assert_matches_full_recount(store, source, clock)
+
+
+def test_time_alone_moves_deals_across_thresholds(store, clock):
+    source = FakeCRM(clock)
+    source.put("deals", deal(1, 29))     # goes stale in a couple of days
+    source.put("deals", deal(2, -3))     # future-dated, comes due
+    source.put("deals", deal(3, -0.5))   # inside the grace window
+    source.put("deals", deal(4, 5))
+    clock.advance(minutes=1)
+    run_scan(store, source)
+    assert asyncio.run(store.summary(WORKSPACE))["by_type"] == {"FUTURE_ACTIVITY": 1}
+
+    for _ in range(6):
+        clock.advance(hours=13)
+        before = asyncio.run(store.summary(WORKSPACE))["by_type"]
+        delta = run_scan(store, source)        # nothing modified in the CRM
+        assert delta["records_fetched"] == 0
+        after = assert_matches_full_recount(store, source, clock)["by_type"]
+        assert_delta_accounts_for(before, after, delta)
+    assert after == {"STALE_DEAL": 1}
+
+
+def test_full_scan_prunes_deleted_records(store, clock):
+    source = FakeCRM(clock)
+    seed(source)
+    run_scan(store, source)
+
+    clock.advance(hours=1)
+    for i in range(0, 30, 2):
+        source.delete("deals", f"deal_{i}")
+    source.delete("contacts", "contact_0")
+    before = asyncio.run(store.summary(WORKSPACE))["by_type"]
+    delta = run_scan(store, source, full=True)
+    assert delta["mode"] == "full" and delta["removed_records"] == 16
+    after = assert_matches_full_recount(store, source, clock)["by_type"]
+    assert_delta_accounts_for(before, after, delta)
+
+
+def test_switching_source_starts_over(store, clock):
+    first = FakeCRM(clock, name="seeder")
+    seed(first)
+    run_scan(store, first)
+
+    second = FakeCRM(clock, name="hubspot")
+    second.put("deals", deal(7, 90))
+    second.put("contacts", contact(7))
+    clock.advance(minutes=1)
+    delta = run_scan(store, second)
+    assert delta["mode"] == "full" and delta["new_records"] == 2
+    assert_matches_full_recount(store, second, clock)
+
+
+def test_random_scan_sequences_match_full_recount(store, clock):
+    rng = random.Random(11)
+    source = FakeCRM(clock, page_size=9, repeat_ids=True)
+    seed(source, 80)
+    run_scan(store, source)
+    next_id = 1000
+    for step in range(40):
+        clock.advance(hours=rng.choice([0.5, 6, 20, 49, 24 * 9]))
+        for _ in range(rng.randint(0, 15)):
+            if rng.random() < 0.5:
+                i = rng.choice([rng.randrange(80), next_id])
+                days_ago = rng.choice([None, -4, -1, 0, 12, 29.5, 31, 90])
+                source.put("deals", deal(i, (clock.now - START).days + days_ago if days_ago is not None else None,
+                                         amount=rng.choice([10_000, 80_000, None])))
+            else:
+                i = rng.choice([rng.randrange(80), next_id])
+                source.put("contacts", contact(i, email=rng.choice([None, "x@y.z"]), title=rng.choice([None, "CRO"])))
+            next_id += 1
+        full = step % 10 == 9
+        if full:
+            for entity in ("deals", "contacts"):
+                for record_id in rng.sample(sorted(source.records[entity]), 3):
+                    source.delete(entity, record_id)
+        before = asyncio.run(store.summary(WORKSPACE))["by_type"]
+        delta = run_scan(store, source, full=full)
+        after = assert_matches_full_recount(store, source, clock)["by_type"]
+        assert_delta_accounts_for(before, after, delta)
@@ -0,0 +1,94 @@
+import pytest
+
+from app.core import jobs
+from app.core.jobs import DEAD, DONE, QUEUED, RUNNING, JobQueue
+
+
+class Clock:
+    def __init__(self, now: float = 1_000_000.0):
+        self.now = now
+
+    def time(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(jobs.time, "time", clock.time)
+    return clock
+
+
+@pytest.fixture
+def queue(clock):
+    q = JobQueue(":memory:", visibility_timeout=60.0, retry_backoff=5.0, max_backoff=20.0)
+    yield q
+    q.close()
+
+
+def status(queue: JobQueue, job_id: str) -> str:
+    return queue._conn.execute("SELECT status FROM jobs WHERE job_id = ?", (job_id,)).fetchone()["status"]
+
+
+def test_claim_leases_job_until_ack(queue, clock):
+    job_id = queue._enqueue("RESEARCHER", {"domain": "acme.com"}, max_attempts=3, delay=0.0)
+    job = queue._claim("RESEARCHER")
+    assert job.job_id == job_id and job.attempts == 1 and job.payload == {"domain": "acme.com"}
+    assert status(queue, job_id) == RUNNING
+    assert queue._claim("RESEARCHER") is None  # leased
+
+    queue._update(job.job_id, status=DONE, leased_until=None)
+    clock.now += 3600
+    assert queue._claim("RESEARCHER") is None
+
+
+def test_delayed_job_not_claimable_early(queue, clock):
+    queue._enqueue("RESEARCHER", {}, max_attempts=3, delay=10.0)
+    assert queue._claim("RESEARCHER") is None
+    clock.now += 10
+    assert queue._claim("RESEARCHER") is not None
+
+
+def test_expired_lease_is_reclaimed(queue, clock):
+    job_id = queue._enqueue("RESEARCHER", {}, max_attempts=3, delay=0.0)
+    queue._claim("RESEARCHER")
+    clock.now += 59
+    assert queue._claim("RESEARCHER") is None
+    clock.now += 2
+    job = queue._claim("RESEARCHER")
+    assert job.job_id == job_id and job.attempts == 2
+
+
+def test_failures_back_off_exponentially_then_die(queue, clock):
+    job_id = queue._enqueue("RESEARCHER", {}, max_attempts=4, delay=0.0)
+    for attempt, backoff in ((1, 5.0), (2, 10.0), (3, 20.0)):  # capped at max_backoff
+        job = queue._claim("RESEARCHER")
+        assert job.attempts == attempt
+        assert queue._fail(job, "boom") == QUEUED
+        clock.now += backoff - 0.5
+        assert queue._claim("RESEARCHER") is None
+        clock.now += 0.5
+    job = queue._claim("RESEARCHER")
+    assert job.is_last_attempt
+    assert queue._fail(job, "boom") == DEAD
+    assert status(queue, job_id) == DEAD
+
+
+def test_crashing_job_dies_after_max_attempts(queue, clock):
+    job_id = queue._enqueue("RESEARCHER", {}, max_attempts=2, delay=0.0)
+    for attempt in (1, 2):
+        job = queue._claim("RESEARCHER")
+        assert job.attempts == attempt
+        clock.now += 61  # worker never acks
+    assert queue._claim("RESEARCHER") is None
+    assert status(queue, job_id) == DEAD
+
+
+def test_dead_job_does_not_block_next(queue, clock):
+    crashed = queue._enqueue("RESEARCHER", {"n": 1}, max_attempts=1, delay=0.0)
+    queue._claim("RESEARCHER")
+    clock.now += 61
+    queued = queue._enqueue("RESEARCHER", {"n": 2}, max_attempts=1, delay=0.0)
+    job = queue._claim("RESEARCHER")
+    assert job.job_id == queued
+    assert status(queue, crashed) == DEAD
@@ -0,0 +1,90 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from app import main
+from app.agents.listener_graph import SIGNAL_COMBOS, ListenerBatchProcessor, ListenerNodes
+from app.services.signal_window import SignalWindow
+
+DAY = 86400.0
+T0 = 1_780_000_000.0
+
+
+def events():
+    """Noise, suppressors and the three members of PRE_SCALE_CHAOS for one domain, days apart."""
+    return [
+        {"trigger": "Hiring for Sales roles", "domain": "acme.com", "occurred_at": T0},
+        {"trigger": "random noise", "domain": "other.com", "occurred_at": T0},
+        {"trigger": "decreases_headcount_by 10%", "domain": "other.com", "occurred_at": T0},
+        {"trigger": "recognized_as best workplace", "domain": "other.com", "occurred_at": T0},
+        {"trigger": "Hiring for Revenue/GTM Ops", "domain": "acme.com", "occurred_at": T0 + 2 * DAY},
+        {"trigger": "receives_financing", "domain": "beta.io", "occurred_at": T0},
+        {"trigger": "Job Description mentions 'HubSpot'", "domain": "acme.com", "occurred_at": T0 + 5 * DAY},
+    ]
+
+
+@pytest.fixture
+def processor(monkeypatch):
+    processor = ListenerBatchProcessor(ListenerNodes(window=SignalWindow(SIGNAL_COMBOS)))
+
+    async def get(name):
+        assert name == "listener_batch"
+        return processor
+
+    monkeypatch.setattr(main.graph_registry, "get", get)
+    monkeypatch.setattr(main.settings, "SIGNAL_WINDOW_PERSIST", False)
+    return processor
+
+
+def decide(batch):
+    response = asyncio.run(main.process_signal_batch(batch))
+    return [{k: v for k, v in r.items() if k != "latency_ms"} for r in response["results"]], response["stats"]
+
+
+def test_results_follow_input_order_and_pipeline_rules(processor):
+    results, stats = decide(events())
+    assert [r["signal"] for r in results] == [e["trigger"] for e in events()]
+    assert results[1]["decision"] == "IGNORE" and results[1]["archetype"] == "None"  # no canonical match
+    assert results[2]["suppressed"] and results[2]["archetype"] == SIGNAL_COMBOS["SILENT_CHURN_RISK"]["name"]
+    assert results[3]["suppressed"] and results[3]["archetype"] == SIGNAL_COMBOS["NOISE_CLUSTER"]["name"]
+    # The third PRE_SCALE_CHAOS member completes the combo for acme.com only
+    assert results[6]["corroborated_combos"] == ["PRE_SCALE_CHAOS"]
+    assert all(not r["corroborated_combos"] for r in results[:6])
+    assert stats["events"] == 7 and sum(stats["decisions"].values()) == 7
+
+
+def test_chunking_does_not_change_decisions(processor, monkeypatch):
+    whole, _ = decide(events())
+    processor.nodes.window.clear()
+    monkeypatch.setattr(main, "LISTENER_STREAM_CHUNK", 2)
+    chunked, _ = decide(events())
+    assert chunked == whole
+
+
+def test_chunks_yield_to_the_event_loop(processor, monkeypatch):
+    monkeypatch.setattr(main, "LISTENER_STREAM_CHUNK", 2)
+    ticks = []
+
+    async def scenario():
+        async def ticker():
+            while True:
+                ticks.append(1)
+                await asyncio.sleep(0)
+
+        task = asyncio.create_task(ticker())
+        await asyncio.sleep(0)
+        before = len(ticks)
+        await main.process_signal_batch(events())
+        task.cancel()
+        return len(ticks) - before
+
+    # 7 events in chunks of 2: the loop gets control between every chunk
+    assert asyncio.run(scenario()) >= 4
+
+
+def test_oversized_batch_is_rejected(processor, monkeypatch):
+    monkeypatch.setattr(main.settings, "LISTENER_BATCH_MAX_EVENTS", 5)
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(main.process_signal_batch(events()))
+    assert exc.value.status_code == 413
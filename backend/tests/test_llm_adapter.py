@@ -0,0 +1,70 @@
+import asyncio
+import json
+
+import pytest
+
+from app import main
+from app.core.llm_cache import LLMResponseCache
+from app.providers import adapters
+
+
+class FakeChain:
+    def __init__(self):
+        self.calls = 0
+
+    async def ainvoke(self, inputs):
+        self.calls += 1
+        return {"subject": f"Variation {self.calls}", "body_text": inputs["prompt"][:20]}
+
+    async def astream(self, inputs):
+        self.calls += 1
+        yield {"subject": f"Variation {self.calls}"}
+        yield {"subject": f"Variation {self.calls}", "body_text": "..."}
+
+
+class FakeRegistry:
+    def __init__(self, chain: FakeChain):
+        self.chain = chain
+
+    def schema_text(self, schema):
+        return json.dumps(schema, sort_keys=True)
+
+    def json_chain(self, system_prompt, schema):
+        return self.chain
+
+
+@pytest.fixture
+def chain(monkeypatch):
+    chain = FakeChain()
+    cache = LLMResponseCache(path=None)
+    monkeypatch.setenv("GOOGLE_API_KEY", "test-key")
+    monkeypatch.setattr(adapters, "get_chat_model", lambda *args, **kwargs: object())
+    monkeypatch.setattr(adapters, "get_llm_cache", lambda: cache)
+    monkeypatch.setattr(adapters, "get_prompt_registry", lambda llm: FakeRegistry(chain))
+    return chain
+
+
+def test_generate_json_is_cached_by_default(chain):
+    llm = adapters.GeminiAdapter()
+    first = asyncio.run(llm.generate_json("prompt", main.DRAFT_VARIATION_SCHEMA))
+    assert asyncio.run(llm.generate_json("prompt", main.DRAFT_VARIATION_SCHEMA)) == first
+    assert chain.calls == 1
+
+
+def test_regenerate_reaches_the_model_every_time(chain):
+    first = asyncio.run(main.regenerate_draft("draft-1"))
+    second = asyncio.run(main.regenerate_draft("draft-1"))
+    assert chain.calls == 2
+    assert first != second
+
+
+def test_regenerate_stream_reaches_the_model_every_time(chain):
+    async def done_event():
+        response = await main.regenerate_draft_stream("draft-1")
+        events = [event async for event in response.body_iterator]
+        return json.loads(events[-1].split("data: ", 1)[1])
+
+    first = asyncio.run(done_event())
+    second = asyncio.run(done_event())
+    assert chain.calls == 2
+    assert first["result"]["subject"] != second["result"]["subject"]
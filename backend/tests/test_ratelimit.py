@@ -0,0 +1,18 @@
+from app.core import ratelimit
+from app.core.config import settings
+from app.core.ratelimit import RateLimitRegistry
+
+
+def test_partial_overrides_fall_back_to_defaults(monkeypatch):
+    monkeypatch.setattr(settings, "RATE_LIMITS", {"clearbit": {"concurrency": 2}, "gemini": {"rps": 2}})
+    registry = RateLimitRegistry()
+
+    clearbit = registry.get("clearbit")  # no built-in default and no "rps"
+    assert clearbit.max_rps == ratelimit.DEFAULT_LIMIT["rps"]
+    assert clearbit.concurrency == 2
+
+    gemini = registry.get("gemini")
+    assert gemini.max_rps == 2
+    assert gemini.burst == ratelimit.PROVIDER_LIMITS["gemini"]["burst"]
+
+    assert registry.get("unknown") is None
@@ -0,0 +1,236 @@
+import asyncio
+
+import pytest
+
+from app.contracts.schemas import RefreshPolicy, ResearchConfig
+from app.core import supabase as db
+from app.core.single_flight import SingleFlight
+
+
+def research_config(**overrides) -> ResearchConfig:
+    fields = dict(config_id="default_v1", proposition="Auto-Research", persona="General",
+                  icp_ruleset_id="default", refresh_policy=RefreshPolicy())
+    return ResearchConfig(**{**fields, **overrides})
+
+
+# --- SingleFlight ---
+
+def test_concurrent_callers_share_one_call():
+    flights = SingleFlight()
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"run": len(calls)}
+
+    async def scenario():
+        return await asyncio.gather(*(flights.do("k", work) for _ in range(5)))
+
+    results = asyncio.run(scenario())
+    assert calls == [1] and all(r == {"run": 1} for r in results)
+    assert flights.stats() == {"in_flight": 0, "leaders": 1, "followers": 4}
+
+
+def test_failure_reaches_every_caller_and_is_not_cached():
+    flights = SingleFlight()
+    calls = []
+
+    async def fail():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        raise ValueError("upstream down")
+
+    async def scenario():
+        first = await asyncio.gather(*(flights.do("k", fail) for _ in range(3)), return_exceptions=True)
+        second = await asyncio.gather(flights.do("k", fail), return_exceptions=True)
+        return first + second
+
+    results = asyncio.run(scenario())
+    assert all(isinstance(r, ValueError) for r in results)
+    assert len(calls) == 2
+
+
+def test_cancelled_follower_does_not_cancel_leader():
+    flights = SingleFlight()
+
+    async def work():
+        await asyncio.sleep(0.02)
+        return "done"
+
+    async def scenario():
+        leader = asyncio.create_task(flights.do("k", work))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(flights.do("k", work))
+        await asyncio.sleep(0.005)
+        follower.cancel()
+        return await leader, await asyncio.gather(follower, return_exceptions=True)
+
+    result, (follower,) = asyncio.run(scenario())
+    assert result == "done" and isinstance(follower, asyncio.CancelledError)
+
+
+def test_distinct_keys_run_independently():
+    flights = SingleFlight()
+
+    async def scenario():
+        return await asyncio.gather(flights.do("a", lambda: asyncio.sleep(0, "a")),
+                                    flights.do("b", lambda: asyncio.sleep(0, "b")))
+
+    assert asyncio.run(scenario()) == ["a", "b"]
+    assert flights.stats()["leaders"] == 2
+
+
+# --- idempotency keys ---
+
+def test_idempotency_key_per_domain_config_and_window():
+    config = research_config()
+    key = db.run_idempotency_key("RESEARCHER", "acme.com", config, 3600, now=7200.0)
+    assert key == db.run_idempotency_key("RESEARCHER", "https://www.Acme.com/", config, 3600, now=10799.0)
+    assert key != db.run_idempotency_key("RESEARCHER", "acme.com", config, 3600, now=10800.0)
+    assert key != db.run_idempotency_key("RESEARCHER", "acme.com", research_config(persona="CFO"), 3600, now=7200.0)
+
+
+# --- claim_agent_run_rpc ---
+
+class FakeClient:
+    def __init__(self):
+        self.calls = []
+
+    def rpc(self, name, params):
+        self.calls.append((name, params))
+        return (name, params)
+
+
+@pytest.fixture
+def rpc(monkeypatch):
+    client = FakeClient()
+    responses = []
+
+    async def execute(query):
+        response = responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return type("Response", (), {"data": response})()
+
+    monkeypatch.setattr(db, "get_supabase_client", lambda: client)
+    monkeypatch.setattr(db, "execute_async", execute)
+    return client, responses
+
+
+def claim(**overrides):
+    args = dict(workspace_id="ws", idempotency_key="k", agent_type="RESEARCHER", account_id=None,
+                inputs={}, lease_seconds=900)
+    return asyncio.run(db.claim_agent_run_rpc(**{**args, **overrides}))
+
+
+def test_claim_passes_lease_and_reads_row(rpc):
+    client, responses = rpc
+    responses.append([{"run_id": "r1", "status": "RUNNING", "lease_acquired": False}])
+    assert claim(lease_owner="worker-a") == {"run_id": "r1", "status": "RUNNING", "lease_acquired": False}
+    name, params = client.calls[0]
+    assert name == "create_agent_run"
+    assert params["p_lease_owner"] == "worker-a" and params["p_lease_seconds"] == 900
+
+
+def test_claim_falls_back_without_migration_009(rpc):
+    client, responses = rpc
+    missing = Exception("Could not find the function")
+    missing.code = "PGRST202"
+    responses.extend([missing, "r2"])  # the 007 RPC returns a bare UUID
+    assert claim() == {"run_id": "r2", "status": "PENDING", "lease_acquired": True}
+    assert "p_lease_owner" not in client.calls[1][1]
+
+
+def test_claim_propagates_other_errors(rpc):
+    _, responses = rpc
+    responses.append(RuntimeError("connection reset"))
+    with pytest.raises(RuntimeError):
+        claim()
+
+
+def test_run_without_lease_is_skipped(monkeypatch):
+    from app import main
+
+    async def refused(**kwargs):
+        return {"run_id": "r1", "status": "RUNNING", "lease_acquired": False}
+
+    async def no_graph(name):
+        raise AssertionError("graph must not run without the lease")
+
+    monkeypatch.setattr(db, "claim_agent_run_rpc", refused)
+    monkeypatch.setattr(main.graph_registry, "get", no_graph)
+    asyncio.run(main.execute_research_run("acme.com", "rec-1", research_config(), "ws", "acct", "k"))
+
+
+# --- run lease renewal ---
+
+class FakeTable:
+    def __init__(self, rows):
+        self.rows, self.filters, self.fields = rows, [], None
+
+    def table(self, name):
+        assert name == "agent_runs"
+        return self
+
+    def update(self, fields):
+        self.fields = fields
+        return self
+
+    def eq(self, column, value):
+        self.filters.append((column, value))
+        return self
+
+
+def test_renewal_only_extends_a_lease_we_still_own(monkeypatch):
+    owned = []
+
+    async def execute(query):
+        matched = [r for r in query.rows if all(r.get(k) == v for k, v in query.filters)]
+        for r in matched:
+            r.update(query.fields)
+        return type("Response", (), {"data": matched})()
+
+    rows = [{"run_id": "r1", "lease_owner": "worker-a", "lease_expires_at": None}]
+    monkeypatch.setattr(db, "get_supabase_client", lambda: FakeTable(rows))
+    monkeypatch.setattr(db, "execute_async", execute)
+
+    assert asyncio.run(db.renew_agent_run_lease("r1", 900, lease_owner="worker-a")) is True
+    assert rows[0]["lease_expires_at"] is not None
+    rows[0].update(lease_owner="worker-b", lease_expires_at="taken over")
+    assert asyncio.run(db.renew_agent_run_lease("r1", 900, lease_owner="worker-a")) is False
+    assert rows[0]["lease_expires_at"] == "taken over"
+
+
+def test_job_heartbeat_renews_the_run_lease(monkeypatch):
+    from app import main
+    from app.core.jobs import JobQueue, JobWorkerPool
+
+    renewed = []
+
+    async def renew(run_id, lease_seconds):
+        renewed.append((run_id, lease_seconds))
+        return True
+
+    monkeypatch.setattr(db, "renew_agent_run_lease", renew)
+    queue = JobQueue(":memory:", visibility_timeout=60.0)
+    pool = JobWorkerPool(queue, poll_interval=0.005, heartbeat_s=0.01)
+    done = []
+
+    async def long_run(job):
+        await queue.set_run_id(job, "r1")  # claimed, as execute_research_run does
+        await asyncio.sleep(0.1)
+        done.append(job.job_id)
+
+    async def scenario():
+        pool.register("RESEARCHER", long_run, on_heartbeat=main.renew_research_run_lease)
+        await queue.enqueue("RESEARCHER", {})
+        pool.start()
+        while not done:
+            await asyncio.sleep(0.01)
+        await pool.stop()
+
+    asyncio.run(scenario())
+    queue.close()
+    assert len(renewed) >= 3
+    assert set(renewed) == {("r1", main.settings.RUN_LEASE_S)}
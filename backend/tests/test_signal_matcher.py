@@ -0,0 +1,51 @@
+import random
+
+from app.services.signal_matcher import SignalCanonMatcher, load_canon
+
+
+def reference_match(signals, trigger):
+    """Naive scan: every pattern of every signal checked as a substring."""
+    text = (trigger or "").lower()
+    best = {}
+    for idx, sig in enumerate(signals):
+        for pattern in SignalCanonMatcher._patterns(sig.get("trigger", "")):
+            if pattern in text:
+                best[idx] = max(best.get(idx, 0), len(pattern))
+    return [signals[i] for i in sorted(best, key=lambda i: (-best[i], i))]
+
+
+def test_matches_the_naive_scan_over_the_canon():
+    matcher = SignalCanonMatcher.from_file()
+    signals = matcher.signals
+    assert signals, "canon should load from the module-relative path"
+    rng = random.Random(8)
+    triggers = ["", "random noise", "Company hires / promotes new CRO", "RECEIVES_FINANCING today"]
+    for _ in range(300):
+        picks = rng.sample(signals, rng.randint(1, 3))
+        # Real triggers embedded in noise, sometimes cut short
+        parts = [sig["trigger"][:rng.randint(3, len(sig["trigger"]) + 1)] for sig in picks if sig.get("trigger")]
+        triggers.append(" ... ".join(parts).upper() if rng.random() < 0.3 else " ... ".join(parts))
+    for trigger in triggers:
+        assert matcher.match(trigger) == reference_match(signals, trigger), trigger
+
+
+def test_alternatives_and_most_specific_trigger_first():
+    matcher = SignalCanonMatcher([
+        {"signal_id": "hire", "trigger": "hires / promotes"},
+        {"signal_id": "sales", "trigger": "Hiring for Sales roles"},
+        {"signal_id": "hiring", "trigger": "Hiring"},
+    ])
+    assert [s["signal_id"] for s in matcher.match("Acme promotes a VP")] == ["hire"]
+    assert [s["signal_id"] for s in matcher.match("hiring for sales roles in EMEA")] == ["sales", "hiring"]
+    assert matcher.best("nothing here") is None
+
+
+def test_match_batch_agrees_with_match():
+    matcher = SignalCanonMatcher.from_file()
+    triggers = ["receives_financing", "Receives_Financing", "job_openings", None, "noise"] * 3
+    assert matcher.match_batch(triggers) == [matcher.match(t or "") for t in triggers]
+
+
+def test_missing_canon_file_gives_an_empty_matcher(tmp_path):
+    assert load_canon(tmp_path / "missing.json") == {"signals": []}
+    assert SignalCanonMatcher.from_file(tmp_path / "missing.json").match("receives_financing") == []
@@ -0,0 +1,158 @@
+import asyncio
+import random
+import time
+
+import pytest
+
+from app.agents.listener_graph import SIGNAL_COMBOS
+from app.core import supabase as db
+from app.services.signal_window import DAY_S, SignalWindow, event_time
+
+T0 = 1_780_000_000.0
+
+
+def test_combo_needs_every_member_within_the_window():
+    window = SignalWindow(SIGNAL_COMBOS, window_days=30)
+    assert window.observe("acme.com", ["hiring_sales"], T0) == []
+    assert window.observe("acme.com", ["hiring_revops"], T0 + 10 * DAY_S) == []
+    assert window.observe("acme.com", ["tech_crm"], T0 + 29 * DAY_S) == ["PRE_SCALE_CHAOS"]
+    # Same members for another domain, spread over more than the window: no combo
+    window.observe("beta.io", ["hiring_sales"], T0)
+    window.observe("beta.io", ["hiring_revops"], T0 + 20 * DAY_S)
+    assert window.observe("beta.io", ["tech_crm"], T0 + 31 * DAY_S) == []
+    # Unknown and single-member patterns are not corroboration
+    assert window.observe("acme.com", ["tech_single_detect", "nope"], T0) == []
+
+
+def test_event_time_formats():
+    assert event_time({"occurred_at": T0}) == T0
+    assert event_time({"timestamp": "2026-05-28T20:26:40Z"}) == event_time({"timestamp": "2026-05-28T20:26:40"})
+    assert abs(event_time({}) - time.time()) < 5
+
+
+class FakeSignals:
+    """`signals` over PostgREST: filters, ordering, .range() paging and a max-rows cap."""
+
+    def __init__(self, rows, max_rows: int = 1000):
+        self.rows, self.max_rows, self.requests = rows, max_rows, []
+        self.inserted = []
+
+    def table(self, name):
+        assert name == "signals"
+        return Query(self)
+
+
+class Query:
+    def __init__(self, store):
+        self.store, self.filters, self.orders, self.bounds = store, [], [], None
+        self.payload = None
+
+    def select(self, columns):
+        return self
+
+    def insert(self, rows):
+        self.payload = rows
+        return self
+
+    def eq(self, column, value):
+        self.filters.append(lambda r: r[column] == value)
+        return self
+
+    def gte(self, column, value):
+        self.filters.append(lambda r: r[column] >= value)
+        return self
+
+    def order(self, column, desc=False):
+        self.orders.append((column, desc))
+        return self
+
+    def range(self, start, end):
+        self.bounds = (start, end)
+        return self
+
+    def execute(self):
+        if self.payload is not None:
+            self.store.inserted.extend(self.payload)
+            return type("Response", (), {"data": self.payload})()
+        self.store.requests.append(self.bounds)
+        rows = [r for r in self.store.rows if all(f(r) for f in self.filters)]
+        for column, desc in reversed(self.orders):
+            rows.sort(key=lambda r: r[column], reverse=desc)
+        start, end = self.bounds or (0, len(rows))
+        page = rows[start:end + 1][:self.store.max_rows]
+        return type("Response", (), {"data": [{"domain": r["domain"], "signal_data": r["signal_data"]} for r in page]})()
+
+
+def stored(domain, members, ts, created_at, i):
+    return {"signal_id": f"{i:08d}", "workspace_id": "ws", "domain": domain, "created_at": created_at,
+            "signal_data": {"members": members, "observed_at": ts}}
+
+
+@pytest.fixture
+def now(monkeypatch):
+    now = T0 + 40 * DAY_S
+    monkeypatch.setattr("app.services.signal_window.time.time", lambda: now)
+    return now
+
+
+def iso(ts):
+    from datetime import datetime, timezone
+    return datetime.fromtimestamp(ts, tz=timezone.utc).isoformat()
+
+
+def load(rows, monkeypatch, **kwargs):
+    table = FakeSignals(rows, max_rows=kwargs.pop("max_rows", 1000))
+    monkeypatch.setattr(db, "get_supabase_client", lambda *args: table)
+    window = SignalWindow(SIGNAL_COMBOS, window_days=30)
+    applied = asyncio.run(window.load(workspace_id="ws", **kwargs))
+    return window, applied, table
+
+
+def busy_workspace(now):
+    """3,500 noise rows in the window (flushed in bursts sharing created_at) plus old rows."""
+    rng = random.Random(4)
+    rows = []
+    for i in range(3500):
+        ts = now - rng.uniform(0, 25) * DAY_S
+        rows.append(stored(f"noise-{i % 400}.com", ["hiring_sales"], ts, iso(ts // 3600 * 3600), i))
+    for i in range(500):
+        ts = now - rng.uniform(31, 60) * DAY_S
+        rows.append(stored("acme.com", ["hiring_revops"], ts, iso(ts), 10_000 + i))
+    rng.shuffle(rows)
+    return rows
+
+
+def test_load_pages_through_a_busy_workspace_newest_first(now, monkeypatch):
+    rows = busy_workspace(now)
+    # The newest signals complete a combo for acme.com
+    rows += [stored("acme.com", [member], now - k * DAY_S, iso(now - k * DAY_S), 20_000 + k)
+             for k, member in enumerate(["hiring_sales", "hiring_revops", "tech_crm"])]
+    window, applied, table = load(rows, monkeypatch, page_size=1000, max_rows=700)
+
+    assert applied == 3503  # every row within the window, despite the server's 700-row cap
+    assert len(table.requests) == 7  # six pages (the server returns 700 rows per page), then an empty one
+    assert set(window.seen("acme.com")) == {"hiring_sales", "hiring_revops", "tech_crm"}
+    assert window.observe("acme.com", ["tech_crm"], now) == ["PRE_SCALE_CHAOS"]
+    assert sum(len(window.seen(f"noise-{i}.com")) for i in range(400)) == 400
+
+
+def test_load_limit_keeps_the_newest_rows(now, monkeypatch):
+    rows = busy_workspace(now) + [stored("acme.com", ["tech_crm"], now, iso(now), 30_000)]
+    window, applied, _ = load(rows, monkeypatch, page_size=300, limit=1000)
+    assert applied == 1000
+    assert "tech_crm" in window.seen("acme.com")
+
+
+def test_flush_then_load_round_trip(now, monkeypatch):
+    table = FakeSignals([])
+    monkeypatch.setattr(db, "get_supabase_client", lambda *args: table)
+    window = SignalWindow(SIGNAL_COMBOS, window_days=30, persist=True)
+    window.observe("acme.com", ["hiring_sales"], now - DAY_S, signal_id="25_jobs_hiring_sales")
+    window.observe("acme.com", ["hiring_revops"], now, signal_id="27_jobs_hiring_revops")
+    assert asyncio.run(window.flush(workspace_id="ws")) == 2
+
+    table.rows = [{**row, "signal_id": f"{i:08d}", "created_at": iso(now)} for i, row in enumerate(table.inserted)]
+    restored = SignalWindow(SIGNAL_COMBOS, window_days=30)
+    assert asyncio.run(restored.load(workspace_id="ws")) == 2
+    assert restored.seen("acme.com") == window.seen("acme.com")
+    assert restored.stats()["pending_writes"] == 0